@@ -53,6 +53,8 @@ class Machine(StateChart):
                 'cond': (
                     lambda ctx: hasattr(ctx, 'autostart') and ctx.autostart
                 ),
+                # eventless transitions are evaluated after every microstep
+                'content': lambda ctx: setattr(ctx, 'autostart', False),
             },
         ],
     }
@@ -31,12 +31,14 @@ from superstate.exception import (
     InvalidState,
     InvalidTransition,
     ConditionNotSatisfied,
+    ExecutionTimeout,
 )
 from superstate.provider import Provider
-from superstate.machine import StateChart
+from superstate.machine import StateChart, TriggerResult
 from superstate.model import (
     Action,
     Assign,
+    Cancel,
     Data,
     DataModel,
     DoneData,
@@ -47,13 +49,14 @@ from superstate.model import (
     Log,
     Raise,
     Script,
+    Send,
 )
 from superstate.state import (
     AtomicState,
     CompoundState,
     # ConditionState,
     FinalState,
-    # HistoryState,
+    HistoryState,
     State,
     ParallelState,
     PseudoState,
@@ -69,12 +72,13 @@ __license__ = 'MIT'
 __copyright__ = 'Copyright 2022 Jesse Johnson.'
 __all__ = (
     'StateChart',
+    'TriggerResult',
     # states
     'AtomicState',
     'CompoundState',
     # 'ConditionState',
     'FinalState',
-    # 'HistoryState',
+    'HistoryState',
     'State',
     'ParallelState',
     'PseudoState',
@@ -83,8 +87,10 @@ __all__ = (
     'InvalidState',
     'InvalidTransition',
     'ConditionNotSatisfied',
+    'ExecutionTimeout',
     # DataModel
     'Assign',
+    'Cancel',
     'Data',
     'DataModel',
     'DoneData',
@@ -95,6 +101,7 @@ __all__ = (
     'Log',
     'Raise',
     'Script',
+    'Send',
 )
 
 logging.config.dictConfig(LOGGING_CONFIG)
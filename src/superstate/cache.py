@@ -0,0 +1,169 @@
+"""Provide shared cache of statechart definitions built from settings."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+
+from superstate.config import DEFAULT_DEFINITION_CACHE_SIZE
+
+T = TypeVar('T')
+
+
+@dataclass
+class CacheInfo:
+    """Statistics of a definition cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    uncacheable: int = 0
+    size: int = 0
+    maxsize: int = 0
+
+
+def _encode(
+    value: Any, update: Callable[[bytes], None], callables: list[Any]
+) -> None:
+    if value is None or isinstance(value, (bool, int, float, str, bytes)):
+        update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, dict):
+        update(b'{')
+        for key in sorted(value):
+            _encode(key, update, callables)
+            _encode(value[key], update, callables)
+        update(b'}')
+    elif isinstance(value, (list, tuple)):
+        update(b'[')
+        for item in value:
+            _encode(item, update, callables)
+        update(b']')
+    elif callable(value):
+        # identities are checked against the callables of the entry
+        update(f"callable:{id(value)};".encode())
+        callables.append(value)
+    else:
+        raise TypeError(f"cannot hash {type(value).__name__} settings")
+
+
+def _reference(value: Any) -> Callable[[], Any]:
+    try:
+        return weakref.ref(value)
+    except TypeError:
+        return lambda: value
+
+
+def _fingerprint(settings: Any) -> Optional[tuple[str, list[Any]]]:
+    digest = hashlib.sha256()
+    callables: list[Any] = []
+    try:
+        _encode(settings, digest.update, callables)
+    except TypeError:
+        return None
+    return digest.hexdigest(), callables
+
+
+def fingerprint(settings: Any) -> Optional[str]:
+    """Get canonical hash of settings independent of mapping order.
+
+    Settings holding objects other than plain data and callables, such as
+    prebuilt states, cannot be hashed and ``None`` is returned.
+    """
+    result = _fingerprint(settings)
+    return None if result is None else result[0]
+
+
+class DefinitionCache:
+    """Provide bounded cache of definitions keyed by settings fingerprint.
+
+    Identical settings are built and validated once, and the result is shared
+    by every statechart class defined with them, so that classes must not
+    modify their definition in place. Callables within settings are matched
+    by identity through weak references, so that a callable collected since
+    an entry was stored never matches a new one reusing its address. The
+    least recently used definition is evicted once ``maxsize`` is exceeded.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_DEFINITION_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self.__entries: OrderedDict[
+            str, tuple[tuple[Callable[[], Any], ...], Any]
+        ] = OrderedDict()
+        self.__lock = threading.Lock()
+        self.__info = CacheInfo()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def info(self) -> CacheInfo:
+        """Get statistics of this cache."""
+        with self.__lock:
+            return CacheInfo(
+                self.__info.hits,
+                self.__info.misses,
+                self.__info.evictions,
+                self.__info.uncacheable,
+                len(self.__entries),
+                self.maxsize,
+            )
+
+    def load(self, settings: Any, build: Callable[[], T]) -> T:
+        """Get definition for settings, building it when not cached.
+
+        Settings are hashed before being built, since building may consume
+        them.
+        """
+        result = _fingerprint(settings) if self.maxsize > 0 else None
+        if result is None:
+            with self.__lock:
+                self.__info.uncacheable += 1
+            return build()
+        key, callables = result
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and self.__matches(entry[0], callables):
+                self.__entries.move_to_end(key)
+                self.__info.hits += 1
+                return entry[1]
+            self.__info.misses += 1
+        definition = build()
+        with self.__lock:
+            # definitions built concurrently resolve to the first one stored
+            entry = self.__entries.get(key)
+            if entry is not None and self.__matches(entry[0], callables):
+                definition = entry[1]
+            else:
+                self.__entries[key] = (
+                    tuple(map(_reference, callables)),
+                    definition,
+                )
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.__info.evictions += 1
+        return definition
+
+    @staticmethod
+    def __matches(
+        references: tuple[Callable[[], Any], ...], callables: list[Any]
+    ) -> bool:
+        return len(references) == len(callables) and all(
+            x() is y for x, y in zip(references, callables)
+        )
+
+    def clear(self) -> None:
+        """Remove all cached definitions and reset statistics."""
+        with self.__lock:
+            self.__entries.clear()
+            self.__info = CacheInfo()
+
+
+DEFINITIONS = DefinitionCache()
@@ -0,0 +1,252 @@
+"""Provide compiled statechart definitions loaded through memory maps.
+
+A compiled definition is a versioned binary file holding the interned
+strings, state table and transition table of a statechart. Expressions are
+stored as bytecode so that they are not compiled again when loaded::
+
+    header   magic, format version, interpreter tag and section extents
+    strings  names, events and targets referenced by index
+    states   one record per state in document order
+    trans    one record per transition referencing its source state
+
+Sections are serialized with ``marshal`` and decoded directly from a
+read-only memory map without reading the file into memory first. Loading
+skips parsing documents and compiling expressions only. The states of the
+statechart class are still built from the decoded tables, as they would be
+from settings, so building large charts takes about as long either way. The
+map is released once the tables are decoded.
+"""
+
+from __future__ import annotations
+
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Any, Callable, Optional, TypeVar
+
+from superstate.exception import InvalidConfig
+
+MAGIC = b'SSCC'
+VERSION = 1
+HEADER = struct.Struct('<4sH16s6Q')
+
+# executable content attributes evaluated by the datamodel provider
+EXPRESSIONS = ('cond', 'expr')
+
+T = TypeVar('T')
+
+
+class _Compiler:
+    """Flatten statechart settings into string, state and transition tables."""
+
+    def __init__(self, name: str) -> None:
+        self.filename = f"<{name}>"
+        self.strings: list[str] = []
+        self.__index: dict[str, int] = {}
+        self.states: list[tuple[Any, ...]] = []
+        self.transitions: list[tuple[Any, ...]] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        """Get index of string within the string table."""
+        if value is None:
+            return -1
+        if value not in self.__index:
+            self.__index[value] = len(self.strings)
+            self.strings.append(value)
+        return self.__index[value]
+
+    def content(self, settings: Any, key: Optional[str] = None) -> Any:
+        """Copy executable content replacing expressions with bytecode."""
+        if isinstance(settings, dict):
+            return {k: self.content(v, k) for k, v in settings.items()}
+        if isinstance(settings, (list, tuple)):
+            # conditions may be given as a list of expressions
+            return [self.content(x, key) for x in settings]
+        if callable(settings):
+            raise InvalidConfig('callables cannot be compiled')
+        if (
+            key in EXPRESSIONS
+            and isinstance(settings, str)
+            # identifiers may refer to methods of the statechart
+            and not settings.isidentifier()
+        ):
+            try:
+                return compile(settings, self.filename, 'eval')
+            except SyntaxError as err:
+                raise InvalidConfig(f"invalid expression: {settings}") from err
+        return settings
+
+    def state(self, settings: Any, parent: int) -> None:
+        """Add state and its substates to the state table."""
+        if isinstance(settings, str):
+            settings = {'name': settings}
+        if not isinstance(settings, dict) or 'factory' in settings:
+            raise InvalidConfig('only state settings can be compiled')
+        index = len(self.states)
+        transitions = len(self.transitions)
+        for transition in settings.get('transitions', ()):
+            self.transitions.append(
+                (
+                    index,
+                    self.intern(transition.get('event', '')),
+                    self.intern(transition.get('target', '')),
+                    self.intern(transition.get('type')),
+                    self.content(transition.get('cond'), 'cond'),
+                    self.content(transition.get('content')),
+                )
+            )
+        self.states.append(
+            (
+                self.intern(settings.get('name', 'root')),
+                parent,
+                self.intern(settings.get('type')),
+                self.intern(settings.get('initial')),
+                # data items are literals and kept as declared
+                settings.get('datamodel'),
+                self.content(settings.get('on_entry')),
+                self.content(settings.get('on_exit')),
+                self.content(settings.get('invoke')),
+                transitions,
+                len(self.transitions) - transitions,
+                'states' in settings,
+            )
+        )
+        for substate in settings.get('states', ()):
+            self.state(substate, index)
+
+
+def dumps(settings: dict[str, Any]) -> bytes:
+    """Compile statechart settings into the binary definition format.
+
+    Settings are those of a statechart class, namely ``state`` and the
+    optional ``datamodel``, ``__name__`` and ``__binding__``.
+    """
+    if 'state' not in settings:
+        raise InvalidConfig('compiled definitions require a root state')
+    name = settings.get('__name__') or 'statechart'
+    compiler = _Compiler(name)
+    compiler.state(settings['state'], -1)
+    meta = {
+        k: v
+        for k, v in settings.items()
+        if k in ('__name__', '__binding__', 'datamodel')
+    }
+    try:
+        sections = [
+            marshal.dumps(x)
+            for x in (
+                (meta, tuple(compiler.strings)),
+                tuple(compiler.states),
+                tuple(compiler.transitions),
+            )
+        ]
+    except ValueError as err:
+        raise InvalidConfig('definition contains unsupported values') from err
+    extents: list[int] = []
+    offset = HEADER.size
+    for section in sections:
+        extents.extend((offset, len(section)))
+        offset += len(section)
+    header = HEADER.pack(
+        MAGIC,
+        VERSION,
+        sys.implementation.cache_tag.encode()[:16],
+        *extents,
+    )
+    return b''.join([header, *sections])
+
+
+def dump(settings: dict[str, Any], path: str) -> None:
+    """Write compiled definition of statechart settings to path."""
+    content = dumps(settings)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as file:
+        file.write(content)
+    os.replace(tmp, path)
+
+
+def loads(buffer: Any) -> dict[str, Any]:
+    """Rebuild statechart settings from a compiled definition buffer."""
+    if len(buffer) < HEADER.size:
+        raise InvalidConfig('compiled definition is truncated')
+    magic, version, tag, *extents = HEADER.unpack_from(buffer)
+    if magic != MAGIC:
+        raise InvalidConfig('not a compiled statechart definition')
+    if version != VERSION:
+        raise InvalidConfig(f"unsupported compiled definition: {version}")
+    # bytecode is only valid for the interpreter that compiled it
+    if tag.rstrip(b'\0') != sys.implementation.cache_tag.encode()[:16]:
+        raise InvalidConfig('definition compiled by another interpreter')
+    with memoryview(buffer) as view:
+        try:
+            (meta, strings), states, transitions = (
+                marshal.loads(view[offset : offset + length])
+                for offset, length in zip(extents[::2], extents[1::2])
+            )
+        except (EOFError, ValueError, TypeError) as err:
+            raise InvalidConfig('compiled definition is corrupted') from err
+    strings = tuple(map(sys.intern, strings))
+
+    def text(index: int) -> Optional[str]:
+        return strings[index] if index >= 0 else None
+
+    table: list[dict[str, Any]] = []
+    for record in states:
+        (
+            name,
+            parent,
+            kind,
+            initial,
+            datamodel,
+            on_entry,
+            on_exit,
+            invoke,
+            first,
+            count,
+            compound,
+        ) = record
+        state: dict[str, Any] = {'name': text(name)}
+        for key, value in (
+            ('type', text(kind)),
+            ('initial', text(initial)),
+            ('datamodel', datamodel),
+            ('on_entry', on_entry),
+            ('on_exit', on_exit),
+            ('invoke', invoke),
+        ):
+            if value is not None:
+                state[key] = value
+        if compound:
+            state['states'] = []
+        if count:
+            state['transitions'] = []
+            for _, event, target, kind, cond, content in transitions[
+                first : first + count
+            ]:
+                transition = {'event': text(event), 'target': text(target)}
+                for key, value in (
+                    ('type', text(kind)),
+                    ('cond', cond),
+                    ('content', content),
+                ):
+                    if value is not None:
+                        transition[key] = value
+                state['transitions'].append(transition)
+        table.append(state)
+        if parent >= 0:
+            table[parent]['states'].append(state)
+    return {**meta, 'state': table[0]}
+
+
+def load(path: str, factory: Callable[[dict[str, Any]], T]) -> T:
+    """Build from compiled definition mapped read-only from path.
+
+    The settings are decoded from the mapping before it is closed, so the
+    object graph built by the factory does not reference the file.
+    """
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            settings = loads(buffer)
+    return factory(settings)
@@ -2,7 +2,7 @@
 
 import datetime
 import platform
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from superstate.config.system import (
     HostInfo,
@@ -12,8 +12,20 @@ from superstate.config.system import (
     TimeInfo,
 )
 
+DEFAULT_BATCH_SIZE = 1024
 DEFAULT_BINDING = 'early'
+DEFAULT_DEFINITION_CACHE_SIZE = 256
+DEFAULT_EVENTLESS_LIMIT = 100
+DEFAULT_GROUP_COMMIT_INTERVAL = 0.005
+DEFAULT_GROUP_COMMIT_SIZE = 64
+DEFAULT_LIVE_SIZE = 4096
+DEFAULT_POOL_SIZE = 16
 DEFAULT_PROVIDER = 'default'
+DEFAULT_QUEUE_SIZE = 1024
+DEFAULT_SEND_BATCH_SIZE = 64
+DEFAULT_SEND_LINGER = 0.005
+DEFAULT_SNAPSHOT_INTERVAL = 1000
+DEFAULT_TIMEOUT: Optional[float] = None
 DEFAULT_DATAMODEL: Dict[str, Any] = {
     'systeminfo': SystemInfo(
         host=HostInfo(hostname=platform.node()),
@@ -27,3 +27,7 @@ class InvalidState(SuperstateException):
 
 class ConditionNotSatisfied(SuperstateException):
     """Manage superstate guard excluded transition exception."""
+
+
+class ExecutionTimeout(SuperstateException):
+    """Manage superstate executable content deadline exception."""
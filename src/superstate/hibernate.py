@@ -0,0 +1,314 @@
+"""Provide hibernation of idle statecharts to a store.
+
+Only the most recently used statecharts are kept resident by an instance
+manager. Snapshots of others are saved to a store, with their pending timers
+cancelled until they are due, and rehydrated once an event is sent to them,
+including events sent by other statecharts to ``#_scxml_<sessionid>``.
+"""
+
+from __future__ import annotations
+
+import logging
+import logging.config
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import partial
+from typing import TYPE_CHECKING, Any, Iterator, Optional, Type, Union
+from uuid import uuid4
+
+from superstate.config import DEFAULT_LIVE_SIZE, LOGGING_CONFIG
+from superstate.exception import InvalidState
+from superstate.scheduler import HIBERNATED
+
+if TYPE_CHECKING:
+    from superstate.machine import StateChart, TriggerResult
+
+logging.config.dictConfig(LOGGING_CONFIG)
+log = logging.getLogger(__name__)
+
+
+class Store(ABC):
+    """Provide storage of hibernated statecharts by session id."""
+
+    @abstractmethod
+    def __contains__(self, sessionid: object) -> bool:
+        """Check if session is stored."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over stored sessions."""
+
+    @abstractmethod
+    def save(self, sessionid: str, content: bytes) -> None:
+        """Store dumped statechart for session."""
+
+    @abstractmethod
+    def load(self, sessionid: str) -> Optional[bytes]:
+        """Get dumped statechart of session if stored."""
+
+    @abstractmethod
+    def delete(self, sessionid: str) -> None:
+        """Remove session from the store."""
+
+
+class SQLiteStore(Store):
+    """Provide store within a SQLite database."""
+
+    def __init__(self, path: Union[str, os.PathLike] = ':memory:') -> None:
+        self.__db = sqlite3.connect(os.fspath(path), check_same_thread=False)
+        self.__lock = threading.Lock()
+        with self.__lock, self.__db:
+            self.__db.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(id TEXT PRIMARY KEY, content BLOB NOT NULL)'
+            )
+
+    def __contains__(self, sessionid: object) -> bool:
+        with self.__lock:
+            row = self.__db.execute(
+                'SELECT 1 FROM sessions WHERE id = ? LIMIT 1',
+                (str(sessionid),),
+            ).fetchone()
+        return row is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self.__lock:
+            rows = self.__db.execute('SELECT id FROM sessions').fetchall()
+        return iter(x for x, in rows)
+
+    def save(self, sessionid: str, content: bytes) -> None:
+        """Store dumped statechart for session."""
+        with self.__lock, self.__db:
+            self.__db.execute(
+                'INSERT OR REPLACE INTO sessions VALUES (?, ?)',
+                (sessionid, content),
+            )
+
+    def load(self, sessionid: str) -> Optional[bytes]:
+        """Get dumped statechart of session if stored."""
+        with self.__lock:
+            row = self.__db.execute(
+                'SELECT content FROM sessions WHERE id = ?', (sessionid,)
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def delete(self, sessionid: str) -> None:
+        """Remove session from the store."""
+        with self.__lock, self.__db:
+            self.__db.execute(
+                'DELETE FROM sessions WHERE id = ?', (sessionid,)
+            )
+
+    def close(self) -> None:
+        """Close the database."""
+        with self.__lock:
+            self.__db.close()
+
+
+class DirectoryStore(Store):
+    """Provide store with a file for each session within a directory."""
+
+    suffix = '.chart'
+
+    def __init__(self, path: Union[str, os.PathLike]) -> None:
+        self.path = os.fspath(path)
+        os.makedirs(self.path, exist_ok=True)
+
+    def __file(self, sessionid: str) -> str:
+        if os.sep in sessionid or sessionid.startswith('.'):
+            raise InvalidState(f"invalid session id {sessionid}")
+        return os.path.join(self.path, f"{sessionid}{self.suffix}")
+
+    def __contains__(self, sessionid: object) -> bool:
+        return os.path.exists(self.__file(str(sessionid)))
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(
+            x[: -len(self.suffix)]
+            for x in os.listdir(self.path)
+            if x.endswith(self.suffix)
+        )
+
+    def save(self, sessionid: str, content: bytes) -> None:
+        """Store dumped statechart for session."""
+        path = self.__file(sessionid)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, path)
+
+    def load(self, sessionid: str) -> Optional[bytes]:
+        """Get dumped statechart of session if stored."""
+        try:
+            with open(self.__file(sessionid), 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def delete(self, sessionid: str) -> None:
+        """Remove session from the store."""
+        try:
+            os.remove(self.__file(sessionid))
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class HibernationInfo:
+    """Statistics of an instance manager.
+
+    Latencies are the total seconds spent evicting and rehydrating
+    statecharts, so that their means are ``eviction_time / evictions`` and
+    ``rehydration_time / rehydrations``.
+    """
+
+    live: int = 0
+    evictions: int = 0
+    rehydrations: int = 0
+    eviction_time: float = 0.0
+    rehydration_time: float = 0.0
+    max_eviction_time: float = 0.0
+    max_rehydration_time: float = 0.0
+
+
+class InstanceManager:
+    """Provide statecharts kept resident while recently used.
+
+    Statecharts beyond ``maxsize`` are evicted least recently used first.
+    Statecharts with invoked sessions are kept resident until they finish.
+    Data items must be picklable for statecharts to be hibernated. Options,
+    such as the scheduler, are passed to every statechart created or
+    rehydrated.
+    """
+
+    def __init__(
+        self,
+        factory: Type[StateChart],
+        store: Optional[Store] = None,
+        maxsize: int = DEFAULT_LIVE_SIZE,
+        **options: Any,
+    ) -> None:
+        self.factory = factory
+        self.options = options
+        self.store = store if store is not None else SQLiteStore()
+        self.maxsize = maxsize
+        self.__live: OrderedDict[str, StateChart] = OrderedDict()
+        self.__lock = threading.RLock()
+        self.__info = HibernationInfo()
+
+    def __contains__(self, sessionid: object) -> bool:
+        return sessionid in self.__live or sessionid in self.store
+
+    def __len__(self) -> int:
+        return len(self.__live)
+
+    @property
+    def info(self) -> HibernationInfo:
+        """Get statistics of this manager."""
+        with self.__lock:
+            info = HibernationInfo(**vars(self.__info))
+            info.live = len(self.__live)
+            return info
+
+    def create(
+        self, sessionid: Optional[str] = None, **kwargs: Any
+    ) -> StateChart:
+        """Create statechart managed by session id."""
+        sessionid = str(uuid4() if sessionid is None else sessionid)
+        with self.__lock:
+            if sessionid in self:
+                raise InvalidState(f"session {sessionid} already exists")
+            chart = self.factory(
+                sessionid=sessionid, **{**self.options, **kwargs}
+            )
+            self.__live[sessionid] = chart
+            self.__shrink()
+            return chart
+
+    def get(self, sessionid: str) -> StateChart:
+        """Get statechart of session, rehydrating it when hibernated."""
+        with self.__lock:
+            chart = self.__live.get(sessionid)
+            if chart is not None:
+                self.__live.move_to_end(sessionid)
+                return chart
+            start = time.perf_counter()
+            content = self.store.load(sessionid)
+            if content is None:
+                raise InvalidState(f"no statechart with session {sessionid}")
+            chart = self.factory.restore(
+                content, sessionid=sessionid, **self.options
+            )
+            chart.scheduler.cancel((sessionid, InstanceManager))
+            HIBERNATED.pop(sessionid, None)
+            self.store.delete(sessionid)
+            self.__live[sessionid] = chart
+            elapsed = time.perf_counter() - start
+            self.__info.rehydrations += 1
+            self.__info.rehydration_time += elapsed
+            self.__info.max_rehydration_time = max(
+                self.__info.max_rehydration_time, elapsed
+            )
+            self.__shrink()
+            return chart
+
+    def send(
+        self, sessionid: str, event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        """Send event to statechart of session without raising."""
+        with self.__lock:
+            return self.get(sessionid).try_trigger(event, *args, **kwargs)
+
+    def evict(self, sessionid: str) -> None:
+        """Hibernate statechart of session to the store."""
+        with self.__lock:
+            chart = self.__live[sessionid]
+            start = time.perf_counter()
+            self.store.save(sessionid, chart.snapshot())
+            scheduler = chart.scheduler
+            timers = scheduler.timers(sessionid)
+            for key, _, _ in timers:
+                scheduler.cancel(key)
+            if timers:
+                # woken once the first timer of the statechart is due
+                scheduler.schedule(
+                    max(0.0, min(x for _, x, _ in timers) - scheduler.clock()),
+                    partial(self.__wake, sessionid),
+                    key=(sessionid, InstanceManager),
+                )
+            del self.__live[sessionid]
+            HIBERNATED[sessionid] = self.get
+            elapsed = time.perf_counter() - start
+            self.__info.evictions += 1
+            self.__info.eviction_time += elapsed
+            self.__info.max_eviction_time = max(
+                self.__info.max_eviction_time, elapsed
+            )
+
+    def remove(self, sessionid: str) -> None:
+        """Remove statechart of session whether resident or hibernated."""
+        with self.__lock:
+            if self.__live.pop(sessionid, None) is None:
+                HIBERNATED.pop(sessionid, None)
+                self.store.delete(sessionid)
+
+    def __wake(self, sessionid: str) -> None:
+        try:
+            self.get(sessionid)
+        except InvalidState:
+            log.warning('unable to wake hibernated session %s', sessionid)
+
+    def __shrink(self) -> None:
+        # statecharts that cannot be dumped are kept resident
+        for sessionid in list(self.__live):
+            if len(self.__live) <= self.maxsize:
+                break
+            try:
+                self.evict(sessionid)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                log.warning('unable to evict session %s: %s', sessionid, err)
@@ -0,0 +1,295 @@
+"""Provide append-only journal of events processed by statecharts.
+
+Each record is length prefixed so that the journal is read sequentially and
+records of other sessions are skipped without being decoded::
+
+    length   little-endian u32 length of the record after this field
+    kind     event or snapshot and the encoding of the payload
+    session  16 byte session id
+    payload  event as ``(timestamp, statepath, event, args, kwargs)`` or
+             snapshot of the statechart
+
+Records are buffered and written together, then synced to disk once
+``group_size`` records are pending or ``group_interval`` seconds have elapsed
+since the first of them, so that many events share a single ``fsync``.
+Events accepted since the last commit are lost if the process crashes.
+
+The offsets of the records of each session since its last snapshot are
+indexed, by scanning the file once when it is opened, so reading a session
+seeks to its own records. Records superseded by snapshots remain in the file
+until it is compacted.
+"""
+
+from __future__ import annotations
+
+import logging
+import logging.config
+import marshal
+import os
+import pickle  # nosec
+import struct
+import threading
+import time
+from typing import Any, Optional, Union
+from uuid import UUID
+
+from superstate.config import (
+    DEFAULT_GROUP_COMMIT_INTERVAL,
+    DEFAULT_GROUP_COMMIT_SIZE,
+    DEFAULT_SNAPSHOT_INTERVAL,
+    LOGGING_CONFIG,
+)
+from superstate.exception import InvalidConfig
+
+logging.config.dictConfig(LOGGING_CONFIG)
+log = logging.getLogger(__name__)
+
+RECORD = struct.Struct('<IB16s')
+EVENT, PICKLED_EVENT, SNAPSHOT = 1, 2, 3
+
+Event = tuple[float, Optional[str], str, tuple[Any, ...], dict[str, Any]]
+
+
+class Journal:
+    """Provide journal shared by the statecharts of a shard.
+
+    Statecharts attached to a journal append each event they process, and a
+    snapshot once ``snapshot_interval`` events of the session have been
+    appended since the last one, which bounds the events replayed.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        group_size: int = DEFAULT_GROUP_COMMIT_SIZE,
+        group_interval: float = DEFAULT_GROUP_COMMIT_INTERVAL,
+        snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+        fsync: bool = True,
+    ) -> None:
+        self.path = os.fspath(path)
+        self.group_size = group_size
+        self.group_interval = group_interval
+        self.snapshot_interval = snapshot_interval
+        self.fsync = fsync
+        self.__file = open(self.path, 'ab')  # pylint: disable=R1732
+        # offset and kind of the records of each session to be read
+        self.__index: dict[bytes, list[tuple[int, int]]] = {}
+        # size of the committed records and offset of the next record, where
+        # records already in the file are committed while they are scanned
+        self.__size = os.path.getsize(self.path)
+        self.__size = self.__scan()
+        self.__offset = self.__size
+        self.__buffer = bytearray()
+        self.__pending = 0
+        self.__since = 0.0
+        self.__counts: dict[bytes, int] = {}
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__committer = threading.Thread(
+            target=self.__run, name='superstate-journal', daemon=True
+        )
+        self.__committer.start()
+
+    def __enter__(self) -> Journal:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __scan(self) -> int:
+        """Index records of the journal and drop a truncated record."""
+        offset = 0
+        with open(self.path, 'rb') as file:
+            while True:
+                header = file.read(RECORD.size)
+                if len(header) < RECORD.size:
+                    break
+                length, kind, owner = RECORD.unpack(header)
+                size = length - RECORD.size + 4
+                if len(file.read(size)) < size:
+                    break
+                self.__add(owner, offset, kind)
+                offset += RECORD.size + size
+        if offset < os.path.getsize(self.path):
+            log.warning('dropping truncated record of %s', self.path)
+            os.truncate(self.path, offset)
+        return offset
+
+    def __add(self, session: bytes, offset: int, kind: int) -> None:
+        records = self.__index.setdefault(session, [])
+        if kind == SNAPSHOT:
+            # records before the last committed snapshot are not read again
+            start = next(
+                (
+                    x
+                    for x in range(len(records) - 1, -1, -1)
+                    if records[x][1] == SNAPSHOT
+                    and records[x][0] < self.__size
+                ),
+                0,
+            )
+            del records[:start]
+        records.append((offset, kind))
+
+    def __write(self, kind: int, session: bytes, payload: bytes) -> None:
+        with self.__condition:
+            if self.__closed:
+                raise InvalidConfig('journal has been closed')
+            header = RECORD.pack(len(payload) + RECORD.size - 4, kind, session)
+            self.__add(session, self.__offset, kind)
+            self.__offset += len(header) + len(payload)
+            self.__buffer += header
+            self.__buffer += payload
+            if not self.__pending:
+                self.__since = time.monotonic()
+                self.__condition.notify()
+            self.__pending += 1
+            if self.__pending >= self.group_size:
+                self.__commit()
+
+    def append(
+        self,
+        sessionid: UUID,
+        statepath: Optional[str],
+        event: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> bool:
+        """Append event processed by session.
+
+        Returns whether a snapshot of the session is due.
+        """
+        record = (time.time(), statepath, event, args, kwargs)
+        try:
+            kind, payload = EVENT, marshal.dumps(record, 4)
+        except ValueError:
+            kind = PICKLED_EVENT
+            payload = pickle.dumps(record, pickle.HIGHEST_PROTOCOL)
+        with self.__condition:
+            self.__write(kind, sessionid.bytes, payload)
+            count = self.__counts.get(sessionid.bytes, 0) + 1
+            self.__counts[sessionid.bytes] = count
+        return count >= self.snapshot_interval
+
+    def checkpoint(self, sessionid: UUID, content: bytes) -> None:
+        """Append snapshot of session replacing its earlier events."""
+        with self.__condition:
+            self.__write(SNAPSHOT, sessionid.bytes, content)
+            self.__counts[sessionid.bytes] = 0
+
+    def commit(self) -> None:
+        """Write and sync pending records."""
+        with self.__condition:
+            self.__commit()
+
+    def __commit(self) -> None:
+        if not self.__buffer:
+            return
+        self.__file.write(self.__buffer)
+        self.__file.flush()
+        if self.fsync:
+            os.fsync(self.__file.fileno())
+        self.__buffer.clear()
+        self.__pending = 0
+        self.__size = self.__offset
+
+    def compact(self) -> None:
+        """Rewrite journal keeping only records read by replaying.
+
+        Pending records are committed first, then the last snapshot of each
+        session and the events appended after it replace the journal.
+        """
+        with self.__condition:
+            if self.__closed:
+                raise InvalidConfig('journal has been closed')
+            self.__commit()
+            path = f"{self.path}.compact"
+            index: dict[bytes, list[tuple[int, int]]] = {}
+            offset = 0
+            with open(self.path, 'rb') as source, open(path, 'wb') as target:
+                for session in self.__index:
+                    records = index[session] = []
+                    for position, kind in self.__records(session):
+                        source.seek(position)
+                        length = RECORD.unpack(source.read(RECORD.size))[0]
+                        source.seek(position)
+                        content = source.read(length + 4)
+                        target.write(content)
+                        records.append((offset, kind))
+                        offset += len(content)
+                target.flush()
+                if self.fsync:
+                    os.fsync(target.fileno())
+            self.__file.close()
+            os.replace(path, self.path)
+            self.__file = open(self.path, 'ab')  # pylint: disable=R1732
+            self.__index = index
+            self.__size = self.__offset = offset
+
+    def __run(self) -> None:
+        # commits records left pending once the group interval has elapsed
+        with self.__condition:
+            while not self.__closed:
+                if not self.__pending:
+                    self.__condition.wait()
+                    continue
+                remaining = self.__since + self.group_interval
+                remaining -= time.monotonic()
+                if remaining > 0:
+                    self.__condition.wait(remaining)
+                    continue
+                try:
+                    self.__commit()
+                except OSError as err:
+                    log.error('failed committing journal: %s', err)
+                    self.__condition.wait(self.group_interval)
+
+    def close(self) -> None:
+        """Commit pending records and close the journal."""
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__commit()
+            self.__closed = True
+            self.__condition.notify()
+        self.__committer.join()
+        self.__file.close()
+
+    def __records(self, session: bytes) -> list[tuple[int, int]]:
+        """Get committed records of session from its last snapshot."""
+        records = [
+            x for x in self.__index.get(session, ()) if x[0] < self.__size
+        ]
+        start = next(
+            (
+                x
+                for x in range(len(records) - 1, -1, -1)
+                if records[x][1] == SNAPSHOT
+            ),
+            0,
+        )
+        return records[start:]
+
+    def read(self, sessionid: UUID) -> tuple[Optional[bytes], list[Event]]:
+        """Get last snapshot of session and the events appended after it.
+
+        Only committed records are read, and a record truncated by a crash
+        is dropped when the journal is opened.
+        """
+        content: Optional[bytes] = None
+        events: list[Event] = []
+        # records are not moved by compacting while they are read
+        with self.__condition, open(self.path, 'rb') as file:
+            for offset, kind in self.__records(sessionid.bytes):
+                file.seek(offset)
+                length = RECORD.unpack(file.read(RECORD.size))[0]
+                payload = file.read(length - RECORD.size + 4)
+                if kind == SNAPSHOT:
+                    content = payload
+                elif kind == EVENT:
+                    events.append(marshal.loads(payload))
+                elif kind == PICKLED_EVENT:
+                    events.append(pickle.loads(payload))  # nosec
+                else:
+                    raise InvalidConfig(f"unknown journal record: {kind}")
+        return content, events
@@ -5,37 +5,140 @@ from __future__ import annotations
 import logging
 import logging.config
 import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, wait
 from copy import deepcopy
-from itertools import zip_longest
-from typing import TYPE_CHECKING, Any, Iterator, Optional, cast
+from dataclasses import dataclass
+from functools import partial
+from itertools import chain, zip_longest
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Iterator,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 from uuid import UUID
 
-from superstate.config import DEFAULT_BINDING, DEFAULT_PROVIDER
+from superstate.config import (
+    DEFAULT_BINDING,
+    DEFAULT_EVENTLESS_LIMIT,
+    DEFAULT_POOL_SIZE,
+    DEFAULT_PROVIDER,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_TIMEOUT,
+)
 from superstate.exception import (
     ConditionNotSatisfied,
+    ExecutionTimeout,
     InvalidConfig,
     InvalidPath,
     InvalidState,
     InvalidTransition,
 )
+from superstate.model import Conditional
 from superstate.model.data import DataModel
+from superstate.model.source import SOURCES
+from superstate import compiled, scxml, snapshot
+from superstate.cache import DEFINITIONS
 from superstate.provider import PROVIDERS
+from superstate.queue import EventQueue, intern_event, lookup_event
+from superstate.scheduler import (
+    SCHEDULER,
+    SESSIONS,
+    Scheduler,
+    background_executor,
+    deliver,
+)
 from superstate.state import (
     AtomicState,
-    # CompoundState,
+    CompoundState,
+    HistoryState,
     ParallelState,
     State,
     SubstateMixin,
+    TransitionMixin,
 )
+from superstate.transition import EventTrie
 from superstate.types import Selection
+from superstate.utils import detach, lookup_subclasses, tuplize
+from superstate.watchdog import Watchdog
 
 if TYPE_CHECKING:
     # from superstate.model.data import Data
+    from superstate.journal import Journal
+    from superstate.model.action import Script
+    from superstate.model.communication import Invoke
+    from superstate.provider import Provider
     from superstate.transition import Transition
     from superstate.types import Initial
 
 log = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+
+def _unchanged(value: Any, default: Any) -> bool:
+    """Check if data item still holds its declared default."""
+    if value is default:
+        return True
+    try:
+        return type(value) is type(default) and bool(value == default)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return False
+
+
+def _candidate(state: State, index: int) -> Transition:
+    """Get transition of state planned as a selection candidate."""
+    if not isinstance(state, TransitionMixin):
+        raise InvalidState(f"state has no transitions: {state.name}")
+    return state.transitions[index]
+
+
+@dataclass(frozen=True)
+class SelectionPlan:
+    """Provide precomputed transition selection for an event.
+
+    Candidates are indexes of the active state and its transition. Chains list
+    candidates by priority for each atomic state in document order.
+    """
+
+    candidates: tuple[tuple[int, int], ...]
+    chains: tuple[tuple[int, ...], ...]
+    conflicts: tuple[frozenset[int], ...]
+    preempts: tuple[frozenset[int], ...]
+    datamodel: bool = False
+
+
+@dataclass
+class TriggerResult:
+    """Provide outcome of an event processed by a statechart.
+
+    Outcomes are ``processed`` when a transition fired, ``unhandled`` when no
+    transition matched the event, ``blocked`` when every matching transition
+    was excluded by its guard and ``error`` when executable content failed.
+    """
+
+    event: str
+    outcome: str
+    transitions: tuple[Transition, ...] = ()
+    results: Optional[list[Any]] = None
+    error: Optional[Exception] = None
+
+    def __bool__(self) -> bool:
+        return self.outcome == 'processed'
+
+    @property
+    def transition(self) -> Optional[Transition]:
+        """Return the fired transition."""
+        return self.transitions[0] if self.transitions else None
+
 
 class MetaStateChart(type):
     """Instantiate statecharts from class metadata."""
@@ -45,6 +148,9 @@ class MetaStateChart(type):
     __binding__: str = cast(str, Selection('early', 'late'))
     __datamodel__: str
     _root: SubstateMixin
+    _events: dict[tuple[str, ...], EventTrie[str]]
+    _plans: dict[tuple[str, ...], dict[str, SelectionPlan]]
+    _pool: list[StateChart]
     datamodel: DataModel
 
     def __new__(
@@ -60,18 +166,23 @@ class MetaStateChart(type):
             name = attrs.get('__name__', name.lower())
 
         initial = attrs.get('__initial__', None)
-        root = State.create(attrs.pop('state')) if 'state' in attrs else None
 
         # setup datamodel
         binding = attrs.get('__binding__', DEFAULT_BINDING)
-        if binding:
-            DataModel.binding = binding
         provider = attrs.get('__datamodel__', DEFAULT_PROVIDER)
         if provider != DEFAULT_PROVIDER:
             DataModel.provider = PROVIDERS[provider]
-        datamodel = DataModel.create(attrs.pop('datamodel', {'data': []}))
-        # XXX: chaining datamodels not working
-        # datamodel['data'].append({'id': 'root', 'expr': root})
+        state = attrs.pop('state', None)
+        data = attrs.pop('datamodel', {'data': []})
+        if state is None:
+            root, datamodel = mcs.__build(state, data, binding)
+        else:
+            # identical definitions are built once and shared by classes
+            root, datamodel = DEFINITIONS.load(
+                (state, data, binding, provider),
+                # settings are consumed by building and may be passed again
+                lambda: mcs.__build(*deepcopy((state, data)), binding),
+            )
 
         obj = super().__new__(mcs, name, bases, attrs)
         obj.__name__ = name
@@ -79,10 +190,45 @@ class MetaStateChart(type):
         obj.__binding__ = binding
         obj.__datamodel__ = provider
         obj.datamodel = datamodel
+        # selection is shared by instances for each configuration
+        obj._events = {}
+        obj._plans = {}
+        # released instances recycled by invoke
+        obj._pool = []
         if root:
-            obj._root = root  # type: ignore
+            obj._root = root
         return obj
 
+    @staticmethod
+    def __build(
+        state: Optional[dict[str, Any]],
+        data: dict[str, Any],
+        binding: str,
+    ) -> tuple[Optional[SubstateMixin], DataModel]:
+        """Build root state and datamodel of a statechart definition."""
+        root = State.create(state) if state is not None else None
+        datamodel = DataModel.create(data)
+        datamodel.binding = binding
+        if root and binding == 'early':
+            # distinct sources of the whole statechart are fetched together
+            SOURCES.prefetch(
+                x.src
+                for y in chain((datamodel,), (z.datamodel for z in root))
+                for x in y.data
+                if x.src
+            )
+        if root:
+            for substate in root:
+                # scopes are chained from the statechart to each substate
+                substate.datamodel.scope = (
+                    substate.parent.datamodel if substate.parent else datamodel
+                )
+                substate.datamodel.binding = binding
+                # early bound data is evaluated once and copied by instances
+                if binding == 'early':
+                    substate.datamodel.populate()
+        return cast(Optional[SubstateMixin], root), datamodel
+
 
 class StateChart(metaclass=MetaStateChart):
     """Represent statechart capabilities."""
@@ -102,6 +248,28 @@ class StateChart(metaclass=MetaStateChart):
     __root: SubstateMixin
     __parent: SubstateMixin
     __current_state: State
+    __events: dict[tuple[str, ...], EventTrie[str]]
+    __eventless_limit__: int = DEFAULT_EVENTLESS_LIMIT
+    __stable: Optional[tuple[tuple[str, ...], int]] = None
+    __plans: dict[tuple[str, ...], dict[str, SelectionPlan]]
+    __queue: EventQueue
+    __queue_size__: int = DEFAULT_QUEUE_SIZE
+    __scheduler: Scheduler
+    __scheduler__: Optional[Scheduler] = None
+    __invoked: dict[str, tuple[StateChart, Invoke]]
+    __invoker: Optional[tuple[StateChart, str]] = None
+    __pool_size__: int = DEFAULT_POOL_SIZE
+    __executor: Optional[Executor]
+    __executor__: Optional[Executor] = None
+    __tasks: Optional[list[Callable[[], Any]]] = None
+    __background: Optional[Executor]
+    __background__: Optional[Executor] = None
+    __workers: bool = False
+    __journal: Optional[Journal]
+    __journal__: Optional[Journal] = None
+    __timeout: Optional[float]
+    __timeout__: Optional[float] = DEFAULT_TIMEOUT
+    __tracking__: bool = False
 
     # # System Variables
     # _name: str
@@ -123,40 +291,416 @@ class StateChart(metaclass=MetaStateChart):
                 log.setLevel(kwargs.pop('logging_level').upper())
         log.info('initializing statechart')
 
-        self._sessionid = UUID(
-            bytes=os.urandom(16),
-            version=4,  # pylint: disable=no-member
+        # sessions may be assigned by a runtime hosting the statechart
+        sessionid = kwargs.pop('sessionid', None)
+        self._sessionid = (
+            UUID(str(sessionid))
+            if sessionid is not None
+            else UUID(
+                bytes=os.urandom(16),
+                version=4,  # pylint: disable=no-member
+            )
         )
-
-        self.datamodel.populate()
+        SESSIONS[str(self._sessionid)] = self
+        # delayed events are delivered by the scheduler
+        scheduler = kwargs.pop('scheduler', self.__scheduler__)
+        self.__scheduler = SCHEDULER if scheduler is None else scheduler
 
         if hasattr(self.__class__, '_root'):
-            self.__root = deepcopy(self.__class__._root)
+            # copied together so that the datamodel scopes remain chained
+            self.datamodel, self.__root = deepcopy(
+                (self.__class__.datamodel, self.__class__._root)
+            )
+            self.__events = self.__class__._events
+            self.__plans = self.__class__._plans
             self._root = None
         elif 'superstate' in kwargs:
+            self.datamodel = deepcopy(self.__class__.datamodel)
             self.__root = kwargs.pop('superstate')
+            self.__events = {}
+            self.__plans = {}
         else:
             raise InvalidConfig('attempted initialization with empty parent')
+        if self.__class__.__binding__ == 'early':
+            if not self.datamodel.populated:
+                self.datamodel.populate()
+        # writes are tracked so that checkpoints hold only changed items
+        if kwargs.pop('tracking', self.__tracking__):
+            self.datamodel.tracking = True
+            for state in self.__root:
+                state.datamodel.tracking = True
+        for key, value in kwargs.pop('data', {}).items():
+            self.datamodel[key] = value
 
-        self.__current_state = self.__root
         if not isinstance(self.__root, ParallelState):
             self.__initial__: Optional[str] = kwargs.get(
                 'initial', self.__initial__
             )
-            if self.initial:
-                self.__current_state = self.get_state(
-                    self.initial
-                    # self.initial.transition.target
-                )
         log.info('loaded states and transitions')
 
+        # states resolved for dispatch by the current state and statepath
+        self.__scopes: dict[tuple[int, str], State] = {}
+
+        # internal events raised by executable content
+        self.__queue = EventQueue(self.__queue_size__)
+        self.__invoked = {}
+
+        # content of parallel regions optionally runs on an executor
+        self.__executor = kwargs.pop('executor', self.__executor__)
+        if isinstance(self.__executor, ProcessPoolExecutor):
+            raise InvalidConfig('region content requires a thread executor')
+        self.__local = threading.local()
+        # content declared as background runs on the shared pool by default
+        self.__background = kwargs.pop('background', self.__background__)
+        # content overrunning its deadline is abandoned by the watchdog
+        self.__timeout = kwargs.pop('timeout', self.__timeout__)
+        self.__watchdog = Watchdog()
+
+        # restored instances resume without entering the initial states
+        self.__checksum: Optional[int] = None
+        # processed events are appended to the journal unless replayed
+        self.__journal = kwargs.pop('journal', self.__journal__)
+        self.__replaying = kwargs.pop('replaying', False)
+        restore = kwargs.pop('restore', None)
+        if restore is None:
+            self.__start()
+        elif restore:
+            self.__resume(restore)
+        log.info('statechart initialization complete')
+
+    def __getstate__(self) -> dict[str, Any]:
+        # thread-local state of regions is recreated for copies
+        state = self.__dict__.copy()
+        state.pop('_StateChart__local', None)
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__local = threading.local()
+
+    @classmethod
+    def from_scxml(
+        cls,
+        source: Union[str, os.PathLike, bytes, IO[bytes]],
+        cache_dir: Optional[str] = scxml.CACHE_DIR,
+    ) -> Type[StateChart]:
+        """Create statechart subclass from SCXML document.
+
+        Parsed definitions are cached within ``cache_dir`` by content hash
+        once validated, or parsed every time when ``cache_dir`` is ``None``.
+        Caching is disabled by default unless ``SUPERSTATE_CACHE_DIR`` is
+        set in the environment.
+        """
+
+        return scxml.load(source, cls.__subclass, cache_dir)
+
+    @classmethod
+    def from_compiled(cls, path: Union[str, os.PathLike]) -> Type[StateChart]:
+        """Create statechart subclass from compiled definition.
+
+        Definitions are written by ``superstate.compiled.dump`` and decoded
+        from a read-only mapping of the file, which skips parsing and
+        compiling expressions while states are still built for the class.
+        """
+        return compiled.load(os.fspath(path), cls.__subclass)
+
+    @classmethod
+    def __subclass(cls, attrs: dict[str, Any]) -> Type[StateChart]:
+        name = attrs.pop('__name__', None) or cls.__name__
+        metaclass = cast(Type[MetaStateChart], type(cls))
+        return cast(Type[StateChart], metaclass(name, (cls,), attrs))
+
+    def __start(self) -> None:
+        """Enter the initial configuration of the statechart."""
+        self.__current_state = self.__root
+        if not isinstance(self.__root, ParallelState) and self.initial:
+            self.__current_state = self.get_state(
+                self.initial
+                # self.initial.transition.target
+            )
         # XXX: require composite state
         self.current_state.run_on_entry(self)
-        log.info('statechart initialization complete')
+        self.__stabilize()
+        self.__drain()
+        self.__complete()
 
-        # XXX: need to process after initial state
-        # if isinstance(self.current_state, AtomicState):
-        #     self.current_state._process_transient_state(self)
+    def __restart(self, data: dict[str, Any]) -> None:
+        """Reset released instance to the initial configuration."""
+        SESSIONS.pop(str(self._sessionid), None)
+        self._sessionid = UUID(
+            bytes=os.urandom(16),
+            version=4,  # pylint: disable=no-member
+        )
+        SESSIONS[str(self._sessionid)] = self
+        for state in self.__root:
+            state.datamodel.reset()
+            if isinstance(state, ParallelState):
+                state.current.clear()
+            elif isinstance(state, HistoryState):
+                state.clear()
+        self.datamodel.reset()
+        for key, value in data.items():
+            self.datamodel[key] = value
+        self.__queue.clear()
+        self.__stable = None
+        self.__start()
+
+    def __resume(self, dump: tuple[Any, ...]) -> None:
+        """Resume configuration previously dumped from an instance."""
+        current, regions, history, data, datamodels, queue, timers = dump
+        states = list(self.__root)
+        for position, heads in regions:
+            cast(ParallelState, states[position]).current.update(
+                (name, states[x]) for name, x in heads
+            )
+        for position, names in history:
+            cast(HistoryState, states[position]).snapshot = names
+        if data is not None:
+            self.__patch(self.datamodel, *data)
+        for position, changed, removed in datamodels:
+            self.__patch(states[position].datamodel, changed, removed)
+        self.__current_state = states[current]
+        for name in queue:
+            self.__queue.push(intern_event(name))
+        sessionid = str(self._sessionid)
+        for sendid, deadline, args in timers:
+            self.__scheduler.schedule(
+                max(0.0, deadline - self.__scheduler.clock()),
+                partial(deliver, *args),
+                key=(sessionid, sendid),
+            )
+
+    @staticmethod
+    def __patch(
+        datamodel: DataModel, changed: dict[str, Any], removed: tuple[str]
+    ) -> None:
+        values = detach(
+            {k: v for k, v in datamodel.defaults.items() if k not in removed}
+        )
+        values.update(changed)
+        datamodel.restore(values)
+
+    @staticmethod
+    def __delta(
+        datamodel: DataModel,
+    ) -> Optional[tuple[dict[str, Any], tuple[str, ...]]]:
+        """Get data items changed and removed since declared."""
+        if not datamodel.populated:
+            return None
+        defaults, values = datamodel.defaults, datamodel.maps[0]
+        changed = {
+            k: v
+            for k, v in values.items()
+            if k not in defaults or not _unchanged(v, defaults[k])
+        }
+        removed = tuple(k for k in defaults if k not in values)
+        return (changed, removed) if changed or removed else None
+
+    def _dump(self) -> tuple[Any, ...]:
+        """Get runtime state of the statechart without its definition.
+
+        States are referenced by their position within the definition, which
+        is identical for every instance of the class, together with the data
+        items changed since declared, recorded history and events pending
+        delivery. Deadlines of sent events are in seconds of the scheduler
+        clock.
+        """
+        if self.__invoked or self.__invoker is not None:
+            raise InvalidState('cannot dump statechart with invoked sessions')
+        states = list(self.__root)
+        index = {id(x): i for i, x in enumerate(states)}
+        regions, history, datamodels = [], [], []
+        for position, state in enumerate(states):
+            if isinstance(state, ParallelState) and state.current:
+                regions.append(
+                    (
+                        position,
+                        tuple(
+                            (k, index[id(v)]) for k, v in state.current.items()
+                        ),
+                    )
+                )
+            elif isinstance(state, HistoryState) and state.snapshot:
+                history.append((position, state.snapshot))
+            delta = self.__delta(state.datamodel)
+            if delta is not None:
+                datamodels.append((position, *delta))
+        timers = tuple(
+            (key[1], deadline, callback.args)
+            for key, deadline, callback in self.__scheduler.timers(
+                str(self._sessionid)
+            )
+            # delivered events are keyed by their session and send id
+            if isinstance(key, tuple)
+            and isinstance(callback, partial)
+            and callback.func is deliver
+        )
+        return (
+            index[id(self.__current_state)],
+            tuple(regions),
+            tuple(history),
+            self.__delta(self.datamodel),
+            tuple(datamodels),
+            tuple(lookup_event(x) for x in self.__queue),
+            timers,
+        )
+
+    @classmethod
+    def _restore(cls, dump: tuple[Any, ...], **kwargs: Any) -> StateChart:
+        """Create instance resuming runtime state dumped by ``_dump``."""
+        return cls(restore=dump, **kwargs)
+
+    @property
+    def __layout(self) -> int:
+        if self.__checksum is None:
+            self.__checksum = snapshot.layout(x.name for x in self.__root)
+        return self.__checksum
+
+    def snapshot(self) -> bytes:
+        """Get compact snapshot of the runtime state of the statechart.
+
+        Snapshots are restored onto the definition of the class by
+        ``restore`` and are far smaller than pickling the state tree.
+        """
+        return snapshot.dumps(self._dump(), self.__layout)
+
+    @classmethod
+    def restore(cls, content: bytes, **kwargs: Any) -> StateChart:
+        """Create instance resuming from snapshot without entering states.
+
+        The session id is not part of the snapshot and may be passed as the
+        ``sessionid`` keyword together with other statechart options.
+        """
+        chart = cls(restore=(), **kwargs)
+        chart.__resume(snapshot.loads(content, chart.__layout))
+        return chart
+
+    def checkpoint(self) -> bytes:
+        """Get data items written since the previous checkpoint.
+
+        Requires the statechart to track datamodel writes, so that only the
+        changed items are encoded instead of the whole datamodel. The first
+        checkpoint holds the items written since declared.
+        """
+        if not self.datamodel.tracking:
+            raise InvalidState('datamodel writes are not tracked')
+        datamodels = []
+        for position, state in enumerate(self.__root):
+            delta = state.datamodel.checkpoint()
+            if delta is not None:
+                datamodels.append((position, *delta))
+        return snapshot.dumps(
+            (self.datamodel.checkpoint(), tuple(datamodels)),
+            self.__layout,
+            snapshot.DELTA,
+        )
+
+    def merge(self, content: bytes) -> None:
+        """Apply checkpoint taken from another instance of the class."""
+        data, datamodels = snapshot.loads(
+            content, self.__layout, snapshot.DELTA
+        )
+        if data is not None:
+            self.datamodel.merge(*data)
+        if datamodels:
+            states = list(self.__root)
+            for position, changed, removed in datamodels:
+                states[position].datamodel.merge(changed, removed)
+
+    @classmethod
+    def _acquire(cls, **data: Any) -> StateChart:
+        """Get started instance from the pool of released instances."""
+        if cls._pool:
+            chart = cls._pool.pop()
+            chart.__restart(data)
+            return chart
+        return cls(data=data) if data else cls()
+
+    def _release(self) -> None:
+        """Terminate instance and return it to the pool of its class."""
+        for invokeid in tuple(self.__invoked):
+            self.__terminate(invokeid)
+        self.__invoker = None
+        SESSIONS.pop(str(self._sessionid), None)
+        if len(self.__class__._pool) < self.__pool_size__:
+            self.__class__._pool.append(self)
+
+    @property
+    def invoked(self) -> dict[str, StateChart]:
+        """Get child statecharts invoked by the active states."""
+        return {k: v for k, (v, _) in self.__invoked.items()}
+
+    def _invoke(self, invoke: Invoke) -> StateChart:
+        """Start child statechart for invoke."""
+        if invoke.factory is None:
+            invoke.factory = (
+                self.__lookup(invoke.src)
+                if isinstance(invoke.src, str)
+                else invoke.src
+            )
+        factory = invoke.factory
+        provider = self.datamodel.provider(self)
+        child = factory._acquire(
+            **{x.name: x.callback(provider) for x in invoke.param}
+        )
+        invokeid = cast(str, invoke.id)
+        self.__invoked[invokeid] = (child, invoke)
+        child.__invoker = (self, invokeid)
+        child.__complete()
+        return child
+
+    @staticmethod
+    def __lookup(src: str) -> Type[StateChart]:
+        """Find the statechart class named by an invoke source."""
+        name = src.lower()
+        factories = [
+            x
+            for x in lookup_subclasses(StateChart)
+            if x.__name__.lower() == name
+        ]
+        if not factories:
+            raise InvalidConfig(f"unable to find statechart {src}")
+        if len(factories) > 1:
+            raise InvalidConfig(f"ambiguous statechart name {src}")
+        return factories[0]
+
+    def _cancel_invoke(self, invoke: Invoke) -> None:
+        """Terminate child statechart when the invoking state exits."""
+        invokeid = cast(str, invoke.id)
+        self.__scheduler.cancel((str(self._sessionid), invokeid))
+        self.__terminate(invokeid)
+
+    def __terminate(self, invokeid: str) -> None:
+        entry = self.__invoked.pop(invokeid, None)
+        if entry is not None:
+            entry[0]._release()
+
+    def __complete(self) -> None:
+        """Notify invoking statechart once a final state is reached."""
+        if (
+            self.__invoker is not None
+            and self.current_state.type == 'final'
+            and self.current_state.parent is self.__root
+        ):
+            parent, invokeid = self.__invoker
+            parent.__scheduler.schedule(
+                0,
+                partial(parent.__done, invokeid),
+                key=(str(parent._sessionid), invokeid),
+            )
+
+    def __done(self, invokeid: str) -> None:
+        """Finalize completed child and dispatch its done event."""
+        entry = self.__invoked.get(invokeid)
+        if entry is None:
+            return
+        child, invoke = entry
+        if invoke.finalize is not None:
+            provider = self.datamodel.provider(self)
+            for action in invoke.finalize.content:
+                provider.handle(action, child)
+        self.__terminate(invokeid)
+        self.try_trigger(f"done.invoke.{invokeid}")
 
     def __getattr__(self, name: str) -> Any:
         # do not attempt to resolve missing dunders
@@ -183,16 +727,22 @@ class StateChart(metaclass=MetaStateChart):
     def current_state(self) -> State:
         """Return the current state."""
         # TODO: rename to head or position potentially
+        if self.__workers:
+            # content running on the executor sees the state it was run for
+            state = getattr(self.__local, 'state', None)
+            if state is not None:
+                return state
         return self.__current_state
 
     @current_state.setter
     def current_state(self, state: State) -> None:
         """Set the current state."""
-        if hasattr(self.current_state, 'states'):
-            if state in list(self.current_state.states.values()):
+        if isinstance(self.current_state, SubstateMixin):
+            if self.current_state.states.get(state.name) is state:
                 self.__current_state = state
                 return
-        if len(self.active) > 1 and self.active[1] == state:
+        # ancestors and states of parallel regions are already active
+        if any(x is state for x in self.active[1:]):
             self.__current_state = state
         else:
             raise InvalidTransition('cannot transition from final state')
@@ -228,15 +778,33 @@ class StateChart(metaclass=MetaStateChart):
 
     @property
     def active(self) -> tuple[State, ...]:
-        """Return active states."""
-        states: list[State] = []
-        parents = list(reversed(self.current_state))
-        for i, x in enumerate(parents):
-            n = i + 1
-            if not n >= len(parents) and isinstance(parents[n], ParallelState):
-                states += list((parents[n]).states)  # type: ignore
-            else:
-                states.append(x)
+        """Return active states.
+
+        States from the current state to the root come first followed by the
+        active states of any other parallel regions.
+        """
+        return self.__expand(list(reversed(self.current_state)))
+
+    @staticmethod
+    def __expand(states: list[State]) -> tuple[State, ...]:
+        """Add active states of parallel regions missing from states."""
+        chains = [tuple(states)]
+        while chains:
+            chain = chains.pop(0)
+            for state in chain:
+                if not isinstance(state, ParallelState):
+                    continue
+                for name, head in state.current.items():
+                    region = state.states[name]
+                    if any(x is region for x in chain):
+                        continue
+                    substates: list[State] = []
+                    for x in reversed(head):
+                        substates.append(x)
+                        if x is region:
+                            break
+                    states.extend(substates)
+                    chains.append(tuple(substates))
         return tuple(states)
 
     def get_relpath(self, target: str) -> str:
@@ -274,7 +842,8 @@ class StateChart(metaclass=MetaStateChart):
         else:
             s = 2 if relpath.endswith('.') else 1  # stupid black
             macrostep = relpath.split('.')[s:]
-            for microstep in macrostep:
+            last = len(macrostep) - 1
+            for i, microstep in enumerate(macrostep):
                 try:
                     if microstep == '':  # reverse
                         self.current_state.run_on_exit(self)
@@ -285,7 +854,11 @@ class StateChart(metaclass=MetaStateChart):
                     ):  # forward
                         state = self.current_state.states[microstep]
                         self.__current_state = state
-                        state.run_on_entry(self)
+                        if i < last and isinstance(state, CompoundState):
+                            # ancestors of the target skip initial states
+                            state.run_on_entry(self, descend=False)
+                        else:
+                            state.run_on_entry(self)
                     else:
                         raise InvalidPath(f"statepath not found: {statepath}")
                 except Exception as err:
@@ -303,9 +876,19 @@ class StateChart(metaclass=MetaStateChart):
 
         # general recursive search for single query
         if len(macrostep) == 1 and isinstance(state, SubstateMixin):
-            for x in list(state):
-                if x == macrostep[0]:
-                    return x
+            # prefer states nearest to the current state
+            previous: Optional[State] = None
+            for ancestor in reversed(self.current_state):
+                stack = [ancestor]
+                while stack:
+                    x = stack.pop()
+                    if x is previous:
+                        continue
+                    if x == macrostep[0]:
+                        return x
+                    if isinstance(x, SubstateMixin):
+                        stack.extend(reversed(x.states.values()))
+                previous = ancestor
         # set start point for relative lookups
         elif statepath.startswith('.'):
             relative = len(statepath) - len(statepath.lstrip('.')) - 1
@@ -342,6 +925,11 @@ class StateChart(metaclass=MetaStateChart):
         parent = self.get_state(statepath) if statepath else self.parent
         if isinstance(parent, SubstateMixin):
             parent.add_state(state)
+            # instance no longer matches the shared class definition
+            self.__events = {}
+            self.__plans = {}
+            self.__scopes = {}
+            self.__checksum = None
             log.info('added state %s', state.name)
         else:
             raise InvalidState(
@@ -364,32 +952,705 @@ class StateChart(metaclass=MetaStateChart):
         target = self.get_state(statepath) if statepath else self.parent
         if isinstance(target, AtomicState):
             target.add_transition(transition)
+            # instance no longer matches the shared class definition
+            self.__events = {}
+            self.__plans = {}
+            self.__scopes = {}
             log.info('added transition %s', transition.event)
         else:
             raise InvalidState('cannot add transition to %s', target)
 
     def get_transitions(self, event: str) -> tuple[Transition, ...]:
         """Get each transition maching event."""
-        return tuple(filter(lambda t: t.event == event, self.transitions))
+        return tuple(
+            transition
+            for state in self.active
+            if isinstance(state, TransitionMixin)
+            for transition in state.get_transition(event)
+        )
+
+    @property
+    def configuration(self) -> tuple[str, ...]:
+        """Return structural key of the active configuration."""
+        return tuple(x.name for x in self.active)
+
+    @property
+    def __descriptors(self) -> EventTrie[str]:
+        """Get event descriptors of transitions in the configuration."""
+        if self.current_state.type == 'final':
+            return EventTrie()
+        key = self.configuration
+        events = self.__events.get(key)
+        if events is None:
+            events = EventTrie(
+                (t.event, t.event) for t in self.transitions if t.event != ''
+            )
+            self.__events[key] = events
+        return events
+
+    @property
+    def allowed_events(self) -> frozenset[str]:
+        """Return event descriptors with a transition in the configuration.
+
+        This is structural availability only and guards are not evaluated. The
+        result is computed once per distinct configuration and shared between
+        instances of the same statechart.
+        """
+        return self.__descriptors.descriptors
+
+    def can_trigger(self, event: str, /, *args: Any, **kwargs: Any) -> bool:
+        """Check if event would be accepted after evaluating guards."""
+        if event not in self.__descriptors:
+            return False
+        return any(
+            t.evaluate(self, *args, **kwargs)
+            for t in self.get_transitions(event)
+        )
+
+    def __exits(
+        self, source: State, transition: Transition, active: tuple[State, ...]
+    ) -> frozenset[int]:
+        """Get active states exited by transition as indexes."""
+        if not transition.target:
+            return frozenset()
+        # resolve target relative to the source of the transition
+        current, self.__current_state = self.__current_state, source
+        try:
+            target = self.get_state(transition.target)
+        finally:
+            self.__current_state = current
+        ancestors = list(reversed(target))
+        if target is not source and any(x is source for x in ancestors):
+            domain = source if transition.type == 'internal' else source.parent
+        else:
+            domain = next(
+                (
+                    x
+                    for x in reversed(source)
+                    if x is not source and any(y is x for y in ancestors[1:])
+                ),
+                None,
+            )
+        return frozenset(
+            i
+            for i, x in enumerate(active)
+            if x is not domain
+            and (domain is None or any(y is domain for y in reversed(x)))
+        )
+
+    def __plan(
+        self, event: str, active: tuple[State, ...], scope: State
+    ) -> SelectionPlan:
+        """Precompute transition selection for event in configuration."""
+        order: dict[int, int] = {}
+        stack: list[State] = [scope]
+        while stack:
+            state = stack.pop()
+            order[id(state)] = len(order)
+            if isinstance(state, SubstateMixin):
+                stack.extend(reversed(state.states.values()))
+        index = {id(x): i for i, x in enumerate(active)}
+        parents = {id(x.parent) for x in active}
+        leaves = sorted(
+            (x for x in active if id(x) not in parents),
+            key=lambda x: order[id(x)],
+        )
+
+        candidates: dict[tuple[int, int], int] = {}
+        chains: list[tuple[int, ...]] = []
+        for leaf in leaves:
+            chain = []
+            for state in reversed(leaf):
+                if id(state) not in index:
+                    break
+                if not isinstance(state, TransitionMixin):
+                    continue
+                for j in state.match(event):
+                    chain.append(
+                        candidates.setdefault(
+                            (index[id(state)], j), len(candidates)
+                        )
+                    )
+            if chain:
+                chains.append(tuple(chain))
+
+        exits = []
+        sources = []
+        for i, j in candidates:
+            sources.append(active[i])
+            exits.append(
+                self.__exits(active[i], _candidate(active[i], j), active)
+            )
+        return SelectionPlan(
+            candidates=tuple(candidates),
+            chains=tuple(chains),
+            conflicts=tuple(
+                frozenset(
+                    d
+                    for d, other in enumerate(exits)
+                    if d != c and exited & other
+                )
+                for c, exited in enumerate(exits)
+            ),
+            preempts=tuple(
+                frozenset(
+                    d
+                    for d, other in enumerate(sources)
+                    if other is not source
+                    and any(x is other for x in reversed(source))
+                )
+                for source in sources
+            ),
+            datamodel=all(
+                isinstance(cond, Conditional)
+                and (
+                    isinstance(cond.cond, bool)
+                    or (
+                        isinstance(cond.cond, str)
+                        and not hasattr(self, cond.cond)
+                    )
+                )
+                for i, j in candidates
+                for cond in tuplize(_candidate(active[i], j).cond or ())
+            ),
+        )
+
+    def __get_plan(
+        self, event: str, active: tuple[State, ...], scope: State
+    ) -> SelectionPlan:
+        """Get selection for event shared by the configuration."""
+        key = tuple(x.name for x in active)
+        if scope is not self.root:
+            # dispatch within a state is never keyed as a configuration
+            key = ('', *key)
+        plans = self.__plans.setdefault(key, {})
+        plan = plans.get(event)
+        if plan is None:
+            plan = self.__plan(event, active, scope)
+            plans[event] = plan
+        return plan
+
+    def __select(
+        self,
+        event: str,
+        active: tuple[State, ...],
+        scope: State,
+        /,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional[tuple[tuple[State, Transition], ...]]:
+        """Select the optimal enabled transitions for event.
+
+        Transitions of descendants preempt those of their ancestors and
+        document order decides between regions of parallel states. Conflicting
+        transitions are removed so that no two selected transitions exit the
+        same state. ``None`` is returned when no transition matches the event.
+        """
+        plan = self.__get_plan(event, active, scope)
+        if not plan.candidates:
+            return None
+
+        enabled: dict[int, bool] = {}
+        selected: list[int] = []
+        for chain in plan.chains:
+            for c in chain:
+                if c not in enabled:
+                    i, j = plan.candidates[c]
+                    enabled[c] = _candidate(active[i], j).evaluate(
+                        self, *args, **kwargs
+                    )
+                if enabled[c]:
+                    if c not in selected:
+                        selected.append(c)
+                    break
+
+        filtered: list[int] = []
+        for c in selected:
+            preempted = [d for d in filtered if d in plan.conflicts[c]]
+            if all(d in plan.preempts[c] for d in preempted):
+                filtered = [d for d in filtered if d not in preempted]
+                filtered.append(c)
+        return tuple(
+            (active[i], _candidate(active[i], j))
+            for i, j in (plan.candidates[c] for c in filtered)
+        )
+
+    def __scope(self, statepath: str) -> State:
+        """Get state dispatched to by statepath."""
+        if statepath.startswith('.'):
+            return self.get_state(statepath)
+        # names are resolved nearest to the current state
+        key = (id(self.current_state), statepath)
+        state = self.__scopes.get(key)
+        if state is None:
+            state = self.get_state(statepath)
+            self.__scopes[key] = state
+        return state
+
+    def __region(self, scope: State) -> tuple[State, ...]:
+        """Get active states within scope without the whole configuration.
+
+        Parallel states only record the active state of their regions, so
+        the region containing scope is followed from the current state.
+        """
+        ancestors = tuple(reversed(scope))
+        head = self.current_state
+        while not any(x is scope for x in reversed(head)):
+            parallel = next(
+                (
+                    x
+                    for x in reversed(head)
+                    if isinstance(x, ParallelState)
+                    and any(y is x for y in ancestors)
+                ),
+                None,
+            )
+            region = next((x for x in ancestors if x.parent is parallel), None)
+            if (
+                parallel is None
+                or region is None
+                or parallel.current.get(region.name, head) is head
+            ):
+                raise InvalidState(f"state is not active: {scope.name}")
+            head = parallel.current[region.name]
+        states = []
+        for state in reversed(head):
+            states.append(state)
+            if state is scope:
+                break
+        return self.__expand(states)
+
+    def __focus(self, state: State) -> None:
+        """Move the current state into the parallel region of state."""
+        head = self.current_state
+        while isinstance(head, ParallelState) and head is not state:
+            ancestors = list(reversed(state))
+            for name in head.current:
+                if any(x is head.states[name] for x in ancestors):
+                    head = head.current.pop(name)
+                    break
+            else:
+                break
+        self.__current_state = head
+
+    def __rest(self) -> None:
+        """Record parallel regions and move to outermost parallel state."""
+        states = list(reversed(self.current_state))
+        head = states[0]
+        for child, parent in zip(states, states[1:]):
+            if isinstance(parent, ParallelState):
+                parent.current[child.name] = head
+                head = parent
+        self.__current_state = head
+
+    @property
+    def scheduler(self) -> Scheduler:
+        """Get scheduler delivering delayed events."""
+        return self.__scheduler
+
+    @property
+    def watchdog(self) -> Watchdog:
+        """Get watchdog enforcing deadlines of executable content."""
+        return self.__watchdog
+
+    @property
+    def queue(self) -> EventQueue:
+        """Get queue of internal events."""
+        if self.__workers:
+            queue = getattr(self.__local, 'queue', None)
+            if queue is not None:
+                return queue
+        return self.__queue
+
+    def _dispatch(self, task: Callable[[], T]) -> Optional[T]:
+        """Run executable content, deferring it while regions are entered."""
+        if self.__tasks is None:
+            return task()
+        state = self.__current_state
+        self.__tasks.append(partial(self.__run_task, state, task))
+        return None
+
+    def _watch(
+        self,
+        timeout: Optional[float],
+        task: Callable[[], T],
+        default: Optional[T] = None,
+    ) -> Optional[T]:
+        """Run executable content within its timeout or the chart default.
+
+        Content runs inline unless it or the statechart, through
+        ``__timeout__`` or the ``timeout`` keyword, opts into a deadline.
+        Content overrunning its deadline returns default and raises an
+        ``error.execution`` internal event instead. Python threads cannot be
+        interrupted, so abandoned content keeps running on its worker and may
+        still change the datamodel after the error event has been processed.
+        """
+        if timeout is None:
+            timeout = self.__timeout
+        if timeout is None:
+            return task()
+        if self.__workers:
+            # content sees the region it was run for from the watchdog
+            task = partial(
+                self.__run_local,
+                getattr(self.__local, 'state', None),
+                getattr(self.__local, 'queue', None),
+                task,
+            )
+        try:
+            return self.__watchdog.run(timeout, task)
+        except ExecutionTimeout:
+            self.queue.push(intern_event('error.execution'))
+            return default
+
+    def __run_local(
+        self,
+        state: Optional[State],
+        queue: Optional[EventQueue],
+        task: Callable[[], T],
+    ) -> T:
+        self.__local.state, self.__local.queue = state, queue
+        try:
+            return task()
+        finally:
+            self.__local.state = self.__local.queue = None
+
+    def __run_task(self, state: State, task: Callable[[], T]) -> T:
+        self.__local.state = state
+        try:
+            return task()
+        finally:
+            self.__local.state = None
+
+    def __run_region(
+        self, tasks: list[Callable[[], Any]], queue: EventQueue
+    ) -> list[Any]:
+        self.__local.queue = queue
+        try:
+            return [task() for task in tasks]
+        finally:
+            self.__local.queue = None
+
+    def _run_regions(self, steps: Sequence[Callable[[], Any]]) -> list[Any]:
+        """Run steps of each region with their content run concurrently.
+
+        Steps traverse the states of each region in order while executable
+        content is deferred. Once traversed the content of each region runs
+        sequentially on the executor, concurrently with the other regions,
+        and every region is joined before returning the results in region
+        order. Events raised by regions are queued in region order as well.
+        """
+        if self.__executor is None or self.__tasks is not None:
+            # nested regions run with the region containing them
+            return [step() for step in steps]
+        regions: list[list[Callable[[], Any]]] = []
+        try:
+            for step in steps:
+                self.__tasks = []
+                step()
+                regions.append(self.__tasks)
+        finally:
+            self.__tasks = None
+        queues = [EventQueue(self.__queue_size__) for _ in regions]
+        self.__workers = True
+        try:
+            futures = [
+                self.__executor.submit(self.__run_region, tasks, queue)
+                for tasks, queue in zip(regions, queues)
+            ]
+            wait(futures)
+        finally:
+            self.__workers = False
+        results = [x.result() for x in futures]
+        for queue in queues:
+            while queue:
+                self.__queue.push(queue.pop())
+        return results
+
+    def _background(
+        self, script: Script, provider: Provider, *args: Any, **kwargs: Any
+    ) -> Future:
+        """Run script on the background executor without waiting.
+
+        Once complete the result is dispatched as the event of the script,
+        or ``error.execution`` with the exception when it failed, on the next
+        turn of the scheduler.
+        """
+        executor = self.__background or background_executor()
+        if isinstance(executor, ProcessPoolExecutor):
+            # statecharts cannot be sent to other processes
+            if not callable(script.src):
+                raise InvalidConfig('only callables run in other processes')
+            future = executor.submit(script.src)
+        else:
+            future = executor.submit(
+                provider.exec, script.src, *args, **kwargs
+            )
+        sessionid, scheduler = str(self._sessionid), self.__scheduler
+
+        def complete(future: Future) -> None:
+            if future.cancelled():
+                return
+            error = future.exception()
+            if error is None:
+                event, result = script.event, future.result()
+            else:
+                event, result = 'error.execution', error
+            scheduler.call_soon(partial(deliver, sessionid, event, result))
+
+        future.add_done_callback(complete)
+        return future
+
+    def __drain(self) -> None:
+        """Process internal events before the next external event."""
+        while self.__queue:
+            self.__step(None, lookup_event(self.__queue.pop()))
+
+    def _process(
+        self, event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        """Select and execute transitions for event without raising."""
+        return self.__process(None, event, *args, **kwargs)
+
+    def __process(
+        self, scope: Optional[State], event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        try:
+            result = self.__step(scope, event, *args, **kwargs)
+            self.__drain()
+        except Exception:
+            # pending internal events are discarded with the failed step
+            self.__queue.clear()
+            # effects applied before the failure are replayed with the event
+            if self.__journal is not None and not self.__replaying:
+                self.__record(scope, event, args, kwargs)
+            raise
+        self.__complete()
+        if (
+            self.__journal is not None
+            and not self.__replaying
+            and result.outcome == 'processed'
+        ):
+            self.__record(scope, event, args, kwargs)
+        return result
+
+    def __record(
+        self,
+        scope: Optional[State],
+        event: str,
+        args: tuple[Any, ...],
+        kwargs: dict[str, Any],
+    ) -> None:
+        """Append processed event to the journal."""
+        journal = cast('Journal', self.__journal)
+        statepath = (
+            '.'.join(x.name for x in reversed(tuple(reversed(scope))))
+            if scope is not None
+            else None
+        )
+        if journal.append(self._sessionid, statepath, event, args, kwargs):
+            try:
+                journal.checkpoint(self._sessionid, self.snapshot())
+            except InvalidState as err:
+                log.warning('unable to checkpoint journal: %s', err)
+
+    @property
+    def replaying(self) -> bool:
+        """Check if events are being replayed from the journal."""
+        return self.__replaying
+
+    @classmethod
+    def replay(
+        cls, journal: Journal, sessionid: Union[str, UUID], **kwargs: Any
+    ) -> StateChart:
+        """Rebuild statechart of session from its journal.
+
+        The last snapshot of the session is restored and the events appended
+        after it are processed again. Actions with effects outside of the
+        statechart, such as sending events, are suppressed while replaying.
+        Scripts and callables are run again, so those with external effects
+        must be declared as scripts with ``replay`` false to be suppressed.
+        Events whose content raised are journaled with the effects applied
+        before the failure, and are expected to fail the same way again.
+        """
+        sessionid = UUID(str(sessionid))
+        content, events = journal.read(sessionid)
+        chart = cls(
+            sessionid=sessionid,
+            journal=journal,
+            replaying=True,
+            restore=() if content is not None else None,
+            **kwargs,
+        )
+        if content is not None:
+            chart.__resume(snapshot.loads(content, chart.__layout))
+        for _, statepath, event, args, params in events:
+            scope = chart.__scope(statepath) if statepath else None
+            try:
+                chart.__process(scope, event, *args, **params)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                log.error('failed replaying event %s: %s', event, err)
+        chart.__replaying = False
+        return chart
+
+    def __step(
+        self, scope: Optional[State], event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        """Process single event followed by any eventless transitions.
+
+        Only transitions of the active states within ``scope`` are selected
+        when provided.
+        """
+        if self.current_state.type == 'final':
+            return TriggerResult(event, 'unhandled')
+        if scope is not None:
+            active = self.__region(scope)
+        elif event and event not in self.__descriptors:
+            return TriggerResult(event, 'unhandled')
+        else:
+            scope, active = self.root, self.active
+        selected = self.__select(event, active, scope, *args, **kwargs)
+        if selected is None:
+            return TriggerResult(event, 'unhandled')
+        if not selected:
+            return TriggerResult(event, 'blocked')
+        results = self.__microstep(selected, *args, **kwargs)
+        self.__stabilize()
+        return TriggerResult(
+            event, 'processed', tuple(x for _, x in selected), results
+        )
+
+    def __microstep(
+        self,
+        selected: tuple[tuple[State, Transition], ...],
+        *args: Any,
+        **kwargs: Any,
+    ) -> Optional[list[Any]]:
+        """Execute selected transitions."""
+        results: Optional[list[Any]] = None
+        for source, transition in selected:
+            log.info('processed guard for %s', transition.event)
+            self.__focus(source)
+            result = transition.execute(self, *args, **kwargs)
+            self.__rest()
+            if result is not None:
+                results = (results or []) + result
+            log.info('processed transition event %s', transition.event)
+        return results
+
+    @property
+    def __version(self) -> int:
+        """Get revision of the datamodels within the configuration."""
+        return self.datamodel.version + sum(
+            x.datamodel.version for x in self.active
+        )
+
+    def __settled(self, source: State, transition: Transition) -> bool:
+        """Check if transition would neither run content nor change state."""
+        if transition.content:
+            return False
+        if not transition.target:
+            return True
+        self.__focus(source)
+        try:
+            target = self.get_state(transition.target)
+        finally:
+            self.__rest()
+        return any(x is target for x in self.active)
+
+    def __stabilize(self) -> None:
+        """Process eventless transitions until the configuration is stable.
+
+        Eventless transitions are taken iteratively as microsteps, except
+        those without content targeting states that are already active. Guards
+        that only depend on the datamodel are not evaluated again when neither
+        the configuration nor the datamodel has changed, which also detects
+        cycles that would otherwise repeat until the limit is reached.
+        Executable content is assumed to change the datamodel, since data
+        items may be mutated in place.
+        """
+        visited: set[tuple[tuple[str, ...], int]] = set()
+        for _ in range(self.__eventless_limit__):
+            if self.current_state.type == 'final':
+                return
+            active = self.active
+            plan = self.__get_plan('', active, self.root)
+            if not plan.candidates:
+                return
+            key = (tuple(x.name for x in active), self.__version)
+            if plan.datamodel:
+                if key == self.__stable:
+                    return
+                if key in visited:
+                    raise InvalidTransition(
+                        'cycle detected within eventless transitions'
+                    )
+                visited.add(key)
+            selected = self.__select('', active, self.root)
+            if selected:
+                selected = tuple(x for x in selected if not self.__settled(*x))
+            if not selected:
+                self.__stable = key
+                return
+            self.__microstep(selected)
+        raise InvalidTransition(
+            f"exceeded {self.__eventless_limit__} eventless transitions"
+        )
 
     def trigger(self, event: str, /, *args: Any, **kwargs: Any) -> None:
         """Transition from event to target state."""
         # TODO: need to consider superstate transitions.
         if self.current_state.type == 'final':
             raise InvalidTransition('cannot transition from final state')
-
-        transitions = self.get_transitions(event)
-        if not transitions:
+        result = self._process(event, *args, **kwargs)
+        if result.outcome == 'unhandled':
             raise InvalidTransition('no transitions match event')
-        allowed = [t for t in transitions if t.evaluate(self, *args, **kwargs)]
-        if not allowed:
+        if result.outcome == 'blocked':
             raise ConditionNotSatisfied(
                 'Condition is not satisfied for this transition'
             )
-        if len(allowed) > 1:
+
+    def trigger_at(
+        self, statepath: str, event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        """Transition from event dispatched only to an active state.
+
+        Transitions are selected from the state at statepath and its active
+        descendants, such as a single region of a parallel state, instead of
+        the whole configuration.
+        """
+        scope = self.__scope(statepath)
+        if self.current_state.type == 'final':
+            raise InvalidTransition('cannot transition from final state')
+        result = self.__process(scope, event, *args, **kwargs)
+        if result.outcome == 'unhandled':
             raise InvalidTransition(
-                'More than one transition was allowed for this event'
+                f"no transitions match event within {statepath}"
             )
-        log.info('processed guard for %s', allowed[0].event)
-        allowed[0].execute(self, *args, **kwargs)
-        log.info('processed transition event %s', allowed[0].event)
+        if result.outcome == 'blocked':
+            raise ConditionNotSatisfied(
+                'Condition is not satisfied for this transition'
+            )
+        return result
+
+    def try_trigger(
+        self, event: str, /, *args: Any, **kwargs: Any
+    ) -> TriggerResult:
+        """Transition from event and return the outcome instead of raising.
+
+        Failures within guards or executable content are returned with an
+        ``error`` outcome and dispatched as an ``error.execution`` event.
+        """
+        try:
+            return self._process(event, *args, **kwargs)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            log.error('failed processing event %s: %s', event, err)
+            if event != 'error.execution':
+                self.__queue.push(intern_event('error.execution'))
+                try:
+                    self.__drain()
+                # pylint: disable-next=broad-exception-caught
+                except Exception as exc:
+                    log.error('failed processing error.execution: %s', exc)
+                    self.__queue.clear()
+            return TriggerResult(event, 'error', error=err)
@@ -11,4 +11,5 @@ from superstate.model.action import (
     Raise,
     Script,
 )
+from superstate.model.communication import Cancel, Send
 from superstate.model.data import Data, DataModel, DoneData
@@ -4,18 +4,20 @@ from __future__ import annotations
 
 import logging
 import logging.config
-from collections.abc import Callable
-from dataclasses import InitVar, asdict, dataclass
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import InitVar, dataclass
+from itertools import islice
 from typing import TYPE_CHECKING, Any, Optional, Sequence, Union
 
-from superstate.config import LOGGING_CONFIG
+from superstate.config import DEFAULT_BATCH_SIZE, LOGGING_CONFIG
+from superstate.exception import InvalidConfig
 from superstate.model.base import Action, Conditional
+from superstate.queue import intern_event
 from superstate.types import Expression
 
 if TYPE_CHECKING:
     from superstate.provider import Provider
     from superstate.model.base import ExecutableContent
-    from superstate.model.system import Event
 
 logging.config.dictConfig(LOGGING_CONFIG)
 log = logging.getLogger(__name__)
@@ -33,46 +35,80 @@ class Assign(Action):
         kwargs['__mode__'] = 'single'
         result = provider.exec(self.expr, *args, **kwargs)
 
-        if self.location in provider.ctx.current_state.datamodel.keys():
-            provider.ctx.current_state.datamodel[self.location] = result
-        elif (
-            self.location in provider.ctx.datamodel.keys()
-            or self.location in asdict(provider.ctx.datamodel).keys()
-        ):
-            provider.ctx.datamodel[self.location] = result
-        else:
+        # resolved through the scopes visible from the current state
+        datamodel = provider.ctx.current_state.datamodel
+        if self.location not in datamodel:
             raise AttributeError(
                 f"unable to set missing datamodel attribute: {self.location}"
             )
+        datamodel[self.location] = result
 
 
 @dataclass
 class ForEach(Action):
-    """Data item providing state data."""
+    """Data item providing state data.
+
+    Items are streamed from any iterable without being materialized. Actions
+    declared as vectorized receive each chunk of ``batch`` items, or the whole
+    array when it supports slicing and no batch is given, while other actions
+    are dispatched for each item of the chunk.
+    """
 
     content: InitVar[list[str]]
     array: str
     item: str
     index: Optional[str] = None  # expression
+    batch: Optional[int] = None
 
     def __post_init__(self, content: list[str]) -> None:
         self.__content = [Action.create(x) for x in content]  # type: ignore
+        if self.batch is not None and self.batch < 1:
+            raise InvalidConfig('foreach batch must be a positive integer')
+
+    def __chunks(self, array: Any) -> Iterator[tuple[int, Any]]:
+        if not isinstance(array, Mapping) and hasattr(array, '__getitem__'):
+            try:
+                size = len(array)
+            except TypeError:
+                size = None
+            if size is not None:
+                # slicing provides views of array-like data such as numpy
+                step = self.batch or size or 1
+                for start in range(0, size, step):
+                    yield start, array[start : start + step]
+                return
+        iterator = iter(array)
+        start = 0
+        while True:
+            chunk = tuple(islice(iterator, self.batch or DEFAULT_BATCH_SIZE))
+            if not chunk:
+                return
+            yield start, chunk
+            start += len(chunk)
 
     def callback(self, provider: Provider, *args: Any, **kwargs: Any) -> None:
         """Provide callback from datamodel provider."""
-        array = provider.ctx.current_state.datamodel[self.array]
-        if array:
-            for index, item in enumerate(array):
-                for expr in self.__content:
+        datamodel = provider.ctx.current_state.datamodel
+        array = datamodel[self.array] if self.array in datamodel else None
+        if array is None:
+            raise AttributeError(
+                'unable to iterate missing datamodel attribute.', self.array
+            )
+        for start, chunk in self.__chunks(array):
+            for expr in self.__content:
+                if getattr(expr, 'vectorized', False):
+                    if self.index:
+                        kwargs[self.index] = start
+                    if self.item:
+                        kwargs[self.item] = chunk
+                    provider.handle(expr, *args, **kwargs)
+                    continue
+                for index, item in enumerate(chunk, start):
                     if self.index:
                         kwargs[self.index] = index
                     if self.item:
                         kwargs[self.item] = item
                     provider.handle(expr, *args, **kwargs)
-        else:
-            raise AttributeError(
-                'unable to iterate missing datamodel attribute.', self.array
-            )
 
 
 @dataclass
@@ -82,6 +118,7 @@ class Log(Action):
     expr: Expression
     label: str = ''
     level: Union[int, str] = 'debug'
+    replayed = False
 
     # def __post_init__(self) -> None:
     #     self.__log = logging.getLogger(self.label or provider.ctx.__name__)
@@ -99,11 +136,14 @@ class Log(Action):
 class Raise(Action):
     """Data item providing state data."""
 
-    event: Event
+    event: str
+
+    def __post_init__(self) -> None:
+        self.__id = intern_event(self.event)
 
     def callback(self, provider: Provider, *args: Any, **kwargs: Any) -> None:
         """Provide callback from datamodel provider."""
-        kwargs['__mode__'] = 'single'
+        provider.ctx.queue.push(self.__id)
 
 
 @dataclass
@@ -113,6 +153,30 @@ class Script(Action):
     # XXX: src is also URI
     # XXX: should include buffer or replace string
     src: Union[Callable, str]
+    # receives whole chunks when run within foreach
+    vectorized: bool = False
+    # runs on the background executor and reports completion as an event
+    background: bool = False
+    id: Optional[str] = None
+    # deadline overriding the default of the statechart
+    timeout: Optional[float] = None
+    # scripts with effects outside the statechart opt out of replay
+    replay: bool = True
+
+    @property
+    def replayed(self) -> bool:  # type: ignore
+        """Check if run when replaying.
+
+        Scripts are run again to rebuild the datamodel unless declared with
+        ``replay`` false, such as those calling external services, or run in
+        the background, since their completion is not journaled.
+        """
+        return self.replay and not self.background
+
+    @property
+    def event(self) -> str:
+        """Get event raised when run in the background completes."""
+        return f"done.script.{self.id}" if self.id else 'done.script'
 
     def callback(
         self, provider: Provider, *args: Any, **kwargs: Any
@@ -120,6 +184,8 @@ class Script(Action):
         """Provide callback from datamodel provider."""
         # need ability to download src URI
         kwargs['__mode__'] = 'exec'
+        if self.background:
+            return provider.ctx._background(self, provider, *args, **kwargs)
         return provider.exec(self.src, *args, **kwargs)
 
 
@@ -135,11 +201,29 @@ class If(Conditional):
     def callback(
         self, provider: Provider, *args: Any, **kwargs: Any
     ) -> Optional[Any]:
-        """Provide callback from datamodel provider."""
+        """Provide callback from datamodel provider.
+
+        Elseif and else branches within the content are only run when the
+        conditions before them do not hold. A branch is selected before its
+        content runs, so content changing a condition never runs another.
+        """
+        results = None
+        content: Sequence[ExecutableContent] = []
         if provider.eval(self.cond, *args, **kwargs):
-            for action in self.content:
-                return provider.handle(action, *args, **kwargs)
-        return None
+            content = [
+                x for x in self.content if not isinstance(x, (ElseIf, Else))
+            ]
+        else:
+            for branch in self.content:
+                if isinstance(branch, Else) or (
+                    isinstance(branch, ElseIf)
+                    and provider.eval(branch.cond, *args, **kwargs)
+                ):
+                    content = branch.content
+                    break
+        for action in content:
+            results = provider.handle(action, *args, **kwargs)
+        return results
 
 
 @dataclass
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from types import CodeType
 from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
 
 from superstate.exception import InvalidConfig
@@ -16,6 +17,9 @@ if TYPE_CHECKING:
 class ExecutableContent:
     """Baseclass for expressions."""
 
+    # content with effects outside the statechart is skipped when replaying
+    replayed = True
+
     @classmethod
     def create(
         cls, settings: Union[ExecutableContent, Callable, Dict[str, Any]]
@@ -57,6 +61,9 @@ class Action(ExecutableContent):
             for Subclass in lookup_subclasses(cls):
                 if Subclass.__name__.lower() == 'script':
                     return Subclass(settings)  # type: ignore
+        if isinstance(settings, dict):
+            # conditional content such as if is also valid as an action
+            return ExecutableContent.create(settings)
         return super().create(settings)
 
 
@@ -71,7 +78,7 @@ class Conditional(ExecutableContent):
         cls, settings: Union[ExecutableContent, Callable, Dict[str, Any]]
     ) -> ExecutableContent:
         """Create state from configuration."""
-        if isinstance(settings, (bool, str)) or callable(settings):
+        if isinstance(settings, (bool, str, CodeType)) or callable(settings):
             return cls(settings)  # type: ignore
         return super().create(settings)
 
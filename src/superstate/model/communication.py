@@ -1,6 +1,21 @@
 """Provide common types for statechart components."""
 
-from dataclasses import dataclass
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Optional, Sequence, Type, Union
+from uuid import uuid4
+
+from superstate.exception import InvalidAction, InvalidConfig
+from superstate.model.base import Action, ExecutableContent
+from superstate.queue import intern_event
+from superstate.scheduler import HIBERNATED, SESSIONS, deliver
+from superstate.utils import to_seconds, tuplize
+
+if TYPE_CHECKING:
+    from superstate.machine import StateChart
+    from superstate.provider import Provider
 
 # from typing import Any, ClassVar, Optional, Sequence, Type, Union
 # from urllib.request import urlopen
@@ -10,30 +25,123 @@ from dataclasses import dataclass
 
 
 @dataclass
-class Cancel:
-    """Data item providing state data."""
+class Cancel(Action):
+    """Cancel delayed event sent by the current session."""
+
+    sendid: str
+    replayed = False
+
+    def callback(self, provider: Provider, *args: Any, **kwargs: Any) -> None:
+        """Provide callback from datamodel provider."""
+        provider.ctx.scheduler.cancel(
+            (str(provider.ctx._sessionid), self.sendid)
+        )
 
 
 @dataclass
 class Finalize:
-    """Data item providing state data."""
+    """Content run by the invoking statechart when the child completes."""
 
+    content: Sequence[ExecutableContent]
 
-@dataclass
-class Invoke:
-    """Data item providing state data."""
+    def __post_init__(self) -> None:
+        self.content = [Action.create(x) for x in tuplize(self.content)]
 
 
 @dataclass
 class Param:
     """Data model providing para data for external services."""
 
+    name: str
+    expr: Optional[Any] = None  # value expression
+    location: Optional[str] = None  # locaiton expression
 
-#     name: str
-#     expr: Optional[Any] = None  # value expression
-#     location: Optional[str] = None  # locaiton expression
+    def callback(self, provider: Provider) -> Any:
+        """Provide callback from datamodel provider."""
+        if self.location is not None:
+            return provider.ctx.current_state.datamodel[self.location]
+        return provider.exec(self.expr, __mode__='single')
 
 
 @dataclass
-class Send:
-    """Data item providing state data."""
+class Invoke:
+    """Child statechart run while the invoking state is active.
+
+    Child instances are recycled from a pool kept by the statechart class.
+    Params initialize the datamodel of the child, and ``done.invoke.<id>`` is
+    sent to the invoking statechart once the child reaches a final state.
+    """
+
+    src: Union[Type[StateChart], str]
+    id: Optional[str] = None
+    param: Sequence[Param] = ()
+    finalize: Optional[Finalize] = None
+    # statechart class resolved from the source on first invocation
+    factory: Optional[Type[StateChart]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.id is None:
+            self.id = uuid4().hex
+        self.param = [
+            x if isinstance(x, Param) else Param(**x) for x in self.param
+        ]
+        if self.finalize is not None and not isinstance(
+            self.finalize, Finalize
+        ):
+            self.finalize = Finalize(self.finalize)
+
+    @classmethod
+    def create(cls, settings: Union[Invoke, dict]) -> Invoke:
+        """Create invoke from configuration."""
+        if isinstance(settings, Invoke):
+            return settings
+        if isinstance(settings, dict):
+            return cls(**settings)
+        raise InvalidConfig('could not find a valid invoke configuration')
+
+
+@dataclass
+class Send(Action):
+    """Send event to this or another session after an optional delay.
+
+    The target is either ``#_internal``, ``#_scxml_<sessionid>`` or omitted
+    for the current session. Delays are seconds or CSS durations such as
+    ``500ms`` and delivery is driven by the statechart's scheduler.
+    """
+
+    event: str
+    target: Optional[str] = None
+    delay: Union[float, str] = 0
+    id: Optional[str] = None
+
+    @property
+    def replayed(self) -> bool:  # type: ignore
+        """Check if run when replaying, which only internal events are."""
+        return self.target == '#_internal'
+
+    def callback(self, provider: Provider, *args: Any, **kwargs: Any) -> str:
+        """Provide callback from datamodel provider."""
+        ctx = provider.ctx
+        sendid = self.id or uuid4().hex
+        delay = to_seconds(self.delay)
+        if self.target == '#_internal':
+            if delay:
+                raise InvalidAction('internal events cannot be delayed')
+            ctx.queue.push(intern_event(self.event))
+            return sendid
+        if self.target is None:
+            sessionid = str(ctx._sessionid)
+        elif self.target.startswith('#_scxml_'):
+            sessionid = self.target[8:]
+            if sessionid not in SESSIONS and sessionid not in HIBERNATED:
+                raise InvalidAction(f"unable to find target {self.target}")
+        else:
+            raise InvalidAction(f"unsupported send target {self.target}")
+        ctx.scheduler.schedule(
+            delay,
+            partial(deliver, sessionid, self.event),
+            key=(str(ctx._sessionid), sendid),
+        )
+        return sendid
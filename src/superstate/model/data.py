@@ -2,23 +2,23 @@
 
 from __future__ import annotations
 
-import json
 from collections import ChainMap
 from dataclasses import InitVar, dataclass
-from mimetypes import guess_type
 from typing import (
     TYPE_CHECKING,
     Any,
     ClassVar,
+    Iterator,
     Optional,
     # Sequence,
     Type,
     Union,
 )
-from urllib.request import urlopen
 
 from superstate.provider import Default
 from superstate.exception import InvalidConfig, SuperstateException
+from superstate.model.source import SOURCES
+from superstate.utils import detach
 
 # from superstate.utils import lookup_subclasses
 
@@ -68,16 +68,8 @@ class Data:
             # TODO: use action or script specified in datamodel
             self.__value = self.expr
         if self.src:
-            content_type, _ = guess_type(self.src)
-            if self.src.lower().startswith('http'):
-                with urlopen(self.src) as rsp:  # nosec
-                    content = rsp.read()
-                    if content_type == 'application/json':
-                        self.__value = json.loads(content)
-                    else:
-                        raise InvalidConfig('data is unsupported type')
-            else:
-                raise InvalidConfig('data is unsupported type')
+            # sources are shared and revalidated across datamodels
+            self.__value = SOURCES.load(self.src)
         return self.__value
 
 
@@ -86,12 +78,28 @@ class DataModel(ChainMap):
     """Instantiate state types from class metadata."""
 
     data: list[Data]
-    binding: ClassVar[str] = 'early'
     provider: ClassVar[Type[Provider]] = Default
 
     def __post_init__(self) -> None:
         """Validate the data object."""
         self.__parent: Optional[State] = None
+        self.__scope: Optional[DataModel] = None
+        super().__init__()
+        # binding is assigned per statechart
+        self.binding = 'early'
+        self.populated = False
+        # incremented on each write to detect datamodel changes
+        self.version = 0
+        # variables written since the last checkpoint when tracked
+        self.tracking = False
+        self.__dirty: set[str] = set()
+        # resolution of each variable to the datamodel declaring it
+        self.__index: dict[str, DataModel] = {}
+        self.__indexed = -1
+        # shared by chained datamodels to invalidate the indexes
+        self.__layout = [0]
+        # declared values, copied once when first bound
+        self.__defaults: Optional[dict[str, Any]] = None
         # self.__provider: Optional[Provider] = None
 
     @classmethod
@@ -121,9 +129,154 @@ class DataModel(ChainMap):
         else:
             raise SuperstateException('cannot change parent for state')
 
+    @property
+    def scope(self) -> Optional[DataModel]:
+        """Get datamodel of the enclosing scope."""
+        return self.__scope
+
+    @scope.setter
+    def scope(self, datamodel: DataModel) -> None:
+        if self.__scope is None:
+            self.__scope = datamodel
+            self.__layout = datamodel.__layout
+            self.__layout[0] += 1
+        else:
+            raise SuperstateException('cannot change scope for datamodel')
+
+    @property
+    def index(self) -> dict[str, DataModel]:
+        """Get datamodel declaring each variable visible from this scope.
+
+        Variables of datamodels not yet bound are indexed by their declared
+        ids, so that scopes are only bound once their variables are used.
+        """
+        if self.__indexed != self.__layout[0]:
+            index = dict(self.__scope.index) if self.__scope else {}
+            names = (
+                self.maps[0] if self.populated else (x.id for x in self.data)
+            )
+            index.update(dict.fromkeys(names, self))
+            self.__index = index
+            self.__indexed = self.__layout[0]
+        return self.__index
+
+    def __bind(self) -> None:
+        # late bound data is evaluated on first access
+        if not self.populated:
+            self.populate()
+
+    def __bool__(self) -> bool:
+        return bool(self.index)
+
+    def __getitem__(self, key: str) -> Any:
+        owner = self.index.get(key)
+        if owner is None:
+            return self.__missing__(key)
+        owner.__bind()
+        return owner.maps[0][key]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # variables are assigned within the scope declaring them
+        owner = self.index.get(key, self)
+        owner.__bind()
+        if key not in owner.maps[0]:
+            self.__layout[0] += 1
+        owner.maps[0][key] = value
+        owner.version += 1
+        if owner.tracking:
+            owner.__dirty.add(key)
+
+    def __delitem__(self, key: str) -> None:
+        self.__bind()
+        super().__delitem__(key)
+        self.__layout[0] += 1
+        self.version += 1
+        if self.tracking:
+            self.__dirty.add(key)
+
+    def reset(self) -> None:
+        """Discard the data items so that they are bound again."""
+        if self.tracking:
+            self.__dirty.update(self.maps[0], (x.id for x in self.data))
+        self.populated = False
+        super().__init__()
+        self.__layout[0] += 1
+        self.version += 1
+        if self.binding == 'early':
+            self.populate()
+
+    @property
+    def defaults(self) -> dict[str, Any]:
+        """Get declared values of the data items.
+
+        Values are evaluated, and sources loaded, only once. They are kept
+        apart from the data items so that values mutated in place still
+        differ from their defaults, and must not be mutated themselves.
+        """
+        if self.__defaults is None:
+            self.__defaults = detach({x.id: x.value for x in self.data})
+        return self.__defaults
+
+    def restore(self, values: dict[str, Any]) -> None:
+        """Replace the data items with those previously dumped."""
+        if self.tracking:
+            self.__dirty.update(self.maps[0], values)
+        self.populated = True
+        super().__init__(dict(values))
+        self.__layout[0] += 1
+        self.version += 1
+
+    @property
+    def dirty(self) -> frozenset[str]:
+        """Get variables written since the last checkpoint."""
+        return frozenset(self.__dirty)
+
+    def checkpoint(self) -> Optional[tuple[dict[str, Any], tuple[str, ...]]]:
+        """Get data items changed and removed since the last checkpoint.
+
+        Only writes through the datamodel are tracked, so values mutated in
+        place must be assigned again to be part of the delta.
+        """
+        if not self.__dirty:
+            return None
+        self.__bind()
+        values = self.maps[0]
+        changed = {k: values[k] for k in self.__dirty if k in values}
+        removed = tuple(k for k in self.__dirty if k not in values)
+        self.__dirty.clear()
+        return changed, removed
+
+    def merge(self, changed: dict[str, Any], removed: tuple[str, ...]) -> None:
+        """Apply data items changed and removed by a checkpoint."""
+        self.__bind()
+        values = self.maps[0]
+        if any(k not in values for k in changed) or removed:
+            self.__layout[0] += 1
+        values.update(changed)
+        for key in removed:
+            values.pop(key, None)
+        self.version += 1
+        if self.tracking:
+            self.__dirty.update(changed, removed)
+
     def populate(self) -> None:
         """Populate the data items for the datamodel."""
-        super().__init__({x.id: x.value for x in self.data})
+        # marked first so that reads while evaluating do not recurse
+        self.populated = True
+        if self.__defaults is None:
+            SOURCES.prefetch(x.src for x in self.data if x.src)
+        super().__init__(detach(self.defaults))
+        self.__layout[0] += 1
+        self.version += 1
 
 
 @dataclass
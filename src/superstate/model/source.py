@@ -0,0 +1,178 @@
+"""Provide shared loading of data sources referenced by URI."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from mimetypes import guess_type
+from typing import Any, Iterable, Optional
+from urllib.error import HTTPError
+from urllib.parse import urlparse
+from urllib.request import Request, url2pathname, urlopen
+
+from superstate.exception import InvalidConfig
+
+# content types given when servers do not know the type of the content
+GENERIC_TYPES = (None, 'text/plain', 'application/octet-stream')
+
+
+@dataclass
+class Source:
+    """Cached content of a data source."""
+
+    content: bytes
+    content_type: Optional[str]
+    expires: float
+    etag: Optional[str] = None
+    modified: Optional[str] = None
+
+
+class SourceCache:
+    """Provide bounded cache of data sources keyed by URI.
+
+    Entries are reused until their TTL expires and then revalidated using
+    ``ETag`` and ``Last-Modified`` validators for HTTP or the modification time
+    for local files. The least recently used entry is evicted once ``maxsize``
+    is exceeded. Content is decoded on each load, so that every datamodel
+    receives its own value.
+    """
+
+    def __init__(
+        self, maxsize: int = 128, ttl: float = 300.0, timeout: float = 30.0
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timeout = timeout
+        self.__entries: OrderedDict[str, Source] = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __contains__(self, uri: object) -> bool:
+        return uri in self.__entries
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def decode(uri: str, content: bytes, content_type: Optional[str]) -> Any:
+        """Decode content of data source.
+
+        Content without a specific type, such as JSON served as plain text,
+        is decoded by the type guessed from its URI.
+        """
+        if content_type in GENERIC_TYPES:
+            content_type = guess_type(uri)[0] or content_type
+        if content_type and 'json' in content_type:
+            return json.loads(content) if content else None
+        raise InvalidConfig('data is unsupported type')
+
+    def __fetch_file(self, uri: str, cached: Optional[Source]) -> Source:
+        path = url2pathname(urlparse(uri).path)
+        modified = str(os.stat(path).st_mtime_ns)
+        if cached is not None and cached.modified == modified:
+            return Source(
+                cached.content,
+                cached.content_type,
+                time.monotonic() + self.ttl,
+                None,
+                modified,
+            )
+        with open(path, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                content = b''
+            else:
+                with mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                ) as buffer:
+                    content = buffer[:]
+        # validated before being cached
+        self.decode(uri, content, None)
+        return Source(
+            content, None, time.monotonic() + self.ttl, None, modified
+        )
+
+    def __fetch_url(self, uri: str, cached: Optional[Source]) -> Source:
+        request = Request(uri)
+        if cached is not None:
+            if cached.etag:
+                request.add_header('If-None-Match', cached.etag)
+            if cached.modified:
+                request.add_header('If-Modified-Since', cached.modified)
+        try:
+            with urlopen(request, timeout=self.timeout) as rsp:  # nosec
+                content = rsp.read()
+                content_type = rsp.headers.get_content_type()
+                self.decode(uri, content, content_type)
+                return Source(
+                    content,
+                    content_type,
+                    time.monotonic() + self.ttl,
+                    rsp.headers.get('ETag'),
+                    rsp.headers.get('Last-Modified'),
+                )
+        except HTTPError as err:
+            if err.code == 304 and cached is not None:
+                return Source(
+                    cached.content,
+                    cached.content_type,
+                    time.monotonic() + self.ttl,
+                    cached.etag,
+                    cached.modified,
+                )
+            raise
+
+    def load(self, uri: str) -> Any:
+        """Retrieve content of data source."""
+        with self.__lock:
+            cached = self.__entries.get(uri)
+            if cached is not None:
+                self.__entries.move_to_end(uri)
+                if cached.expires > time.monotonic():
+                    return self.decode(
+                        uri, cached.content, cached.content_type
+                    )
+        scheme = urlparse(uri).scheme.lower()
+        if scheme == 'file':
+            entry = self.__fetch_file(uri, cached)
+        elif scheme in ('http', 'https'):
+            entry = self.__fetch_url(uri, cached)
+        else:
+            raise InvalidConfig('data is unsupported type')
+        with self.__lock:
+            self.__entries[uri] = entry
+            self.__entries.move_to_end(uri)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+        return self.decode(uri, entry.content, entry.content_type)
+
+    def prefetch(
+        self, uris: Iterable[str], workers: Optional[int] = None
+    ) -> None:
+        """Load each distinct data source concurrently."""
+        pending = [
+            x
+            for x in dict.fromkeys(uris)
+            if x not in self.__entries
+            or self.__entries[x].expires <= time.monotonic()
+        ]
+        if len(pending) > 1:
+            with ThreadPoolExecutor(
+                max_workers=workers or min(len(pending), 8)
+            ) as executor:
+                for _ in executor.map(self.load, pending):
+                    pass
+        elif pending:
+            self.load(pending[0])
+
+    def clear(self) -> None:
+        """Remove all cached data sources."""
+        with self.__lock:
+            self.__entries.clear()
+
+
+SOURCES = SourceCache()
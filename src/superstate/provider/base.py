@@ -2,8 +2,9 @@
 
 import re
 from abc import ABC, abstractmethod  # pylint: disable=no-name-in-module
+from collections import ChainMap
 from collections.abc import Callable
-from functools import singledispatchmethod
+from functools import partial, singledispatchmethod
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -68,17 +69,16 @@ class Provider(ABC):
         # pylint: disable=import-outside-toplevel
         from datetime import datetime
 
-        glb = dict(self.ctx.datamodel)
-        glb['__builtins__'] = {}
-        glb['datetime'] = datetime
-        return glb
+        return {'__builtins__': {}, 'datetime': datetime}
 
     @property
-    def locals(self) -> dict[str, Any]:
-        """Get local attributes and methods available for eval and exec."""
-        lcl = dict(self.ctx.current_state.datamodel)
-        lcl['In'] = self.In
-        return lcl
+    def locals(self) -> ChainMap[str, Any]:
+        """Get local attributes and methods available for eval and exec.
+
+        Variables are resolved through the scope of the current state, which
+        indexes the datamodel declaring each of them.
+        """
+        return ChainMap({'In': self.In}, self.ctx.current_state.datamodel)
 
     def In(self, expr: str) -> bool:
         """Evaluate condition to determine if transition should occur."""
@@ -118,5 +118,14 @@ class Provider(ABC):
     def handle(
         self, expr: 'ExecutableContent', *args: Any, **kwargs: Any
     ) -> Optional[Any]:
-        """Accept callbacks for executable content."""
-        return expr.callback(self, *args, **kwargs)
+        """Accept callbacks for executable content.
+
+        Callbacks with a timeout, or a default timeout of the statechart, are
+        run by the watchdog of the statechart.
+        """
+        if not expr.replayed and self.ctx.replaying:
+            return None
+        return self.ctx._watch(
+            getattr(expr, 'timeout', None),
+            partial(expr.callback, self, *args, **kwargs),
+        )
@@ -3,6 +3,7 @@
 import inspect
 from collections.abc import Callable
 from functools import singledispatchmethod
+from types import CodeType
 from typing import Any, Optional, Union
 
 # from superstate.exception import InvalidAction  # InvalidConfig
@@ -28,6 +29,15 @@ class Default(Provider):
             return expr(*args, **kwargs)
         return expr()
 
+    def __namespace(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        # names within comprehensions and lambdas are only resolved from
+        # globals, so variables are resolved into a single namespace with
+        # event data visible ahead of the datamodel
+        namespace = self.globals
+        namespace.update(self.locals)
+        namespace.update(kwargs)
+        return namespace
+
     @singledispatchmethod
     def eval(
         self,
@@ -63,7 +73,13 @@ class Default(Provider):
             return to_bool(guard)
         code = compile(expr, '<string>', 'eval')
         # pylint: disable-next=eval-used
-        return eval(code, self.globals, self.locals)  # nosec
+        return eval(code, self.__namespace(kwargs))  # nosec
+
+    @eval.register
+    def _(self, expr: CodeType, *args: Any, **kwargs: Any) -> bool:
+        """Evaluate precompiled condition of a compiled definition."""
+        # pylint: disable-next=eval-used
+        return eval(expr, self.__namespace(kwargs))  # nosec
 
     @singledispatchmethod
     def exec(
@@ -103,8 +119,20 @@ class Default(Provider):
         mode = kwargs.pop('__mode__', 'single')
         if hasattr(self.ctx, expr):
             return self.__call(getattr(self.ctx, expr), *args, **kwargs)
-        values = self.locals.copy()
+        values = self.__namespace(kwargs)
         values['__results__'] = None
         code = compile(f"__results__ = {expr}", '<string>', mode)
-        exec(code, self.globals, values)  # pylint: disable=exec-used  # nosec
+        exec(code, values)  # pylint: disable=exec-used  # nosec
         return values['__results__']
+
+    @exec.register
+    def _(
+        self,
+        expr: CodeType,
+        *args: Any,
+        **kwargs: Any,
+    ) -> Any:
+        """Run precompiled expression of a compiled definition."""
+        kwargs.pop('__mode__', 'single')
+        # pylint: disable-next=eval-used
+        return eval(expr, self.__namespace(kwargs))  # nosec
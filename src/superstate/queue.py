@@ -0,0 +1,93 @@
+"""Provide event queues for statechart processing."""
+
+from __future__ import annotations
+
+import threading
+from typing import Iterator
+
+from superstate.exception import InvalidAction
+
+_names: list[str] = []
+_ids: dict[str, int] = {}
+_lock = threading.Lock()
+
+INITIAL_SLOTS = 8
+
+
+def intern_event(name: str) -> int:
+    """Get integer identifier shared by every event with name."""
+    identifier = _ids.get(name)
+    if identifier is None:
+        with _lock:
+            identifier = _ids.setdefault(name, len(_names))
+            if identifier == len(_names):
+                _names.append(name)
+    return identifier
+
+
+def lookup_event(identifier: int) -> str:
+    """Get name of interned event."""
+    return _names[identifier]
+
+
+class EventQueue:
+    """Provide bounded ring buffer of interned events.
+
+    Slots start small and are doubled while the queue fills up to its
+    capacity, so that idle statecharts hold few slots and enqueuing rarely
+    allocates; an event raised while the queue is full is rejected.
+    """
+
+    __slots__ = ('__buffer', '__head', '__size', 'capacity')
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.__buffer = [0] * min(capacity, INITIAL_SLOTS)
+        self.__head = 0
+        self.__size = 0
+
+    def __bool__(self) -> bool:
+        return self.__size != 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self) -> Iterator[int]:
+        slots = len(self.__buffer)
+        for offset in range(self.__size):
+            yield self.__buffer[(self.__head + offset) % slots]
+
+    def __grow(self) -> None:
+        slots = len(self.__buffer)
+        self.__buffer = (
+            self.__buffer[self.__head :]
+            + self.__buffer[: self.__head]
+            + [0] * (min(slots * 2, self.capacity) - slots)
+        )
+        self.__head = 0
+
+    def push(self, identifier: int) -> None:
+        """Add interned event to the end of the queue."""
+        if self.__size == len(self.__buffer):
+            if self.__size >= self.capacity:
+                raise InvalidAction(
+                    f"exceeded {self.capacity} queued internal events"
+                )
+            self.__grow()
+        slots = len(self.__buffer)
+        self.__buffer[(self.__head + self.__size) % slots] = identifier
+        self.__size += 1
+
+    def pop(self) -> int:
+        """Remove interned event from the front of the queue."""
+        if not self.__size:
+            raise IndexError('pop from empty event queue')
+        identifier = self.__buffer[self.__head]
+        self.__head = (self.__head + 1) % len(self.__buffer)
+        self.__size -= 1
+        return identifier
+
+    def clear(self) -> None:
+        """Discard all queued events."""
+        self.__head = 0
+        self.__size = 0
@@ -0,0 +1,378 @@
+"""Provide runtime hosting statecharts across worker processes.
+
+Statecharts are partitioned between worker processes by the hash of their
+session id, so that each process holds the same partition for the lifetime of
+the runtime. Messages are buffered for each process and sent in batches over
+pipes, once full or after lingering briefly, without waiting for replies,
+which are resolved as futures by a reader thread of each process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import logging
+import logging.config
+import multiprocessing
+import os
+import pickle  # nosec
+import threading
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Optional, Type, Union, cast
+from uuid import uuid4
+
+from superstate.config import (
+    DEFAULT_SEND_BATCH_SIZE,
+    DEFAULT_SEND_LINGER,
+    LOGGING_CONFIG,
+)
+from superstate.exception import InvalidState, SuperstateException
+from superstate.journal import Journal
+from superstate.scheduler import SCHEDULER
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+
+    from superstate.machine import StateChart
+
+logging.config.dictConfig(LOGGING_CONFIG)
+log = logging.getLogger(__name__)
+
+Message = tuple[int, str, str, Any]
+Reply = tuple[int, bool, Any]
+
+
+def _portable(error: Exception) -> Exception:
+    """Get exception that can be returned from a worker process."""
+    try:
+        pickle.dumps(error)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return SuperstateException(repr(error))
+    return error
+
+
+def _apply(
+    charts: dict[str, StateChart],
+    factory: Type[StateChart],
+    journal: Optional[Journal],
+    message: Message,
+) -> Reply:
+    """Apply message to the statecharts of a worker process."""
+    seq, op, sessionid, args = message
+    try:
+        if op == 'create':
+            if journal is not None:
+                args = {'journal': journal, **args}
+            charts[sessionid] = factory(sessionid=sessionid, **args)
+            return seq, True, sessionid
+        if op == 'replay':
+            if journal is None:
+                raise SuperstateException('runtime has no journal')
+            charts[sessionid] = factory.replay(journal, sessionid)
+            return seq, True, charts[sessionid].current_state.name
+        if sessionid not in charts:
+            raise InvalidState(f"no statechart with session {sessionid}")
+        if op == 'send':
+            result = charts[sessionid].try_trigger(*args)
+            if result.error is not None:
+                raise result.error
+            return seq, True, result.outcome
+        if op == 'state':
+            return seq, True, charts[sessionid].current_state.name
+        if op == 'remove':
+            del charts[sessionid]
+            return seq, True, sessionid
+        raise SuperstateException(f"unknown runtime operation {op}")
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        return seq, False, _portable(err)
+
+
+def _serve(
+    factory: Type[StateChart],
+    requests: Connection,
+    replies: Connection,
+    path: Optional[str] = None,
+) -> None:
+    """Process batches of messages until the runtime is closed."""
+    charts: dict[str, StateChart] = {}
+    journal = Journal(path) if path is not None else None
+    while True:
+        # delayed events of hosted statecharts fire between batches
+        if not requests.poll(SCHEDULER.resolution):
+            SCHEDULER.advance()
+            continue
+        try:
+            batch = requests.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        replies.send([_apply(charts, factory, journal, x) for x in batch])
+        SCHEDULER.advance()
+    if journal is not None:
+        # records superseded by snapshots are dropped when the shard stops
+        journal.compact()
+        journal.close()
+
+
+class ShardedRuntime:
+    """Provide pool of worker processes each hosting a shard of statecharts.
+
+    Messages to a shard are sent once ``batch`` messages have been buffered,
+    once the oldest of them has waited ``linger`` seconds, or when ``flush``
+    is called, and are processed in order. Buffered messages only await a
+    flush when ``linger`` is None. Creating, querying and removing
+    statecharts flushes the shard immediately.
+
+    Statecharts of each shard append to the journal of the shard within the
+    ``journal`` directory when given, and are rebuilt from it by ``replay`` in
+    a runtime with the same number of processes.
+    """
+
+    def __init__(
+        self,
+        factory: Type[StateChart],
+        processes: Optional[int] = None,
+        batch: int = DEFAULT_SEND_BATCH_SIZE,
+        linger: Optional[float] = DEFAULT_SEND_LINGER,
+        context: Optional[str] = None,
+        journal: Optional[Union[str, os.PathLike]] = None,
+    ) -> None:
+        self.factory = factory
+        self.journal = os.fspath(journal) if journal is not None else None
+        self.processes = processes or os.cpu_count() or 1
+        self.batch = batch
+        self.linger = linger
+        # typed loosely since only concrete contexts provide Process
+        self.__context: Any = multiprocessing.get_context(context)
+        self.__workers: list[Any] = []
+        self.__requests: list[Connection] = []
+        self.__readers: list[threading.Thread] = []
+        self.__buffers: list[list[Message]] = []
+        self.__locks: list[threading.Lock] = []
+        self.__futures: list[dict[int, Future]] = []
+        # shards whose worker process is still replying
+        self.__alive: list[bool] = []
+        self.__since: list[Optional[float]] = []
+        self.__condition = threading.Condition()
+        self.__lingerer: Optional[threading.Thread] = None
+        self.__lock = threading.Lock()
+        self.__seq = itertools.count()
+
+    def __enter__(self) -> ShardedRuntime:
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    @property
+    def running(self) -> bool:
+        """Check if worker processes have been started."""
+        return bool(self.__workers)
+
+    def start(self) -> None:
+        """Start worker processes and their reader threads."""
+        if self.running:
+            return
+        for index in range(self.processes):
+            requests, sender = self.__context.Pipe(duplex=False)
+            receiver, replies = self.__context.Pipe(duplex=False)
+            worker = self.__context.Process(
+                target=_serve,
+                args=(self.factory, requests, replies, self.__path(index)),
+                name=f"superstate-shard-{index}",
+                daemon=True,
+            )
+            worker.start()
+            # only the worker holds these ends so that closing is detected
+            requests.close()
+            replies.close()
+            reader = threading.Thread(
+                target=self.__read,
+                args=(index, receiver),
+                name=f"superstate-shard-{index}-reader",
+                daemon=True,
+            )
+            self.__workers.append(worker)
+            self.__requests.append(sender)
+            self.__buffers.append([])
+            self.__locks.append(threading.Lock())
+            self.__futures.append({})
+            self.__alive.append(True)
+            self.__since.append(None)
+            self.__readers.append(reader)
+            reader.start()
+        if self.linger is not None:
+            self.__lingerer = threading.Thread(
+                target=self.__linger, name='superstate-linger', daemon=True
+            )
+            self.__lingerer.start()
+
+    def close(self) -> None:
+        """Flush pending messages and stop worker processes."""
+        if not self.running:
+            return
+        lingerer = self.__lingerer
+        if lingerer is not None:
+            with self.__condition:
+                self.__lingerer = None
+                self.__condition.notify()
+            lingerer.join()
+        self.flush()
+        for index, sender in enumerate(self.__requests):
+            with self.__locks[index]:
+                try:
+                    sender.send(None)
+                except OSError:
+                    log.warning('shard %d exited before closing', index)
+        for worker, reader, sender in zip(
+            self.__workers, self.__readers, self.__requests
+        ):
+            worker.join()
+            reader.join()
+            sender.close()
+        self.__workers.clear()
+        self.__requests.clear()
+        self.__readers.clear()
+        self.__buffers.clear()
+        self.__locks.clear()
+        self.__futures.clear()
+        self.__alive.clear()
+        self.__since.clear()
+
+    def __path(self, index: int) -> Optional[str]:
+        if self.journal is None:
+            return None
+        os.makedirs(self.journal, exist_ok=True)
+        return os.path.join(self.journal, f"shard-{index}.journal")
+
+    def shard(self, sessionid: str) -> int:
+        """Get index of worker process hosting session."""
+        digest = hashlib.blake2b(str(sessionid).encode(), digest_size=8)
+        return int.from_bytes(digest.digest(), 'big') % self.processes
+
+    def create(self, sessionid: Optional[str] = None, **kwargs: Any) -> Future:
+        """Create statechart from factory resolving to its session id."""
+        sessionid = str(uuid4() if sessionid is None else sessionid)
+        return self.__submit('create', sessionid, kwargs, flush=True)
+
+    def send(
+        self, sessionid: str, event: str, payload: Optional[Any] = None
+    ) -> Future:
+        """Send event to statechart resolving to outcome of the event."""
+        args = (event,) if payload is None else (event, payload)
+        return self.__submit('send', str(sessionid), args)
+
+    def state(self, sessionid: str) -> Future:
+        """Get future resolving to current state of statechart."""
+        return self.__submit('state', str(sessionid), None, flush=True)
+
+    def replay(self, sessionid: str) -> Future:
+        """Rebuild statechart from journal resolving to its current state."""
+        return self.__submit('replay', str(sessionid), None, flush=True)
+
+    def remove(self, sessionid: str) -> Future:
+        """Remove statechart from its worker process."""
+        return self.__submit('remove', str(sessionid), None, flush=True)
+
+    def flush(self) -> None:
+        """Send buffered messages of every shard."""
+        for index, lock in enumerate(self.__locks):
+            with lock:
+                self.__flush(index)
+
+    def __flush(self, index: int) -> None:
+        if self.__buffers[index]:
+            batch = self.__buffers[index]
+            self.__buffers[index] = []
+            with self.__condition:
+                self.__since[index] = None
+            try:
+                self.__requests[index].send(batch)
+            except OSError as err:
+                # the worker process has exited and its pipe is broken
+                log.error('failed sending to shard %d: %s', index, err)
+                with self.__lock:
+                    futures = self.__futures[index]
+                    pending = [futures.pop(x[0], None) for x in batch]
+                self.__fail(index, [x for x in pending if x is not None])
+
+    @staticmethod
+    def __fail(index: int, futures: list[Future]) -> None:
+        for future in futures:
+            future.set_exception(
+                SuperstateException(f"shard {index} exited before replying")
+            )
+
+    def __linger(self) -> None:
+        # sends messages left buffered once the oldest has lingered
+        linger = cast(float, self.linger)
+        while True:
+            with self.__condition:
+                if self.__lingerer is None:
+                    break
+                pending = [x for x in self.__since if x is not None]
+                if not pending:
+                    self.__condition.wait()
+                    continue
+                remaining = min(pending) + linger - time.monotonic()
+                if remaining > 0:
+                    self.__condition.wait(remaining)
+                    continue
+                due = time.monotonic() - linger
+                expired = [
+                    i
+                    for i, x in enumerate(self.__since)
+                    if x is not None and x <= due
+                ]
+            # shard locks are never acquired while holding the condition
+            for index in expired:
+                with self.__locks[index]:
+                    self.__flush(index)
+
+    def __submit(
+        self, op: str, sessionid: str, args: Any, flush: bool = False
+    ) -> Future:
+        if not self.running:
+            raise SuperstateException('runtime has not been started')
+        future: Future = Future()
+        seq = next(self.__seq)
+        index = self.shard(sessionid)
+        with self.__lock:
+            if not self.__alive[index]:
+                self.__fail(index, [future])
+                return future
+            self.__futures[index][seq] = future
+        with self.__locks[index]:
+            self.__buffers[index].append((seq, op, sessionid, args))
+            if flush or len(self.__buffers[index]) >= self.batch:
+                self.__flush(index)
+            elif self.linger is not None and len(self.__buffers[index]) == 1:
+                with self.__condition:
+                    self.__since[index] = time.monotonic()
+                    self.__condition.notify()
+        return future
+
+    def __read(self, index: int, receiver: Connection) -> None:
+        futures = self.__futures[index]
+        while True:
+            try:
+                replies = receiver.recv()
+            except (EOFError, OSError):
+                break
+            for seq, ok, value in replies:
+                with self.__lock:
+                    future = futures.pop(seq)
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+        receiver.close()
+        # messages submitted once the worker has exited fail immediately
+        with self.__lock:
+            self.__alive[index] = False
+            pending = list(futures.values())
+            futures.clear()
+        self.__fail(index, pending)
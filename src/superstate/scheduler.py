@@ -0,0 +1,302 @@
+"""Provide scheduling of delayed events between statechart sessions."""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Hashable,
+    Optional,
+)
+from weakref import WeakValueDictionary
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop, TimerHandle
+
+    from superstate.machine import StateChart
+
+log = logging.getLogger(__name__)
+
+# statecharts addressable by their session id
+SESSIONS: WeakValueDictionary[str, StateChart] = WeakValueDictionary()
+# rehydrate hibernated statecharts addressed by their session id
+HIBERNATED: dict[str, Callable[[str], StateChart]] = {}
+
+
+_executor: Optional[Executor] = None
+_lock = threading.Lock()
+
+
+def lookup_session(sessionid: str) -> Optional[StateChart]:
+    """Get statechart of session, rehydrating it when hibernated."""
+    session = SESSIONS.get(sessionid)
+    if session is None and sessionid in HIBERNATED:
+        session = HIBERNATED[sessionid](sessionid)
+    return session
+
+
+def deliver(sessionid: str, event: str, *args: Any) -> None:
+    """Deliver event to session unless it has since terminated."""
+    session = lookup_session(sessionid)
+    if session is not None:
+        session.try_trigger(event, *args)
+
+
+def background_executor() -> Executor:
+    """Get thread pool shared by statecharts for background content."""
+    global _executor  # pylint: disable=global-statement
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(thread_name_prefix='superstate')
+    return _executor
+
+
+class ManualClock:
+    """Provide clock that only moves when advanced."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        """Move the clock forward."""
+        self.now += seconds
+        return self.now
+
+
+class Timer:
+    """Represent callback scheduled for a tick of the timing wheel."""
+
+    __slots__ = ('callback', 'deadline', 'key', 'slot')
+
+    def __init__(
+        self, deadline: int, callback: Callable[[], Any], key: Hashable
+    ) -> None:
+        self.callback = callback
+        self.deadline = deadline
+        self.key = key
+        self.slot: Optional[dict[Timer, None]] = None
+
+
+class Scheduler:
+    """Provide hierarchical timing wheel for delayed callbacks.
+
+    Each level divides time into ``slots`` buckets that are ``slots`` times
+    longer than those of the level below. Timers are inserted into the bucket
+    of their deadline and cascade to lower levels as the wheel turns, so that
+    both scheduling and cancelling are constant time.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        resolution: float = 0.01,
+        slots: int = 256,
+        levels: int = 4,
+    ) -> None:
+        if slots < 2 or slots & (slots - 1):
+            raise ValueError('timing wheel slots must be a power of two')
+        self.clock = clock
+        self.resolution = resolution
+        self.levels = levels
+        self.__bits = slots.bit_length() - 1
+        self.__mask = slots - 1
+        self.__wheel: list[list[dict[Timer, None]]] = [
+            [{} for _ in range(slots)] for _ in range(levels)
+        ]
+        self.__due: dict[Timer, None] = {}
+        # callbacks handed over by other threads
+        self.__pending: deque[Callable[[], Any]] = deque()
+        self.__keys: dict[Hashable, Timer] = {}
+        # keys of the form ``(owner, ...)`` grouped by their owner
+        self.__owners: dict[Hashable, dict[Hashable, None]] = {}
+        self.__tick = math.floor(clock() / resolution)
+        # notified when the first timer is scheduled
+        self.wakeup: Optional[Callable[[], None]] = None
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__keys
+
+    def __len__(self) -> int:
+        return len(self.__keys) + len(self.__pending)
+
+    def __insert(self, timer: Timer) -> None:
+        delta = timer.deadline - self.__tick
+        if delta <= 0:
+            slot = self.__due
+        else:
+            level = min(
+                (delta.bit_length() - 1) // self.__bits, self.levels - 1
+            )
+            index = (timer.deadline >> (self.__bits * level)) & self.__mask
+            slot = self.__wheel[level][index]
+        slot[timer] = None
+        timer.slot = slot
+
+    def schedule(
+        self,
+        delay: float,
+        callback: Callable[[], Any],
+        key: Optional[Hashable] = None,
+    ) -> Timer:
+        """Schedule callback once delay in seconds has elapsed.
+
+        A pending timer with the same key is replaced.
+        """
+        if key is not None:
+            self.cancel(key)
+        deadline = math.ceil((self.clock() + delay) / self.resolution)
+        timer = Timer(deadline, callback, key)
+        self.__keys[timer if key is None else key] = timer
+        if isinstance(key, tuple) and key:
+            self.__owners.setdefault(key[0], {})[key] = None
+        self.__insert(timer)
+        if len(self.__keys) == 1 and self.wakeup is not None:
+            self.wakeup()
+        return timer
+
+    def call_soon(self, callback: Callable[[], Any]) -> None:
+        """Run callback on the next turn of the wheel from any thread."""
+        self.__pending.append(callback)
+        if self.wakeup is not None:
+            self.wakeup()
+
+    def timers(
+        self, owner: Hashable
+    ) -> list[tuple[Hashable, float, Callable[[], Any]]]:
+        """Get key, deadline and callback of pending timers of owner.
+
+        Owners are the first item of tuple keys, such as the session of the
+        ``(sessionid, sendid)`` keys of sent events, and deadlines are in
+        seconds of the scheduler clock.
+        """
+        return [
+            (
+                k,
+                self.__keys[k].deadline * self.resolution,
+                self.__keys[k].callback,
+            )
+            for k in self.__owners.get(owner, ())
+        ]
+
+    def __forget(self, key: Hashable) -> Optional[Timer]:
+        timer = self.__keys.pop(key, None)
+        if isinstance(key, tuple) and key in self.__owners.get(key[0], ()):
+            keys = self.__owners[key[0]]
+            del keys[key]
+            if not keys:
+                del self.__owners[key[0]]
+        return timer
+
+    def cancel(self, key: Hashable) -> bool:
+        """Cancel pending timer by key."""
+        timer = self.__forget(key)
+        if timer is None or timer.slot is None:
+            return False
+        del timer.slot[timer]
+        timer.slot = None
+        return True
+
+    def __fire(self, slot: dict[Timer, None]) -> int:
+        fired = 0
+        while slot:
+            timer = next(iter(slot))
+            del slot[timer]
+            timer.slot = None
+            self.__forget(timer if timer.key is None else timer.key)
+            try:
+                timer.callback()
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.exception('failed running scheduled callback')
+            fired += 1
+        return fired
+
+    def advance(self, now: Optional[float] = None) -> int:
+        """Run callbacks that are due and return how many were run."""
+        target = math.floor(
+            (self.clock() if now is None else now) / self.resolution
+        )
+        fired = 0
+        for _ in range(len(self.__pending)):
+            try:
+                self.__pending.popleft()()
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.exception('failed running scheduled callback')
+            fired += 1
+        fired += self.__fire(self.__due)
+        while self.__tick < target:
+            if not self.__keys:
+                self.__tick = target
+                break
+            self.__tick += 1
+            level = 1
+            while level < self.levels and not self.__tick & (
+                (1 << (self.__bits * level)) - 1
+            ):
+                level += 1
+            # higher levels cascade first as they may refill lower levels
+            for level in range(level - 1, 0, -1):
+                index = (self.__tick >> (self.__bits * level)) & self.__mask
+                cascade = self.__wheel[level][index]
+                self.__wheel[level][index] = {}
+                for timer in cascade:
+                    self.__insert(timer)
+            fired += self.__fire(self.__wheel[0][self.__tick & self.__mask])
+            fired += self.__fire(self.__due)
+        return fired
+
+
+class AsyncioDriver:
+    """Turn timing wheel using ``loop.call_at`` while timers are pending."""
+
+    def __init__(
+        self,
+        scheduler: Scheduler,
+        loop: Optional[AbstractEventLoop] = None,
+    ) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        import asyncio
+
+        self.scheduler = scheduler
+        self.loop = loop or asyncio.get_event_loop()
+        self.__handle: Optional[TimerHandle] = None
+
+    def start(self) -> None:
+        """Start turning the timing wheel."""
+        self.scheduler.wakeup = self.__wake
+        self.__arm()
+
+    def stop(self) -> None:
+        """Stop turning the timing wheel."""
+        self.scheduler.wakeup = None
+        if self.__handle is not None:
+            self.__handle.cancel()
+            self.__handle = None
+
+    def __wake(self) -> None:
+        # timers may be handed over by threads other than the event loop
+        self.loop.call_soon_threadsafe(self.__arm)
+
+    def __arm(self) -> None:
+        if self.__handle is None and len(self.scheduler):
+            self.__handle = self.loop.call_at(
+                self.loop.time() + self.scheduler.resolution, self.__run
+            )
+
+    def __run(self) -> None:
+        self.__handle = None
+        self.scheduler.advance()
+        self.__arm()
+
+
+SCHEDULER = Scheduler()
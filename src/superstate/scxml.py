@@ -0,0 +1,274 @@
+"""Provide loading of statechart definitions from SCXML documents."""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import io
+import logging
+import logging.config
+import marshal
+import os
+import sys
+from pathlib import Path
+from typing import IO, Any, Callable, Optional, TypeVar, Union
+from xml.etree.ElementTree import Element, iterparse
+
+from superstate.config import LOGGING_CONFIG
+from superstate.exception import InvalidConfig
+
+logging.config.dictConfig(LOGGING_CONFIG)
+log = logging.getLogger(__name__)
+
+# definitions are only cached when a directory is configured
+CACHE_DIR = os.getenv('SUPERSTATE_CACHE_DIR')
+# incremented whenever converted settings change so stale caches are unused
+VERSION = 2
+
+Source = Union[str, os.PathLike, bytes, IO[bytes]]
+T = TypeVar('T')
+
+
+def _tag(element: Element) -> str:
+    return element.tag.rsplit('}', 1)[-1]
+
+
+def _content(children: list[tuple[str, Any]]) -> list[Any]:
+    """Convert executable content to action settings."""
+    actions: list[Any] = []
+    for tag, value in children:
+        if tag in ('if', 'elseif', 'else'):
+            actions.extend(value)
+        elif tag in (
+            'assign',
+            'cancel',
+            'foreach',
+            'log',
+            'raise',
+            'script',
+            'send',
+        ):
+            actions.append({tag: value})
+        else:
+            raise InvalidConfig(f"unsupported executable content: {tag}")
+    return actions
+
+
+def _branches(
+    attrs: dict[str, str], children: list[tuple[str, Any]]
+) -> list[Any]:
+    """Convert if, elseif and else into a single conditional action.
+
+    Branches are nested within the content of the if action, which selects
+    the first branch whose condition holds before running any content so
+    that at most one branch runs.
+    """
+    content: list[Any] = []
+    actions = content
+    for tag, value in children:
+        if tag == 'elseif':
+            actions = []
+            content.append({'elseif': {'cond': value, 'content': actions}})
+        elif tag == 'else':
+            actions = []
+            content.append({'else': {'cond': True, 'content': actions}})
+        else:
+            actions.extend(_content([(tag, value)]))
+    return [{'if': {'cond': attrs['cond'], 'content': content}}]
+
+
+def _convert(
+    element: Element, children: list[tuple[str, Any]]
+) -> tuple[str, Any]:
+    """Convert parsed element and its converted children to settings."""
+    # pylint: disable=too-many-branches,too-many-return-statements
+    tag = _tag(element)
+    attrs = dict(element.attrib)
+    text = (element.text or '').strip()
+
+    if tag in ('state', 'parallel', 'final', 'scxml'):
+        settings: dict[str, Any] = {}
+        if 'id' in attrs:
+            settings['name'] = attrs['id']
+        if tag == 'parallel':
+            settings['type'] = 'parallel'
+        elif tag == 'final':
+            settings['type'] = 'final'
+        states = [v for k, v in children if k == 'state']
+        if states:
+            settings['states'] = states
+            initial = attrs.get('initial') or next(
+                (v for k, v in children if k == 'initial'), None
+            )
+            if tag != 'parallel':
+                settings['initial'] = initial or next(
+                    x['name'] for x in states if x.get('type') != 'history'
+                )
+        datamodel = [v for k, v in children if k == 'datamodel']
+        if datamodel:
+            settings['datamodel'] = datamodel[0]
+        invokes = [v for k, v in children if k == 'invoke']
+        if invokes:
+            settings['invoke'] = invokes
+        transitions = [v for k, v in children if k == 'transition']
+        if transitions:
+            settings['transitions'] = transitions
+        for key in ('on_entry', 'on_exit'):
+            content = [x for k, v in children if k == key for x in v]
+            if content:
+                settings[key] = content
+        if tag == 'scxml':
+            settings.setdefault('name', attrs.get('name', 'root'))
+            return tag, {
+                '__name__': attrs.get('name'),
+                '__binding__': attrs.get('binding', 'early'),
+                'datamodel': settings.pop('datamodel', {'data': []}),
+                'state': settings,
+            }
+        return 'state', settings
+    if tag == 'history':
+        history: dict[str, Any] = {
+            'name': attrs['id'],
+            'type': 'history',
+            'history': attrs.get('type', 'shallow'),
+        }
+        transitions = [v for k, v in children if k == 'transition']
+        if transitions:
+            history['transitions'] = transitions
+        return 'state', history
+    if tag == 'initial':
+        return tag, next(v['target'] for k, v in children if k == 'transition')
+    if tag == 'transition':
+        targets = attrs.get('target', '').split()
+        if len(targets) > 1:
+            raise InvalidConfig('transitions with multiple targets')
+        transition: dict[str, Any] = {
+            'event': attrs.get('event', ''),
+            'target': targets[0] if targets else '',
+        }
+        if 'cond' in attrs:
+            transition['cond'] = attrs['cond']
+        if 'type' in attrs:
+            transition['type'] = attrs['type']
+        content = _content(children)
+        if content:
+            transition['content'] = content
+        return tag, transition
+    if tag in ('onentry', 'onexit'):
+        return f"on_{tag[2:]}", _content(children)
+    if tag == 'datamodel':
+        return tag, {'data': [v for _, v in children]}
+    if tag == 'data':
+        data = {k: v for k, v in attrs.items() if k in ('id', 'src', 'expr')}
+        if text and 'expr' not in data and 'src' not in data:
+            data['expr'] = text
+        if 'expr' in data:
+            # data items are not evaluated so literals are converted here
+            try:
+                data['expr'] = ast.literal_eval(data['expr'])
+            except (SyntaxError, ValueError):
+                pass
+        return tag, data
+    if tag == 'if':
+        return tag, _branches(attrs, children)
+    if tag == 'elseif':
+        return tag, attrs['cond']
+    if tag == 'else':
+        return tag, None
+    if tag == 'foreach':
+        return tag, {**attrs, 'content': _content(children)}
+    if tag == 'script':
+        return tag, {'src': text}
+    if tag == 'send':
+        return tag, {
+            k: v
+            for k, v in attrs.items()
+            if k in ('event', 'target', 'delay', 'id')
+        }
+    if tag in ('assign', 'cancel', 'log', 'raise', 'param'):
+        if tag == 'assign' and 'expr' not in attrs and text:
+            attrs['expr'] = text
+        return tag, attrs
+    if tag == 'finalize':
+        return tag, _content(children)
+    if tag == 'invoke':
+        invoke: dict[str, Any] = {'src': attrs['src']}
+        if 'id' in attrs:
+            invoke['id'] = attrs['id']
+        params = [v for k, v in children if k == 'param']
+        if params:
+            invoke['param'] = params
+        finalize = [x for k, v in children if k == 'finalize' for x in v]
+        if finalize:
+            invoke['finalize'] = finalize
+        return tag, invoke
+    raise InvalidConfig(f"unsupported scxml element: {tag}")
+
+
+def parse(stream: IO[bytes]) -> dict[str, Any]:
+    """Parse SCXML document incrementally into statechart settings.
+
+    Elements are converted as soon as they end and then cleared, so that
+    no document tree is retained while parsing.
+    """
+    stack: list[list[tuple[str, Any]]] = [[]]
+    for event, element in iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            stack.append([])
+            continue
+        children = stack.pop()
+        stack[-1].append(_convert(element, children))
+        element.clear()
+    document = stack[0]
+    if len(document) != 1 or document[0][0] != 'scxml':
+        raise InvalidConfig('document is not a valid scxml document')
+    return document[0][1]
+
+
+def _read(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        return Path(source).read_bytes()
+    return source.read()
+
+
+def load(
+    source: Source,
+    factory: Callable[[dict[str, Any]], T],
+    cache_dir: Optional[str] = CACHE_DIR,
+) -> T:
+    """Build from SCXML settings, reusing cached definitions.
+
+    Definitions are cached within ``cache_dir`` by the hash of the document
+    and the version of its conversion once the factory has built them
+    successfully, so that documents already parsed and validated are loaded
+    with ``marshal`` instead. Failing to write the cache is logged and the
+    definition is still returned.
+    """
+    content = _read(source)
+    path = None
+    if cache_dir is not None:
+        digest = hashlib.sha256(content).hexdigest()
+        path = os.path.join(
+            cache_dir,
+            f"{digest}.{VERSION}.{sys.implementation.cache_tag}.scxmlc",
+        )
+        try:
+            with open(path, 'rb') as file:
+                return factory(marshal.load(file))
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+    definition = marshal.dumps(parse(io.BytesIO(content)))
+    # factories may consume the settings provided to them
+    result = factory(marshal.loads(definition))
+    if path is not None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as file:
+                file.write(definition)
+            os.replace(tmp, path)
+        except OSError as err:
+            log.warning('unable to cache definition %s: %s', path, err)
+    return result
@@ -0,0 +1,68 @@
+"""Provide compact binary snapshots of statechart runtime state.
+
+Snapshots hold only what differs between instances of a statechart class,
+since instances share the definition they are restored onto::
+
+    header   magic, format version, encoding and definition layout checksum
+    body     configuration, history, data item deltas, queued internal
+             events and pending sent events
+
+States are referenced by their position within the definition and data items
+only by those that differ from their declared defaults. The body is encoded
+with ``marshal`` unless data items hold values that require ``pickle``.
+
+Checkpoints share the format under their own magic, with a body holding only
+the data items written since the previous checkpoint.
+"""
+
+from __future__ import annotations
+
+import marshal
+import pickle  # nosec
+import struct
+import zlib
+from typing import Any, Iterable
+
+from superstate.exception import InvalidConfig
+
+MAGIC = b'SSSN'
+DELTA = b'SSDT'
+VERSION = 1
+HEADER = struct.Struct('<4sHBI')
+MARSHAL, PICKLE = 0, 1
+
+
+def layout(names: Iterable[str]) -> int:
+    """Get checksum of definition layout from names of states in order."""
+    return zlib.crc32('\0'.join(names).encode())
+
+
+def dumps(dump: tuple[Any, ...], checksum: int, magic: bytes = MAGIC) -> bytes:
+    """Encode runtime state dumped from a statechart."""
+    try:
+        encoding, body = MARSHAL, marshal.dumps(dump, 4)
+    except ValueError:
+        # data items holding objects other than builtin types
+        encoding, body = PICKLE, pickle.dumps(dump, pickle.HIGHEST_PROTOCOL)
+    return HEADER.pack(magic, VERSION, encoding, checksum) + body
+
+
+def loads(
+    content: bytes, checksum: int, magic: bytes = MAGIC
+) -> tuple[Any, ...]:
+    """Decode runtime state for a statechart with the definition layout."""
+    if len(content) < HEADER.size:
+        raise InvalidConfig('snapshot is truncated')
+    found, version, encoding, expected = HEADER.unpack_from(content)
+    if found != magic:
+        raise InvalidConfig('not a statechart snapshot')
+    if version != VERSION:
+        raise InvalidConfig(f"unsupported snapshot version: {version}")
+    if expected != checksum:
+        raise InvalidConfig('snapshot was taken from another definition')
+    body = memoryview(content)[HEADER.size :]
+    if encoding == MARSHAL:
+        return marshal.loads(body)
+    if encoding == PICKLE:
+        return pickle.loads(body)  # nosec
+    raise InvalidConfig(f"unsupported snapshot encoding: {encoding}")
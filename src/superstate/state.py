@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import logging
+from functools import partial
 from itertools import chain  # , zip_longest
 from typing import TYPE_CHECKING, Any, Generator, Optional, Union, cast
 
@@ -12,8 +13,9 @@ from superstate.exception import (
     SuperstateException,
 )
 from superstate.model.base import Action
+from superstate.model.communication import Invoke
 from superstate.model.data import DataModel
-from superstate.transition import Transition
+from superstate.transition import EventTrie, Transition
 from superstate.types import Identifier, Selection
 from superstate.utils import lookup_subclasses, tuplize
 
@@ -61,6 +63,7 @@ class TransitionMixin:
     """Provide an atomic state for a statechart."""
 
     __transitions: list[Transition]
+    __index: Optional[EventTrie[int]] = None
 
     @property
     def transitions(self) -> tuple[Transition, ...]:
@@ -71,18 +74,30 @@ class TransitionMixin:
     def transitions(self, transitions: list[Transition]) -> None:
         """Initialize atomic state."""
         self.__transitions = transitions
+        self.__index = None
 
     def add_transition(self, transition: Transition) -> None:
         """Add transition to this state."""
         self.__transitions.append(transition)
+        self.__index = None
+
+    def match(self, event: str) -> tuple[int, ...]:
+        """Get indexes of transitions matching event in document order."""
+        if event == '':
+            return tuple(
+                i for i, t in enumerate(self.__transitions) if t.event == ''
+            )
+        if self.__index is None:
+            self.__index = EventTrie(
+                (t.event, i)
+                for i, t in enumerate(self.__transitions)
+                if t.event != ''
+            )
+        return tuple(sorted(self.__index.match(event)))
 
     def get_transition(self, event: str) -> tuple[Transition, ...]:
         """Get each transition maching event."""
-        return tuple(
-            filter(
-                lambda transition: transition.event == event, self.transitions
-            )
-        )
+        return tuple(self.__transitions[i] for i in self.match(event))
 
 
 class ContentMixin:
@@ -112,31 +127,53 @@ class ContentMixin:
         """Set on-exit content of this state."""
         self.__on_exit = content
 
+    def __run(
+        self, ctx: StateChart, content: ActionTypes, kind: str
+    ) -> list[Any]:
+        results = []
+        executor = ctx.datamodel.provider(ctx)
+        for expression in content:
+            results.append(executor.handle(expression))  # *args, **kwargs))
+        # content may mutate data items in place
+        ctx.datamodel.version += 1
+        log.info("executed %r state change action for %s", kind, self.name)
+        return results
+
     def run_on_entry(self, ctx: StateChart) -> Optional[Any]:
         """Run on-entry tasks."""
         if self.__on_entry:
-            results = []
-            executor = ctx.datamodel.provider(ctx)
-            for expression in self.__on_entry:
-                results.append(executor.handle(expression))  # *args, **kwargs))
-            log.info(
-                "executed 'on_entry' state change action for %s", self.name
+            # content of parallel regions may be deferred to an executor
+            return ctx._dispatch(
+                partial(self.__run, ctx, self.__on_entry, 'on_entry')
             )
-            return results
         return None
 
     def run_on_exit(self, ctx: StateChart) -> Optional[Any]:
         """Run on-exit tasks."""
         if self.__on_exit:
-            results = []
-            executor = ctx.datamodel.provider(ctx)
-            for expression in self.__on_exit:
-                results.append(executor.handle(expression))  # *args, **kwargs))
-            log.info("executed 'on_exit' state change action for %s", self.name)
-            return results
+            return ctx._dispatch(
+                partial(self.__run, ctx, self.__on_exit, 'on_exit')
+            )
         return None
 
 
+def _restore(ctx: StateChart, parent: State, path: tuple[Any, ...]) -> None:
+    """Enter recorded descendants of parent without their initial states."""
+    state = parent
+    last = len(path) - 1
+    for i, name in enumerate(path):
+        state = cast(SubstateMixin, state).states[name]
+        ctx.current_state = state
+        if isinstance(state, ParallelState):
+            state.run_on_entry(ctx, path[i + 1] if i < last else None)
+            return
+        if i < last and isinstance(state, CompoundState):
+            # initial states are not resolved for restored ancestors
+            state.run_on_entry(ctx, descend=False)
+        else:
+            state.run_on_entry(ctx)
+
+
 class State:
     """Provide pseudostate base for various pseudostate types."""
 
@@ -193,8 +230,6 @@ class State:
         self.name = name
         self.datamodel = kwargs.pop('datamodel', DataModel([]))
         self.datamodel.parent = self
-        if self.datamodel.binding == 'early':
-            self.datamodel.populate()
         self.validate()
 
     def __eq__(self, other: object) -> bool:
@@ -258,6 +293,7 @@ class State:
                     if 'transitions' in settings
                     else []
                 ),
+                history=settings.get('history'),
                 on_entry=(
                     tuple(map(Action.create, tuplize(settings['on_entry'])))
                     if 'on_entry' in settings
@@ -268,6 +304,11 @@ class State:
                     if 'on_exit' in settings
                     else []
                 ),
+                invoke=(
+                    tuple(map(Invoke.create, tuplize(settings['invoke'])))
+                    if 'invoke' in settings
+                    else ()
+                ),
             )
         elif isinstance(settings, str):
             obj = State(settings)
@@ -341,33 +382,117 @@ class PseudoState(State):
 
 
 class HistoryState(TransitionMixin, PseudoState):
-    """A pseudostate that remembers transition history of compound states."""
+    """A pseudostate that remembers transition history of compound states.
+
+    Shallow history records the name of the last active substate of its
+    parent while deep history records the names of the active descendants
+    down to an atomic state. Paths through a parallel state end with the
+    recorded path of each of its regions. Entering the history restores the
+    recorded states directly, otherwise the default transition is taken.
+    """
 
     __kind: str = cast(str, Selection('deep', 'shallow'))
+    __snapshot: Optional[tuple[Any, ...]] = None
 
     def __init__(self, name: str, **kwargs: Any) -> None:
-        self.__kind = kwargs.get('type', 'shallow')
+        self.__kind = kwargs.get('history') or 'shallow'
         self.transitions = kwargs.pop('transitions', [])
         super().__init__(name, **kwargs)
 
     @property
     def type(self) -> str:
-        """Return previous substate."""
-        # TODO: implement tail for shallow history
+        """Return type of history."""
         return self.__kind
 
+    @property
+    def snapshot(self) -> Optional[tuple[Any, ...]]:
+        """Return names of states recorded from the parent state."""
+        return self.__snapshot
+
+    @snapshot.setter
+    def snapshot(self, names: Optional[tuple[Any, ...]]) -> None:
+        self.__snapshot = tuple(names) if names is not None else None
+
+    def record(self, state: State) -> None:
+        """Record state being exited as the last active state."""
+        if self.__kind == 'shallow':
+            self.__snapshot = (state.name,)
+            return
+        path: list[State] = []
+        for ancestor in reversed(state):
+            if ancestor is self.parent:
+                break
+            path.append(ancestor)
+        path.reverse()
+        self.__snapshot = self.__merge(self.__snapshot, path)
+
+    @classmethod
+    def __merge(
+        cls, previous: Optional[tuple[Any, ...]], path: list[State]
+    ) -> tuple[Any, ...]:
+        # regions of parallel states exit one at a time
+        names: list[str] = []
+        for i, state in enumerate(path):
+            names.append(state.name)
+            if isinstance(state, ParallelState) and i + 1 < len(path):
+                regions: dict[str, tuple[Any, ...]] = {}
+                if (
+                    previous is not None
+                    and len(previous) == i + 2
+                    and previous[: i + 1] == tuple(names)
+                ):
+                    regions = {x[0]: x for x in previous[i + 1]}
+                region = path[i + 1].name
+                regions[region] = cls.__merge(
+                    regions.get(region), path[i + 1 :]
+                )
+                return (
+                    *names,
+                    tuple(regions[x] for x in state.states if x in regions),
+                )
+        return tuple(names)
+
+    def clear(self) -> None:
+        """Remove recorded history."""
+        self.__snapshot = None
+
+    def run_on_entry(self, ctx: StateChart) -> Optional[Any]:
+        """Restore recorded states of the parent state."""
+        parent = cast(SubstateMixin, self.parent)
+        ctx.current_state = parent
+        if self.__snapshot is None:
+            transition = self.transitions[0] if self.transitions else None
+            if transition is not None and transition.content:
+                provider = ctx.datamodel.provider(ctx)
+                for expression in transition.content:
+                    provider.handle(expression)
+            target = transition.target if transition else None
+            target = target or getattr(parent, 'initial', None)
+            if not target:
+                raise InvalidConfig(f"history has no default: {self.name}")
+            ctx.change_state(target)
+            return None
+        _restore(ctx, parent, self.__snapshot)
+        return None
+
+    def run_on_exit(self, ctx: StateChart) -> Optional[Any]:
+        """Run on-exit tasks."""
+        raise InvalidTransition('cannot transition from history state')
+
     def validate(self) -> None:
         """Validate state to ensure conformance with type requirements."""
-        # Transition must not contain 'cond' attributes.
+        if len(self.transitions) > 1:
+            raise InvalidConfig('history must contain one default transition')
         for transition in self.transitions:
-            if transition.cond is not None:
+            # Transition must not contain 'cond' attributes.
+            if transition.cond:
                 raise InvalidConfig(
-                    'initial transition must not contain "cond" attribute'
+                    'history transition must not contain "cond" attribute'
                 )
             # Transition must not contain 'event' attributes.
             if transition.event != '':
                 raise InvalidConfig(
-                    'initial transition must not contain "event" attribute'
+                    'history transition must not contain "event" attribute'
                 )
         super().validate()
 
@@ -458,27 +583,41 @@ class AtomicState(ContentMixin, TransitionMixin, State):
         self.on_entry = kwargs.pop('on_entry', None)
         self.on_exit = kwargs.pop('on_exit', None)
         self.transitions = kwargs.pop('transitions', [])
+        self.invoke = kwargs.pop('invoke', ())
         super().__init__(name, **kwargs)
 
     def run_on_entry(self, ctx: StateChart) -> Optional[Any]:
-        if self.datamodel.binding == 'late' and not hasattr(
-            self.datamodel, 'maps'
-        ):
+        if not self.datamodel.populated:
             self.datamodel.populate()
         log.info("executing 'on_entry' state change actions for %s", self.name)
+        # transient states are processed by the statechart after entry
         results = super().run_on_entry(ctx)
-        # process transient states
-        for transition in self.transitions:
-            if transition.event == '':
-                ctx.trigger(transition.event)
-                break
+        for invoke in self.invoke:
+            ctx._invoke(invoke)
         return results
 
+    def run_on_exit(self, ctx: StateChart) -> Optional[Any]:
+        # history is recorded while the exiting states are still known
+        leaf = not isinstance(self, SubstateMixin)
+        parent = self.parent
+        while parent is not None:
+            for history in parent.history:
+                if history.type == 'deep' and leaf:
+                    history.record(self)
+                elif history.type == 'shallow' and parent is self.parent:
+                    history.record(self)
+            # only atomic states are recorded by deep history of ancestors
+            parent = parent.parent if leaf else None
+        for invoke in self.invoke:
+            ctx._cancel_invoke(invoke)
+        return super().run_on_exit(ctx)
+
 
 class SubstateMixin(State):
     """Provide composite abstract to define nested state types."""
 
     __states: dict[str, State] = {}
+    __history: tuple[HistoryState, ...] = ()
 
     def __getattr__(self, name: str) -> Any:
         if name.startswith('__'):
@@ -499,13 +638,19 @@ class SubstateMixin(State):
         if not self.__states:
             self.__states = {}
             for state in states:
-                state.parent = self
-                self.__states[state.name] = state
+                self.add_state(state)
+
+    @property
+    def history(self) -> tuple[HistoryState, ...]:
+        """Return history states of this state."""
+        return self.__history
 
     def add_state(self, state: State) -> None:
         """Add substate to this state."""
         state.parent = self
         self.__states[state.name] = state
+        if isinstance(state, HistoryState):
+            self.__history += (state,)
 
     def get_state(self, name: str) -> Optional[State]:
         """Get state by name."""
@@ -570,11 +715,17 @@ class CompoundState(SubstateMixin, AtomicState):
         self.states = kwargs.pop('states', [])
         super().__init__(name, **kwargs)
 
-    def run_on_entry(self, ctx: StateChart) -> Optional[tuple[Any, ...]]:
-        # if next(
-        #     (x for x in self.states if isinstance(x, HistoryState)), False
-        # ):
-        #     ...
+    def run_on_entry(
+        self, ctx: StateChart, descend: bool = True
+    ) -> Optional[tuple[Any, ...]]:
+        """Run on-entry tasks.
+
+        Initial states are not entered when ``descend`` is false, such as
+        when this state is an ancestor of the target being entered.
+        """
+        if not descend:
+            entered = super().run_on_entry(ctx)
+            return (entered,) if entered else None
         # XXX: initial can be None
         if not self.initial:
             # if initial is None default is first child
@@ -607,33 +758,78 @@ class CompoundState(SubstateMixin, AtomicState):
 class ParallelState(SubstateMixin, AtomicState):
     """Provide parallel state capability for statechart."""
 
+    current: dict[str, State]
+
     def __init__(self, name: str, **kwargs: Any) -> None:
         """Initialize compound state."""
+        # active state of each region while not the current state
+        self.current = {}
         self.states = kwargs.pop('states', [])
         super().__init__(name, **kwargs)
 
-    def run_on_entry(self, ctx: StateChart) -> Optional[Any]:
+    def __enter(
+        self,
+        ctx: StateChart,
+        state: State,
+        path: Optional[tuple[Any, ...]] = None,
+    ) -> Optional[Any]:
+        results = None
+        if path is None:
+            ctx.current_state = state
+            results = state.run_on_entry(ctx)
+        else:
+            _restore(ctx, self, path)
+        self.current[state.name] = ctx.current_state
+        ctx.current_state = self
+        return results
+
+    def __exit(self, ctx: StateChart, name: str) -> list[Any]:
+        results = []
+        for state in reversed(self.current.pop(name)):
+            if state is self:
+                break
+            results.append(state.run_on_exit(ctx))
+        return results
+
+    def run_on_entry(
+        self,
+        ctx: StateChart,
+        regions: Optional[tuple[tuple[Any, ...], ...]] = None,
+    ) -> Optional[Any]:
+        """Run on-entry tasks.
+
+        Regions recorded by deep history are restored from their paths while
+        the others enter their initial states.
+        """
+        paths = {x[0]: x for x in regions or ()}
         results = []
         results.append(super().run_on_entry(ctx))
-        for state in reversed(self.states.values()):
-            results.append(state.run_on_entry(ctx))
+        # regions are independent so their content may run concurrently
+        results.extend(
+            ctx._run_regions(
+                [
+                    partial(self.__enter, ctx, x, paths.get(x.name))
+                    for x in self.states.values()
+                ]
+            )
+        )
         return results
 
     def run_on_exit(self, ctx: StateChart) -> Optional[Any]:
         results = []
-        for state in reversed(self.states.values()):
-            results.append(state.run_on_exit(ctx))
+        for region in ctx._run_regions(
+            [
+                partial(self.__exit, ctx, x)
+                for x in reversed(tuple(self.current))
+            ]
+        ):
+            results.extend(region)
         results.append(super().run_on_exit(ctx))
         return results
 
     def validate(self) -> None:
         # TODO: empty statemachine should default to null event
-        if self.type == 'compound':
-            if len(self.__states) < 2:
-                raise InvalidConfig('There must be at least two states')
-            if not self.initial:
-                raise InvalidConfig('There must exist an initial state')
-        if self.initial and self.type == 'parallel':
+        if getattr(self, 'initial', None):
             raise InvalidConfig(
                 'parallel state should not have an initial state'
             )
@@ -3,7 +3,17 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any, Optional, Union, cast
+from functools import partial
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Generic,
+    Iterable,
+    Optional,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from superstate.exception import (
     InvalidConfig,
@@ -21,9 +31,57 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
 TRANSITION_PATTERN = r'^(([a-zA-Z][a-zA-Z0-9:\.\-_]*(\.\*)?)|(\.|\*))?$'
 
 
+class EventTrie(Generic[T]):
+    """Index values by the tokens of their event descriptors.
+
+    An event matches every descriptor that is a token prefix of its name so
+    ``device.*``, ``device.sensor`` and ``*`` all match ``device.sensor.temp``.
+    Lookups cost one dictionary probe per token of the event.
+    """
+
+    __slots__ = ('__root', 'descriptors')
+
+    def __init__(self, items: Iterable[tuple[str, T]] = ()) -> None:
+        self.__root: dict[Optional[str], Any] = {}
+        descriptors = set()
+        for descriptor, value in items:
+            self.__insert(descriptor, value)
+            descriptors.add(descriptor)
+        self.descriptors = frozenset(descriptors)
+
+    def __contains__(self, event: object) -> bool:
+        return isinstance(event, str) and bool(self.match(event))
+
+    def __insert(self, descriptor: str, value: T) -> None:
+        node = self.__root
+        for token in descriptor.split('.'):
+            if token not in ('', '*'):
+                node = node.setdefault(token, {})
+        node.setdefault(None, []).append(value)
+
+    def add(self, descriptor: str, value: T) -> None:
+        """Add value for event descriptor."""
+        self.__insert(descriptor, value)
+        self.descriptors = self.descriptors | {descriptor}
+
+    def match(self, event: str) -> list[T]:
+        """Get values of each descriptor matching event."""
+        node = self.__root
+        matches = list(node.get(None, ()))
+        for token in event.split('.'):
+            child = node.get(token)
+            if child is None:
+                break
+            node = child
+            matches.extend(node.get(None, ()))
+        return matches
+
+
 class Transition:
     """Represent statechart transition.
 
@@ -43,6 +101,8 @@ class Transition:
     target: str = cast(str, Identifier(TRANSITION_PATTERN))
     type: str = cast(str, Selection('internal', 'external'))
     content: Optional['ActionTypes']
+    # deadline of each condition, otherwise the default of the statechart
+    timeout: Optional[float]
 
     def __init__(
         self,
@@ -57,6 +117,7 @@ class Transition:
         self.target = kwargs.get('target', '')
         self.type = kwargs.get('type', 'internal')
         self.content = kwargs.get('content')
+        self.timeout = kwargs.get('timeout')
 
     def __repr__(self) -> str:
         return repr(f"Transition(event={self.event}, target={self.target})")
@@ -82,6 +143,7 @@ class Transition:
                     if 'content' in settings
                     else []
                 ),
+                timeout=settings.get('timeout'),
             )
         raise InvalidConfig('could not find a valid transition configuration')
 
@@ -101,6 +163,9 @@ class Transition:
         self, ctx: StateChart, *args: Any, **kwargs: Any
     ) -> Optional[list[Any]]:
         """Transition the state of the statechart."""
+        # pylint: disable-next=import-outside-toplevel
+        from superstate.state import CompoundState, ParallelState
+
         log.info("executing transition contents for event %r", self.event)
         results: Optional[list[Any]] = None
         if self.content:
@@ -108,6 +173,8 @@ class Transition:
             provider = ctx.datamodel.provider(ctx)
             for expression in tuplize(self.content):
                 results.append(provider.handle(expression, *args, **kwargs))
+            # content may mutate data items in place
+            ctx.datamodel.version += 1
         log.info("completed transition contents for event %r", self.event)
         relpath = ctx.get_relpath(self.target)
         if relpath == '.':  # handle self transition
@@ -119,16 +186,35 @@ class Transition:
                 ctx.current_state.run_on_exit(ctx)
                 ctx.current_state = ctx.active[1]
                 macrostep.pop(0)
-            for microstep in macrostep:  # forward
+            last = len(macrostep) - 1
+            for i, microstep in enumerate(macrostep):  # forward
                 try:
+                    if (
+                        isinstance(ctx.current_state, ParallelState)
+                        and microstep in ctx.current_state.current
+                    ):
+                        # regions are entered with their parallel state
+                        ctx.current_state = ctx.current_state.current.pop(
+                            microstep
+                        )
+                        self.__descend(ctx)
+                        break
                     if (
                         # isinstance(ctx.current_state, State)
                         hasattr(ctx.current_state, 'states')
                         and microstep in ctx.current_state.states
                     ):
-                        state = ctx.get_state(microstep)
+                        state = ctx.current_state.states[microstep]
                         ctx.current_state = state
+                        if i < last and isinstance(state, CompoundState):
+                            # ancestors of the target skip initial states
+                            state.run_on_entry(ctx, descend=False)
+                            continue
                         state.run_on_entry(ctx)
+                        if ctx.current_state is not state:
+                            # entry already descended into initial states
+                            self.__descend(ctx)
+                            break
                     else:
                         raise InvalidState(
                             f"statepath not found: {self.target}"
@@ -139,13 +225,29 @@ class Transition:
         log.info('changed state to %s', self.target)
         return results
 
+    def __descend(self, ctx: StateChart) -> None:
+        """Change to target unless already entered with its ancestors."""
+        # pylint: disable-next=import-outside-toplevel
+        from superstate.state import HistoryState
+
+        target = ctx.get_state(self.target)
+        # history restores its states when entered
+        if isinstance(target, HistoryState):
+            return
+        if not any(x is target for x in reversed(ctx.current_state)):
+            ctx.change_state(self.target)
+
     def evaluate(self, ctx: StateChart, *args: Any, **kwargs: Any) -> bool:
         """Evaluate conditionss of transition."""
-        result = True
+        result: Any = True
         if self.cond:
             provider = ctx.datamodel.provider(ctx)
             for expression in tuplize(self.cond):
-                result = provider.handle(expression, *args, **kwargs)
+                result = ctx._watch(
+                    self.timeout,
+                    partial(provider.handle, expression, *args, **kwargs),
+                    False,
+                )
                 if result is False:
                     break
         return result
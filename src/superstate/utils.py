@@ -1,10 +1,23 @@
 """Provide common utilities."""
 
+from copy import deepcopy
 from typing import Any, Type, TypeVar, Union
 
 T = TypeVar('T')
 
 
+def detach(values: dict[str, Any]) -> dict[str, Any]:
+    """Copy values so that mutating them in place is not shared."""
+    copies = {}
+    for key, value in values.items():
+        try:
+            copies[key] = deepcopy(value)
+        except Exception:  # pylint: disable=broad-exception-caught
+            # values that cannot be copied, such as locks, stay shared
+            copies[key] = value
+    return copies
+
+
 def lookup_subclasses(obj: Type[T]) -> set[Type[T]]:
     """Get all unique subsclasses of a class object."""
     return set(obj.__subclasses__()).union(
@@ -25,6 +38,18 @@ def to_bool(value: Union[bool, int, str]) -> bool:
     raise ValueError(f"invalid truthy statement: {value!r}")
 
 
+def to_seconds(value: Union[float, int, str]) -> float:
+    """Convert numeric or CSS time duration to seconds."""
+    if isinstance(value, (float, int)):
+        return float(value)
+    value = value.strip().lower()
+    if value.endswith('ms'):
+        return float(value[:-2]) / 1000
+    if value.endswith('s'):
+        return float(value[:-1])
+    return float(value)
+
+
 def tuplize(value: Any) -> tuple[Any, ...]:
     """Convert various collection types to tuple."""
     return tuple(value) if type(value) in (list, tuple) else (value,)
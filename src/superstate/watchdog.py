@@ -0,0 +1,116 @@
+"""Provide watchdog enforcing deadlines of executable content."""
+
+from __future__ import annotations
+
+import logging
+import logging.config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from dataclasses import dataclass
+from typing import Any, Callable, Optional, TypeVar
+
+from superstate.config import DEFAULT_POOL_SIZE, LOGGING_CONFIG
+from superstate.exception import ExecutionTimeout
+
+logging.config.dictConfig(LOGGING_CONFIG)
+log = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def watchdog_executor() -> ThreadPoolExecutor:
+    """Get thread pool shared by watchdogs for content with deadlines."""
+    global _executor  # pylint: disable=global-statement
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DEFAULT_POOL_SIZE,
+                thread_name_prefix='superstate-watchdog',
+            )
+        return _executor
+
+
+@dataclass
+class WatchdogInfo:
+    """Statistics of a watchdog."""
+
+    runs: int = 0
+    timeouts: int = 0
+    overrunning: int = 0
+
+
+class Watchdog:
+    """Provide deadlines for callbacks run on worker threads.
+
+    Callbacks that overrun their deadline are abandoned and an
+    ``ExecutionTimeout`` is raised to the caller instead. Python threads
+    cannot be interrupted, so abandoned callbacks continue on their worker
+    until they return and are reported as ``overrunning`` in the meantime.
+    """
+
+    def __init__(self, executor: Optional[ThreadPoolExecutor] = None) -> None:
+        self.__executor = executor
+        self.__lock = threading.Lock()
+        self.__info = WatchdogInfo()
+
+    def __getstate__(self) -> dict[str, Any]:
+        # copies keep their statistics and run on the shared pool
+        return {'info': self.info}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__executor = None
+        self.__lock = threading.Lock()
+        self.__info = state['info']
+
+    @property
+    def info(self) -> WatchdogInfo:
+        """Get statistics of this watchdog."""
+        with self.__lock:
+            return WatchdogInfo(
+                self.__info.runs,
+                self.__info.timeouts,
+                self.__info.overrunning,
+            )
+
+    def __call(self, callback: Callable[[], T]) -> T:
+        _local.watched = True
+        try:
+            return callback()
+        finally:
+            _local.watched = False
+
+    def __release(self, _: object) -> None:
+        with self.__lock:
+            self.__info.overrunning -= 1
+
+    def run(self, timeout: Optional[float], callback: Callable[[], T]) -> T:
+        """Run callback, raising once it has not returned within timeout.
+
+        Callbacks run inline without a timeout, or when nested within another
+        watched callback, since they are already covered by its deadline.
+        """
+        if timeout is None or getattr(_local, 'watched', False):
+            return callback()
+        executor = self.__executor or watchdog_executor()
+        future = executor.submit(self.__call, callback)
+        with self.__lock:
+            self.__info.runs += 1
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeout:
+            # callbacks never started when every worker was busy
+            started = not future.cancel()
+            with self.__lock:
+                self.__info.timeouts += 1
+                self.__info.overrunning += started
+            if started:
+                future.add_done_callback(self.__release)
+            log.warning('callback exceeded deadline of %ss', timeout)
+            raise ExecutionTimeout(
+                f"callback exceeded deadline of {timeout}s"
+            ) from None
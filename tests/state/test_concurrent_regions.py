@@ -0,0 +1,129 @@
+"""Test content of parallel regions run on an executor."""
+
+import copy
+import pickle  # nosec
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator
+
+import pytest
+
+from superstate import InvalidConfig, StateChart
+
+REGIONS = 4
+barrier = threading.Barrier(REGIONS, timeout=5)
+exited: list = []
+
+
+def enter(index: int) -> Callable[[], None]:
+    """Get blocking entry content finishing in reverse region order."""
+
+    def wait() -> None:
+        barrier.wait()
+        time.sleep((REGIONS - index) * 0.01)
+
+    return wait
+
+
+def region(index: int) -> Dict[str, Any]:
+    """Get settings of region raising its event when entered."""
+    return {
+        'name': f"region{index}",
+        'on_entry': [enter(index), {'raise': {'event': f"ready.{index}"}}],
+        'on_exit': lambda: exited.append(index),
+    }
+
+
+class Intersection(StateChart):
+    """Provide intersection with independent signals."""
+
+    state = {
+        'initial': 'running',
+        'states': [
+            {
+                'name': 'running',
+                'type': 'parallel',
+                'states': [region(x) for x in range(REGIONS)]
+                + [
+                    {
+                        'name': 'monitor',
+                        'initial': 'waiting0',
+                        'states': [
+                            {
+                                'name': f"waiting{x}",
+                                'transitions': [
+                                    {
+                                        'event': f"ready.{x}",
+                                        'target': f"waiting{x + 1}",
+                                    }
+                                ],
+                            }
+                            for x in range(REGIONS)
+                        ]
+                        + [{'name': f"waiting{REGIONS}"}],
+                    }
+                ],
+                'transitions': [{'event': 'stop', 'target': 'stopped'}],
+            },
+            {'name': 'stopped'},
+        ],
+    }
+
+
+class Switch(StateChart):
+    """Provide switch without an executor."""
+
+    state = {
+        'initial': 'off',
+        'states': [
+            {
+                'name': 'off',
+                'transitions': [{'event': 'on', 'target': 'on'}],
+            },
+            {'name': 'on'},
+        ],
+    }
+
+
+@pytest.fixture(name='executor', scope='module')
+def fixture_executor() -> Iterator[ThreadPoolExecutor]:
+    """Get executor running a thread for each region."""
+    with ThreadPoolExecutor(max_workers=REGIONS) as executor:
+        yield executor
+
+
+def test_regions_run_concurrently(executor: ThreadPoolExecutor) -> None:
+    """Test regions are joined and raise events in region order."""
+    intersection = Intersection(executor=executor)
+    # regions only pass the barrier when entered concurrently
+    assert barrier.n_waiting == 0
+    assert 'waiting4' in intersection.active
+
+
+def test_region_exit_order(executor: ThreadPoolExecutor) -> None:
+    """Test exit content of regions completes before the transition."""
+    intersection = Intersection(executor=executor)
+    exited.clear()
+    intersection.trigger('stop')
+    assert intersection.current_state == 'stopped'
+    assert sorted(exited) == list(range(REGIONS))
+
+
+def test_process_executor_rejected() -> None:
+    """Test content cannot run in other processes."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        with pytest.raises(InvalidConfig):
+            Intersection(executor=executor)
+
+
+def test_thread_local_state_copied() -> None:
+    """Test charts without an executor can be pickled and copied."""
+    switch = Switch()
+    for copied in (
+        copy.deepcopy(switch),
+        pickle.loads(pickle.dumps(switch)),  # nosec
+    ):
+        copied.trigger('on')
+        assert copied.current_state == 'on'
+    assert switch.current_state == 'off'
@@ -0,0 +1,176 @@
+"""Test history states restoring compound states."""
+
+from typing import Any
+
+from superstate import HistoryState, StateChart
+
+entered: list = []
+
+
+class Wizard(StateChart):
+    """Provide wizard that can be paused and resumed."""
+
+    state = {
+        'initial': 'wizard',
+        'states': [
+            {
+                'name': 'wizard',
+                'initial': 'account',
+                'states': [
+                    {
+                        'name': 'account',
+                        'initial': 'username',
+                        'states': [
+                            {
+                                'name': 'username',
+                                'on_entry': lambda: entered.append('username'),
+                                'transitions': [
+                                    {'event': 'next', 'target': 'email'}
+                                ],
+                            },
+                            {
+                                'name': 'email',
+                                'on_entry': lambda: entered.append('email'),
+                                'transitions': [
+                                    {'event': 'next', 'target': 'payment'}
+                                ],
+                            },
+                        ],
+                    },
+                    {'name': 'payment'},
+                    {'name': 'last', 'type': 'history'},
+                    {
+                        'name': 'resume',
+                        'type': 'history',
+                        'history': 'deep',
+                        'transitions': [{'target': 'payment'}],
+                    },
+                ],
+                'transitions': [{'event': 'pause', 'target': 'paused'}],
+            },
+            {
+                'name': 'paused',
+                'transitions': [
+                    {'event': 'back', 'target': 'last'},
+                    {'event': 'resume', 'target': 'resume'},
+                ],
+            },
+        ],
+    }
+
+
+def walk(*events: Any) -> Wizard:
+    """Get wizard after processing events."""
+    entered.clear()
+    wizard = Wizard()
+    for event in events:
+        wizard.trigger(event)
+    return wizard
+
+
+def test_deep_history_restores_descendants() -> None:
+    """Test deep history restores atomic state without initial states."""
+    wizard = walk('next', 'pause')
+    history = wizard.get_state('resume')
+    assert isinstance(history, HistoryState)
+    assert history.snapshot == ('account', 'email')
+    wizard.trigger('resume')
+    assert wizard.current_state == 'email'
+    assert entered == ['username', 'email', 'email']
+
+
+def test_shallow_history_restores_substate() -> None:
+    """Test shallow history enters initial states of restored substate."""
+    wizard = walk('next', 'pause')
+    assert wizard.get_state('last').snapshot == ('account',)
+    wizard.trigger('back')
+    assert wizard.current_state == 'username'
+    wizard = walk('next', 'next', 'pause', 'back')
+    assert wizard.current_state == 'payment'
+
+
+def test_history_default_transition() -> None:
+    """Test history without records takes its default transition."""
+    entered.clear()
+    wizard = Wizard(initial='paused')
+    wizard.trigger('resume')
+    assert wizard.current_state == 'payment'
+    assert not entered
+
+
+class Editor(StateChart):
+    """Provide editor with independent formatting regions."""
+
+    state = {
+        'initial': 'editing',
+        'states': [
+            {
+                'name': 'editing',
+                'initial': 'format',
+                'states': [
+                    {
+                        'name': 'format',
+                        'type': 'parallel',
+                        'states': [
+                            {
+                                'name': 'weight',
+                                'initial': 'normal',
+                                'states': [
+                                    {
+                                        'name': 'normal',
+                                        'transitions': [
+                                            {'event': 'bold', 'target': 'bold'}
+                                        ],
+                                    },
+                                    {'name': 'bold'},
+                                ],
+                            },
+                            {
+                                'name': 'style',
+                                'initial': 'upright',
+                                'states': [
+                                    {
+                                        'name': 'upright',
+                                        'transitions': [
+                                            {
+                                                'event': 'italic',
+                                                'target': 'italic',
+                                            }
+                                        ],
+                                    },
+                                    {'name': 'italic'},
+                                ],
+                            },
+                        ],
+                    },
+                    {'name': 'resume', 'type': 'history', 'history': 'deep'},
+                ],
+                'transitions': [{'event': 'save', 'target': 'saving'}],
+            },
+            {
+                'name': 'saving',
+                'transitions': [{'event': 'done', 'target': 'resume'}],
+            },
+        ],
+    }
+
+
+def test_deep_history_restores_parallel_regions() -> None:
+    """Test deep history restores the active state of each region."""
+    editor = Editor()
+    editor.trigger_at('weight', 'bold')
+    editor.trigger_at('style', 'italic')
+    editor.trigger('save')
+    assert editor.get_state('resume').snapshot == (
+        'format',
+        (('weight', 'bold'), ('style', 'italic')),
+    )
+    editor.trigger('done')
+    names = {x.name for x in editor.active}
+    assert {'bold', 'italic'} <= names
+    assert not {'normal', 'upright'} & names
+    # recorded regions survive snapshots
+    editor.trigger('save')
+    restored = Editor.restore(editor.snapshot())
+    restored.trigger('done')
+    assert {'bold', 'italic'} <= {x.name for x in restored.active}
@@ -0,0 +1,81 @@
+"""Test early and late binding of datamodels."""
+
+from typing import Any, Dict
+
+from superstate import StateChart
+
+
+class Wizard(StateChart):
+    """Provide statechart with late bound datamodels."""
+
+    __binding__ = 'late'
+    datamodel: Dict[str, Any] = {'data': [{'id': 'steps', 'expr': '3'}]}
+    state = {
+        'initial': 'start',
+        'states': [
+            {
+                'name': 'start',
+                'datamodel': {'data': [{'id': 'page', 'expr': 'intro'}]},
+                'transitions': [{'event': 'next', 'target': 'finish'}],
+            },
+            {
+                'name': 'finish',
+                'datamodel': {'data': [{'id': 'page', 'expr': 'summary'}]},
+            },
+        ],
+    }
+
+
+class Form(StateChart):
+    """Provide statechart with early bound datamodels."""
+
+    __binding__ = 'early'
+    state = {
+        'initial': 'empty',
+        'states': [
+            {
+                'name': 'empty',
+                'datamodel': {'data': [{'id': 'fields', 'expr': 'none'}]},
+            },
+        ],
+    }
+
+
+def test_late_binding_on_entry() -> None:
+    """Test late bound data is populated on first entry to its state."""
+    wizard = Wizard()
+    assert wizard.current_state.datamodel.populated is True
+    finish = wizard.get_state('finish')
+    assert finish.datamodel.populated is False
+    wizard.trigger('next')
+    assert finish.datamodel.populated is True
+    assert finish.datamodel['page'] == 'summary'
+
+
+def test_late_binding_on_read() -> None:
+    """Test late bound data is populated on first read."""
+    wizard = Wizard()
+    assert wizard.datamodel.populated is False
+    assert wizard.datamodel['steps'] == '3'
+    assert wizard.datamodel.populated is True
+    finish = wizard.get_state('finish')
+    assert finish.datamodel.populated is False
+    assert finish.datamodel['page'] == 'summary'
+    assert finish.datamodel.populated is True
+
+
+def test_binding_per_statechart() -> None:
+    """Test binding is configured for each statechart independently."""
+    form = Form()
+    wizard = Wizard()
+    assert form.datamodel.binding == 'early'
+    assert wizard.datamodel.binding == 'late'
+    assert form.get_state('empty').datamodel.populated is True
+    assert wizard.get_state('finish').datamodel.populated is False
+
+
+def test_datamodel_not_shared_between_instances() -> None:
+    """Test each instance binds its own datamodel."""
+    first, second = Wizard(), Wizard()
+    first.datamodel['steps'] = '4'
+    assert second.datamodel['steps'] == '3'
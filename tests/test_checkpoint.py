@@ -0,0 +1,87 @@
+"""Test checkpoints holding datamodel items written since the last one."""
+
+import marshal
+from typing import Any, Dict
+
+import pytest
+
+from superstate import InvalidState, StateChart
+from superstate.model.data import Data, DataModel
+
+
+class Cart(StateChart):
+    """Provide cart with many items of which few change on each event."""
+
+    __tracking__ = True
+
+    datamodel: Dict[str, Any] = {
+        'data': [{'id': f"item{x}", 'expr': x} for x in range(100)]
+    }
+    state = {
+        'name': 'cart',
+        'initial': 'open',
+        'states': [
+            {
+                'name': 'open',
+                'datamodel': {'data': [{'id': 'count', 'expr': 0}]},
+                'transitions': [
+                    {
+                        'event': 'add',
+                        'target': 'open',
+                        'content': [
+                            {
+                                'assign': {
+                                    'location': 'count',
+                                    'expr': 'count + 1',
+                                }
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def test_datamodel_tracks_writes() -> None:
+    """Test only variables written since the last checkpoint are dirty."""
+    datamodel = DataModel([Data('a', expr=1), Data('b', expr=2)])
+    datamodel.populate()
+    datamodel['a'] = 3
+    assert datamodel.checkpoint() is None
+    datamodel.tracking = True
+    datamodel['a'] = 4
+    datamodel['c'] = 5
+    del datamodel['b']
+    assert datamodel.dirty == {'a', 'b', 'c'}
+    assert datamodel.checkpoint() == ({'a': 4, 'c': 5}, ('b',))
+    assert not datamodel.dirty
+    assert datamodel.checkpoint() is None
+    # items reset to their declared values are replaced wholesale
+    datamodel.reset()
+    changed, removed = datamodel.checkpoint()
+    assert changed == {'a': 1, 'b': 2} and removed == ('c',)
+
+
+def test_checkpoint_holds_changed_items() -> None:
+    """Test replicas converge by merging checkpoints of a primary."""
+    primary, replica = Cart(), Cart(tracking=False)
+    assert primary.checkpoint()
+    primary.trigger('add')
+    primary.datamodel['item7'] = 'x'
+    content = primary.checkpoint()
+    assert len(content) < len(marshal.dumps(dict(primary.datamodel))) / 10
+    replica.merge(content)
+    assert replica.current_state.datamodel['count'] == 1
+    assert replica.datamodel['item7'] == 'x'
+    assert replica.datamodel['item8'] == 8
+    # nothing is written between checkpoints
+    replica.merge(primary.checkpoint())
+    assert replica.current_state.datamodel['count'] == 1
+
+
+def test_checkpoint_requires_tracking() -> None:
+    """Test checkpoints are only taken of statecharts tracking writes."""
+    cart = Cart(tracking=False)
+    with pytest.raises(InvalidState):
+        cart.checkpoint()
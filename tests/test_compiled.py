@@ -0,0 +1,155 @@
+"""Test statecharts loaded from compiled definitions."""
+
+from importlib.util import find_spec
+from pathlib import Path
+from types import CodeType
+from typing import Any, Dict
+
+import pytest
+
+from superstate import StateChart, compiled
+from superstate.exception import InvalidConfig
+
+
+def settings(size: int = 3) -> Dict[str, Any]:
+    """Get settings of a generated counter with a chain of states."""
+    return {
+        '__name__': 'counter',
+        'datamodel': {'data': [{'id': 'count', 'expr': 0}]},
+        'state': {
+            'initial': 'step0',
+            'states': [
+                {
+                    'name': f"step{x}",
+                    'transitions': [
+                        {
+                            'event': 'next',
+                            'target': f"step{(x + 1) % size}",
+                            'cond': 'count < 2 * %d' % size,
+                            'content': [
+                                {
+                                    'assign': {
+                                        'location': 'count',
+                                        'expr': 'count + 1',
+                                    }
+                                }
+                            ],
+                        }
+                    ],
+                }
+                for x in range(size)
+            ]
+            + [{'name': 'done', 'type': 'final'}],
+        },
+    }
+
+
+def test_compiled_round_trip(tmp_path: Path) -> None:
+    """Test compiled definition rebuilds the settings it was compiled from."""
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(settings(), str(path))
+    definition = compiled.loads(path.read_bytes())
+    assert definition['__name__'] == 'counter'
+    assert definition['datamodel'] == settings()['datamodel']
+    states = definition['state']['states']
+    assert [x['name'] for x in states] == ['step0', 'step1', 'step2', 'done']
+    assert states[3] == {'name': 'done', 'type': 'final'}
+    transition = states[0]['transitions'][0]
+    assert transition['target'] == 'step1'
+    # expressions are stored as bytecode and names are interned
+    assert isinstance(transition['cond'], CodeType)
+    assert eval(transition['cond'], {'count': 5}) is True  # nosec
+    assert transition['event'] is states[1]['transitions'][0]['event']
+
+
+def test_from_compiled(tmp_path: Path) -> None:
+    """Test compiled definition creates an equivalent statechart."""
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(settings(), str(path))
+    Counter = StateChart.from_compiled(path)
+    assert Counter.__name__ == 'counter'
+    counter = Counter()
+    for _ in range(4):
+        counter.trigger('next')
+    assert counter.current_state == 'step1'
+    assert counter.datamodel['count'] == 4
+
+
+def test_compiled_rejects_invalid(tmp_path: Path) -> None:
+    """Test callables and foreign definitions are rejected."""
+    invalid = settings()
+    invalid['state']['states'][0]['on_entry'] = lambda: None
+    with pytest.raises(InvalidConfig):
+        compiled.dumps(invalid)
+    content = bytearray(compiled.dumps(settings()))
+    content[4] = compiled.VERSION + 1
+    with pytest.raises(InvalidConfig):
+        compiled.loads(bytes(content))
+    with pytest.raises(InvalidConfig):
+        compiled.loads(b'<scxml/>')
+
+
+@pytest.mark.skipif(
+    find_spec('pytest_benchmark') is None, reason='requires pytest-benchmark'
+)
+@pytest.mark.parametrize('source', ['settings', 'compiled'])
+def test_startup_benchmark(
+    source: str, tmp_path: Path, benchmark: Any
+) -> None:
+    """Benchmark loading a large chart against building it from settings."""
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(settings(5000), str(path))
+    benchmark.group = 'startup'
+    if source == 'compiled':
+        benchmark(StateChart.from_compiled, path)
+    else:
+        benchmark(
+            lambda: type(StateChart)('counter', (StateChart,), settings(5000))
+        )
+
+
+def test_compiled_event_data(tmp_path: Path) -> None:
+    """Test compiled expressions read event data as locals."""
+    definition = settings()
+    transition = definition['state']['states'][0]['transitions'][0]
+    transition['cond'] = 'count + step < 2'
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(definition, str(path))
+    counter = StateChart.from_compiled(path)()
+    assert counter.try_trigger('next', step=5).outcome == 'blocked'
+    counter.trigger('next', step=1)
+    assert counter.current_state == 'step1'
+
+
+def test_compiled_condition_list(tmp_path: Path) -> None:
+    """Test each condition of a condition list is compiled."""
+    definition = settings()
+    transition = definition['state']['states'][0]['transitions'][0]
+    transition['cond'] = ['count < 2', 'step > 0']
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(definition, str(path))
+    states = compiled.loads(path.read_bytes())['state']['states']
+    cond = states[0]['transitions'][0]['cond']
+    assert all(isinstance(x, CodeType) for x in cond)
+    counter = StateChart.from_compiled(path)()
+    assert counter.try_trigger('next', step=0).outcome == 'blocked'
+    counter.trigger('next', step=1)
+    assert counter.current_state == 'step1'
+
+
+def test_compiled_skips_compiling(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test loading compiled definition does not compile expressions."""
+    path = tmp_path / 'counter.ssc'
+    compiled.dump(settings(), str(path))
+
+    def fail(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError('expression compiled while loading')
+
+    monkeypatch.setattr('builtins.compile', fail)
+    Counter = StateChart.from_compiled(path)
+    monkeypatch.undo()
+    counter = Counter()
+    counter.trigger('next')
+    assert counter.current_state == 'step1'
@@ -0,0 +1,178 @@
+"""Test loading data sources shared between datamodels."""
+
+import json
+import threading
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+from typing import Any, Dict, Generator, List
+
+import pytest
+
+from superstate import StateChart
+from superstate.model.source import SOURCES, SourceCache
+
+SCHEMA = {'type': 'object', 'required': ['id']}
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Serve JSON documents with entity tags."""
+
+    requests: List[int] = []
+
+    def log_message(self, *args: Any) -> None:
+        """Suppress request logging."""
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve document unless the entity tag matches."""
+        content = json.dumps(SCHEMA).encode()
+        if self.headers.get('If-None-Match') == '"v1"':
+            Handler.requests.append(304)
+            self.send_response(304)
+            self.end_headers()
+            return
+        Handler.requests.append(200)
+        self.send_response(200)
+        # raw file hosts serve documents without a specific type
+        plain = self.path.startswith('/plain/')
+        self.send_header(
+            'Content-Type', 'text/plain' if plain else 'application/json'
+        )
+        self.send_header('Content-Length', str(len(content)))
+        self.send_header('ETag', '"v1"')
+        self.end_headers()
+        self.wfile.write(content)
+
+
+@pytest.fixture
+def server() -> Generator[str, None, None]:
+    """Provide a local HTTP server standing in for remote sources."""
+    Handler.requests = []
+    httpd = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    SOURCES.clear()
+
+
+def test_http_source_cached(server: str) -> None:
+    """Test sources are downloaded once within their TTL."""
+    cache = SourceCache()
+    assert cache.load(f"{server}/schema.json") == SCHEMA
+    assert cache.load(f"{server}/schema.json") == SCHEMA
+    assert Handler.requests == [200]
+
+
+def test_http_source_revalidated(server: str) -> None:
+    """Test expired sources are revalidated with their entity tag."""
+    cache = SourceCache(ttl=0)
+    assert cache.load(f"{server}/schema.json") == SCHEMA
+    assert cache.load(f"{server}/schema.json") == SCHEMA
+    assert Handler.requests == [200, 304]
+
+
+def test_cache_bounded(server: str) -> None:
+    """Test least recently used sources are evicted."""
+    cache = SourceCache(maxsize=1)
+    cache.load(f"{server}/first.json")
+    cache.load(f"{server}/second.json")
+    assert len(cache) == 1
+    assert f"{server}/second.json" in cache
+
+
+def test_file_source(tmp_path: Path) -> None:
+    """Test local files are loaded and reloaded when modified."""
+    path = tmp_path / 'schema.json'
+    path.write_text(json.dumps(SCHEMA))
+    cache = SourceCache(ttl=0)
+    assert cache.load(path.as_uri()) == SCHEMA
+    path.write_text(json.dumps({'type': 'string'}))
+    assert cache.load(path.as_uri()) == {'type': 'string'}
+
+
+def test_datamodel_prefetch(server: str) -> None:
+    """Test datamodels share sources across states and instances."""
+
+    class Validator(StateChart):
+        """Provide statechart with data sources."""
+
+        datamodel: Dict[str, Any] = {
+            'data': [
+                {'id': 'schema', 'src': f"{server}/schema.json"},
+                {'id': 'other', 'src': f"{server}/other.json"},
+            ]
+        }
+        state = {
+            'initial': 'idle',
+            'states': [
+                {
+                    'name': 'idle',
+                    'datamodel': {
+                        'data': [
+                            {'id': 'rules', 'src': f"{server}/schema.json"}
+                        ]
+                    },
+                },
+            ],
+        }
+
+    first, second = Validator(), Validator()
+    assert first.datamodel['schema'] == SCHEMA
+    assert second.current_state.datamodel['rules'] == SCHEMA
+    assert Handler.requests == [200, 200]
+
+
+def test_source_values_independent(tmp_path: Path) -> None:
+    """Test values loaded from a cached source are not shared."""
+    path = tmp_path / 'config.json'
+    path.write_text(json.dumps({'a': 1}))
+    cache = SourceCache()
+    first = cache.load(path.as_uri())
+    first['a'] = 99
+    assert cache.load(path.as_uri()) == {'a': 1}
+
+
+def test_plain_text_source(server: str) -> None:
+    """Test JSON served as plain text is decoded by its extension."""
+    cache = SourceCache()
+    assert cache.load(f"{server}/plain/schema.json") == SCHEMA
+
+
+def test_chart_prefetch(server: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test sources of every datamodel of a chart are fetched together."""
+    batches: list = []
+    prefetch = SOURCES.prefetch
+
+    def record(uris: Any, workers: Any = None) -> None:
+        uris = list(uris)
+        batches.append(uris)
+        prefetch(uris, workers)
+
+    monkeypatch.setattr(SOURCES, 'prefetch', record)
+
+    class Catalog(StateChart):
+        """Provide statechart with sources in nested datamodels."""
+
+        datamodel: Dict[str, Any] = {
+            'data': [{'id': 'schema', 'src': f"{server}/catalog.json"}]
+        }
+        state = {
+            'initial': 'idle',
+            'states': [
+                {
+                    'name': 'idle',
+                    'datamodel': {
+                        'data': [
+                            {'id': 'items', 'src': f"{server}/items.json"}
+                        ]
+                    },
+                },
+            ],
+        }
+
+    assert {f"{server}/catalog.json", f"{server}/items.json"} <= set(
+        batches[0]
+    )
+    assert Catalog().current_state.datamodel['items'] == SCHEMA
+    assert sorted(Handler.requests) == [200, 200]
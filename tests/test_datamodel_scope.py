@@ -0,0 +1,104 @@
+"""Test datamodels chained between nested states."""
+
+from typing import Any, Dict
+
+from superstate import StateChart
+
+
+class Checkout(StateChart):
+    """Provide statechart with nested datamodel scopes."""
+
+    datamodel: Dict[str, Any] = {'data': [{'id': 'currency', 'expr': 'usd'}]}
+    state = {
+        'name': 'checkout',
+        'initial': 'cart',
+        'datamodel': {'data': [{'id': 'total', 'expr': 0}]},
+        'states': [
+            {
+                'name': 'cart',
+                'initial': 'browsing',
+                'datamodel': {'data': [{'id': 'items', 'expr': 0}]},
+                'states': [
+                    {
+                        'name': 'browsing',
+                        'datamodel': {'data': [{'id': 'total', 'expr': 1}]},
+                        'transitions': [
+                            {
+                                'event': 'add',
+                                'target': 'browsing',
+                                'content': [
+                                    {
+                                        'assign': {
+                                            'location': 'items',
+                                            'expr': 'items + 1',
+                                        }
+                                    }
+                                ],
+                            },
+                            {
+                                'event': 'pay',
+                                'cond': 'items > 0',
+                                'target': 'paid',
+                            },
+                        ],
+                    },
+                ],
+            },
+            {'name': 'paid'},
+        ],
+    }
+
+
+def test_ancestor_variables_visible() -> None:
+    """Test variables of enclosing scopes are resolved from substates."""
+    checkout = Checkout()
+    datamodel = checkout.current_state.datamodel
+    assert datamodel['currency'] == 'usd'
+    assert datamodel['items'] == 0
+    assert set(datamodel) == {'currency', 'total', 'items'}
+
+
+def test_nested_variables_shadow_ancestors() -> None:
+    """Test variables declared by substates take precedence."""
+    checkout = Checkout()
+    assert checkout.current_state.datamodel['total'] == 1
+    assert checkout.get_state('checkout').datamodel['total'] == 0
+
+
+def test_assign_within_declaring_scope() -> None:
+    """Test assignment updates the scope declaring the variable."""
+    checkout = Checkout()
+    assert checkout.can_trigger('pay') is False
+    checkout.trigger('add')
+    assert checkout.get_state('cart').datamodel.maps[0]['items'] == 1
+    assert 'items' not in checkout.current_state.datamodel.maps[0]
+    checkout.trigger('pay')
+    assert checkout.current_state == 'paid'
+
+
+def test_index_updated_with_new_variables() -> None:
+    """Test resolution reflects variables added to enclosing scopes."""
+    checkout = Checkout()
+    datamodel = checkout.current_state.datamodel
+    assert 'coupon' not in datamodel
+    checkout.datamodel['coupon'] = 'save10'
+    assert datamodel['coupon'] == 'save10'
+    assert datamodel.index['coupon'] is checkout.datamodel
+
+
+def test_expressions_resolve_through_scope() -> None:
+    """Test expressions read variables through the current scope."""
+    checkout = Checkout()
+    datamodel = checkout.current_state.datamodel
+    provider = datamodel.provider(checkout)
+    assert any(x is datamodel for x in provider.locals.maps)
+    assert provider.eval('currency == "usd" and total == 1') is True
+
+
+def test_nested_scopes_resolve_variables() -> None:
+    """Test comprehensions and lambdas within expressions see variables."""
+    checkout = Checkout()
+    provider = checkout.current_state.datamodel.provider(checkout)
+    assert provider.eval('[x for x in [0, 1, 2] if x < total] == [0]')
+    assert provider.eval('(lambda: currency)() == "usd"')
+    assert provider.exec('[x + items for x in (total,)]') == [1]
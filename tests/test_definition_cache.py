@@ -0,0 +1,104 @@
+"""Test definitions shared by statecharts with identical settings."""
+
+from typing import Any, Dict
+
+from superstate import State, StateChart
+from superstate.cache import DEFINITIONS, DefinitionCache, fingerprint
+
+
+def tenant(guard: Any = 'ready') -> Dict[str, Any]:
+    """Get settings generated for each tenant."""
+    return {
+        'initial': 'idle',
+        'states': [
+            {
+                'name': 'idle',
+                'transitions': [
+                    {'event': 'start', 'target': 'running', 'cond': guard}
+                ],
+            },
+            {'name': 'running'},
+        ],
+    }
+
+
+def test_fingerprint_is_canonical() -> None:
+    """Test fingerprint ignores mapping order but not values."""
+    assert fingerprint({'a': 1, 'b': [1, 2]}) == fingerprint(
+        {'b': [1, 2], 'a': 1}
+    )
+    assert fingerprint({'a': 1}) != fingerprint({'a': True})
+    assert fingerprint({'a': [1, 2]}) != fingerprint({'a': [2, 1]})
+    assert fingerprint({'state': State('idle')}) is None
+
+
+def test_identical_definitions_are_shared() -> None:
+    """Test classes created from identical settings share a definition."""
+    DEFINITIONS.clear()
+    First = type(StateChart)('first', (StateChart,), {'state': tenant()})
+    Second = type(StateChart)('second', (StateChart,), {'state': tenant()})
+    Other = type(StateChart)(
+        'other', (StateChart,), {'state': tenant('started')}
+    )
+    assert First._root is Second._root
+    assert First._root is not Other._root
+    info = DEFINITIONS.info
+    assert (info.hits, info.misses, info.size) == (1, 2, 2)
+
+    # instances of each class remain independent
+    first, second = First(data={'ready': True}), Second()
+    first.trigger('start')
+    assert first.current_state == 'running'
+    assert second.current_state == 'idle'
+
+
+def test_definition_cache_eviction() -> None:
+    """Test least recently used definitions are evicted."""
+    cache = DefinitionCache(maxsize=2)
+    built: list = []
+
+    def build(value: str) -> Any:
+        built.append(value)
+        return value
+
+    for value in ('a', 'b', 'a', 'c', 'b'):
+        cache.load({'state': value}, lambda x=value: build(x))
+    assert built == ['a', 'b', 'c', 'b']
+    info = cache.info
+    assert (info.hits, info.misses, info.evictions) == (1, 4, 2)
+    assert len(cache) == 2
+
+
+def test_settings_reused() -> None:
+    """Test the same settings define classes without being consumed."""
+    DEFINITIONS.clear()
+    settings = tenant()
+    First = type(StateChart)('first', (StateChart,), {'state': settings})
+    Second = type(StateChart)('second', (StateChart,), {'state': settings})
+    assert First._root is Second._root
+    assert DEFINITIONS.info.hits == 1
+
+
+def test_collected_callables_never_match() -> None:
+    """Test entries only match the callables they were built with."""
+    cache = DefinitionCache()
+    built: list = []
+
+    def guard() -> bool:
+        return True
+
+    def other() -> bool:
+        return False
+
+    cache.load({'cond': guard}, lambda: built.append(guard))
+    cache.load({'cond': guard}, lambda: built.append(guard))
+    assert len(built) == 1
+    # stand in for a callable reusing the address of a collected one
+    key = fingerprint({'cond': guard})
+    assert key is not None
+    entries = cache._DefinitionCache__entries  # type: ignore
+    entries[key] = (entries.pop(key)[0], 'stale')
+    assert cache.load({'cond': guard}, lambda: 'fresh') == 'stale'
+    refs = (lambda: other,)
+    entries[key] = (refs, 'stale')
+    assert cache.load({'cond': guard}, lambda: 'fresh') == 'fresh'
@@ -0,0 +1,90 @@
+"""Test iteration of datamodel arrays with foreach."""
+
+from array import array
+from typing import Any, Dict, Iterator
+
+import pytest
+
+from superstate import StateChart
+
+
+def samples() -> Iterator[int]:
+    """Provide samples without materializing them."""
+    yield from range(10)
+
+
+class Sensor(StateChart):
+    """Provide statechart processing sample buffers."""
+
+    datamodel: Dict[str, Any] = {'data': [{'id': 'buffer'}]}
+    state = {
+        'initial': 'idle',
+        'states': [
+            {
+                'name': 'idle',
+                'transitions': [{'event': 'sample', 'target': 'sampling'}],
+            },
+            {
+                'name': 'sampling',
+                'on_entry': [
+                    {
+                        'foreach': {
+                            'array': 'buffer',
+                            'item': 'value',
+                            'index': 'position',
+                            'batch': 4,
+                            'content': [
+                                {
+                                    'script': {
+                                        'src': lambda ctx, value, position: (
+                                            ctx.chunks.append(
+                                                (position, list(value))
+                                            )
+                                        ),
+                                        'vectorized': True,
+                                    }
+                                },
+                                lambda ctx, value, position: (
+                                    ctx.items.append(value)
+                                ),
+                            ],
+                        }
+                    }
+                ],
+            },
+        ],
+    }
+
+    def __init__(self, buffer: Any) -> None:
+        self.chunks: list = []
+        self.items: list = []
+        super().__init__()
+        self.datamodel['buffer'] = buffer
+
+
+@pytest.mark.parametrize(
+    'buffer',
+    [list(range(10)), array('d', range(10)), samples(), iter(range(10))],
+)
+def test_foreach_batches(buffer: Any) -> None:
+    """Test chunks are passed to vectorized actions and items to others."""
+    sensor = Sensor(buffer)
+    sensor.trigger('sample')
+    assert [x for x, _ in sensor.chunks] == [0, 4, 8]
+    assert [x for _, y in sensor.chunks for x in y] == list(range(10))
+    assert sensor.items == list(range(10))
+
+
+def test_foreach_numpy_views() -> None:
+    """Test numpy arrays are sliced into views for vectorized actions."""
+    numpy = pytest.importorskip('numpy')
+    sensor = Sensor(numpy.arange(10))
+    sensor.trigger('sample')
+    assert [len(x) for _, x in sensor.chunks] == [4, 4, 2]
+
+
+def test_foreach_missing_array() -> None:
+    """Test iteration of a missing datamodel attribute fails."""
+    sensor = Sensor(None)
+    with pytest.raises(AttributeError):
+        sensor.trigger('sample')
@@ -0,0 +1,197 @@
+"""Test idle statecharts hibernated to a store and rehydrated."""
+
+from typing import Any, Dict
+from uuid import uuid4
+
+import pytest
+
+from superstate import InvalidState, StateChart
+from superstate.hibernate import DirectoryStore, InstanceManager, SQLiteStore
+from superstate.scheduler import ManualClock, Scheduler
+
+A, B = str(uuid4()), str(uuid4())
+entered: list = []
+
+
+class Session(StateChart):
+    """Provide session counting requests until it expires."""
+
+    datamodel: Dict[str, Any] = {
+        'data': [{'id': 'requests', 'expr': 0}, {'id': 'log', 'expr': []}]
+    }
+    state = {
+        'initial': 'active',
+        'states': [
+            {
+                'name': 'active',
+                'initial': 'idle',
+                'on_entry': lambda: entered.append('active'),
+                'states': [
+                    {
+                        'name': 'idle',
+                        'transitions': [
+                            {
+                                'event': 'request',
+                                'target': 'busy',
+                                'content': [
+                                    {
+                                        'assign': {
+                                            'location': 'requests',
+                                            'expr': 'requests + 1',
+                                        }
+                                    },
+                                    lambda ctx: ctx.datamodel['log'].append(
+                                        'request'
+                                    ),
+                                    {
+                                        'send': {
+                                            'event': 'expire',
+                                            'delay': '30s',
+                                            'id': 'expiry',
+                                        }
+                                    },
+                                ],
+                            }
+                        ],
+                    },
+                    {
+                        'name': 'busy',
+                        'transitions': [{'event': 'done', 'target': 'idle'}],
+                    },
+                    {'name': 'last', 'type': 'history'},
+                ],
+                'transitions': [
+                    {'event': 'pause', 'target': 'paused'},
+                    {'event': 'expire', 'target': 'expired'},
+                ],
+            },
+            {
+                'name': 'paused',
+                'transitions': [{'event': 'resume', 'target': 'last'}],
+            },
+            {'name': 'expired'},
+        ],
+    }
+
+
+@pytest.fixture(name='clock')
+def fixture_clock() -> ManualClock:
+    """Get clock of the scheduler shared by sessions."""
+    return ManualClock()
+
+
+@pytest.fixture(name='manager')
+def fixture_manager(clock: ManualClock) -> InstanceManager:
+    """Get manager keeping a single session resident."""
+    return InstanceManager(
+        Session, maxsize=1, scheduler=Scheduler(clock=clock, resolution=1)
+    )
+
+
+def test_rehydrate_restores_configuration(manager: InstanceManager) -> None:
+    """Test evicted sessions resume without entering initial states."""
+    manager.create(A)
+    manager.send(A, 'request')
+    manager.send(A, 'pause')
+    manager.create(B)
+    assert len(manager) == 1
+    assert manager.info.evictions == 1
+    entered.clear()
+
+    session = manager.get(A)
+    assert session.current_state == 'paused'
+    assert session.datamodel['requests'] == 1
+    # items mutated in place are not mistaken for their defaults
+    assert session.datamodel['log'] == ['request']
+    assert not entered
+    manager.send(A, 'resume')
+    assert session.current_state == 'busy'
+    info = manager.info
+    assert (info.live, info.evictions, info.rehydrations) == (1, 2, 1)
+    assert info.rehydration_time > 0
+
+
+def test_timers_wake_hibernated_session(
+    manager: InstanceManager, clock: ManualClock
+) -> None:
+    """Test sessions are rehydrated once their pending timers are due."""
+    session = manager.create(A)
+    manager.send(A, 'request')
+    scheduler = session.scheduler
+    manager.create(B)
+    assert (A, 'expiry') not in scheduler
+    clock.advance(29)
+    scheduler.advance()
+    assert manager.info.rehydrations == 0
+    clock.advance(1)
+    scheduler.advance()
+    assert manager.info.rehydrations == 1
+    assert manager.get(A).current_state == 'expired'
+
+
+def test_send_rehydrates_hibernated_session(
+    manager: InstanceManager,
+) -> None:
+    """Test events sent by other statecharts rehydrate their target."""
+
+    class Client(StateChart):
+        """Provide statechart sending requests to a session."""
+
+        state = {
+            'initial': 'ready',
+            'states': [
+                {
+                    'name': 'ready',
+                    'transitions': [
+                        {
+                            'event': 'call',
+                            'content': [
+                                {
+                                    'send': {
+                                        'event': 'request',
+                                        'target': f"#_scxml_{A}",
+                                    }
+                                }
+                            ],
+                        }
+                    ],
+                }
+            ],
+        }
+
+    manager.create(A)
+    manager.create(B)
+    assert A in manager.store
+    scheduler = manager.options['scheduler']
+    Client(scheduler=scheduler).trigger('call')
+    scheduler.advance()
+    assert manager.info.rehydrations == 1
+    assert manager.get(A).datamodel['requests'] == 1
+
+
+def test_unknown_session(manager: InstanceManager) -> None:
+    """Test sessions that were never created cannot be rehydrated."""
+    with pytest.raises(InvalidState):
+        manager.send(str(uuid4()), 'request')
+    manager.create(A)
+    with pytest.raises(InvalidState):
+        manager.create(A)
+
+
+@pytest.mark.parametrize('kind', ['sqlite', 'directory'])
+def test_stores(kind: str, tmp_path: Any) -> None:
+    """Test dumped sessions are persisted by each store."""
+    store = (
+        SQLiteStore(tmp_path / 'sessions.db')
+        if kind == 'sqlite'
+        else DirectoryStore(tmp_path)
+    )
+    manager = InstanceManager(Session, store, maxsize=1)
+    manager.create(A)
+    manager.send(A, 'request')
+    manager.create(B)
+    assert list(store) == [A]
+    # another manager rehydrates sessions from a shared store
+    other = InstanceManager(Session, store, maxsize=1)
+    assert other.get(A).datamodel['requests'] == 1
+    assert A not in store
@@ -0,0 +1,131 @@
+"""Test child statecharts invoked by states."""
+
+from typing import Any, Dict
+
+import pytest
+
+from superstate import StateChart
+from superstate.exception import InvalidConfig
+from superstate.model.communication import Invoke
+from superstate.scheduler import ManualClock, Scheduler
+
+SCHEDULER = Scheduler(clock=ManualClock())
+
+
+class Payment(StateChart):
+    """Provide child statechart invoked for each order."""
+
+    __scheduler__ = SCHEDULER
+    datamodel: Dict[str, Any] = {'data': [{'id': 'amount', 'expr': 0}]}
+    state = {
+        'initial': 'pending',
+        'states': [
+            {
+                'name': 'pending',
+                'transitions': [{'event': 'approve', 'target': 'paid'}],
+            },
+            {'name': 'paid', 'type': 'final'},
+        ],
+    }
+
+
+class Order(StateChart):
+    """Provide statechart invoking a payment when paying."""
+
+    __scheduler__ = SCHEDULER
+    datamodel: Dict[str, Any] = {'data': [{'id': 'total', 'expr': 42}]}
+    state = {
+        'initial': 'paying',
+        'states': [
+            {
+                'name': 'paying',
+                'invoke': {
+                    'src': 'payment',
+                    'id': 'payment',
+                    'param': [{'name': 'amount', 'location': 'total'}],
+                    'finalize': lambda ctx, child: setattr(
+                        ctx, 'receipt', child.datamodel['amount']
+                    ),
+                },
+                'transitions': [
+                    {'event': 'done.invoke.payment', 'target': 'shipped'},
+                    {'event': 'cancel', 'target': 'cancelled'},
+                ],
+            },
+            {'name': 'shipped'},
+            {'name': 'cancelled'},
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def pool() -> None:
+    """Start each test with an empty pool."""
+    Payment._pool.clear()
+
+
+def test_invoke_with_params() -> None:
+    """Test child is started with params when the state is entered."""
+    order = Order()
+    payment = order.invoked['payment']
+    assert isinstance(payment, Payment)
+    assert payment.datamodel['amount'] == 42
+    assert payment.current_state == 'pending'
+
+
+def test_done_invoke_runs_finalize() -> None:
+    """Test finalize runs before done.invoke is dispatched."""
+    order = Order()
+    order.invoked['payment'].trigger('approve')
+    assert order.current_state == 'paying'
+    SCHEDULER.advance()
+    assert order.receipt == 42
+    assert order.current_state == 'shipped'
+    assert order.invoked == {}
+
+
+def test_exit_releases_child_to_pool() -> None:
+    """Test children are terminated on exit and recycled."""
+    first = Order()
+    payment = first.invoked['payment']
+    payment.trigger('approve')
+    first.trigger('cancel')
+    assert first.invoked == {}
+    assert Payment._pool == [payment]
+    # done.invoke from the terminated child is discarded
+    SCHEDULER.advance()
+    assert first.current_state == 'cancelled'
+
+    second = Order()
+    assert second.invoked['payment'] is payment
+    assert payment.current_state == 'pending'
+    assert not Payment._pool
+
+
+def test_invoke_source_resolved_once(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test source name is resolved on the first invocation only."""
+    order = Order()
+    invoke = order.get_state('paying').invoke[0]
+    assert invoke.factory is Payment
+    order.trigger('cancel')
+    monkeypatch.setattr('superstate.machine.lookup_subclasses', None)
+    order._invoke(invoke)
+    assert isinstance(order.invoked['payment'], Payment)
+
+
+def test_invoke_ambiguous_source() -> None:
+    """Test source naming several statecharts is rejected."""
+
+    def refund() -> type:
+        class Refund(StateChart):
+            """Provide statechart whose name is declared twice."""
+
+            state = {'initial': 'open', 'states': ['open']}
+
+        return Refund
+
+    # keep both classes referenced while they are looked up
+    classes = refund(), refund()
+    with pytest.raises(InvalidConfig):
+        Order()._invoke(Invoke(src='refund', id='refund'))
+    assert classes[0] is not classes[1]
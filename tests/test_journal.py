@@ -0,0 +1,198 @@
+"""Test events journaled by statecharts and replayed after a crash."""
+
+import os
+import time
+from typing import Any, Dict
+from uuid import uuid4
+
+import pytest
+
+from superstate import StateChart
+from superstate.journal import RECORD, Journal
+from superstate.runtime import ShardedRuntime
+from superstate.scheduler import ManualClock, Scheduler
+
+notified: list = []
+
+
+def credit(ctx: StateChart, amount: int = 0) -> None:
+    """Credit amount of the deposit to the balance."""
+    ctx.datamodel['balance'] += amount
+
+
+def notify(ctx: StateChart, amount: int = 0) -> None:
+    """Notify the owner of the deposit outside of the statechart."""
+    notified.append(amount)
+
+
+class Account(StateChart):
+    """Provide account notifying its owner of deposits."""
+
+    datamodel: Dict[str, Any] = {'data': [{'id': 'balance', 'expr': 0}]}
+    state = {
+        'initial': 'open',
+        'states': [
+            {
+                'name': 'open',
+                'transitions': [
+                    {
+                        'event': 'deposit',
+                        'target': 'open',
+                        'content': [
+                            credit,
+                            {'script': {'src': notify, 'replay': False}},
+                            {'send': {'event': 'notify', 'delay': '1s'}},
+                            {'log': {'expr': 'balance'}},
+                        ],
+                    },
+                    {'event': 'close', 'target': 'closed'},
+                ],
+            },
+            {'name': 'closed'},
+        ],
+    }
+
+
+def test_replay_rebuilds_statechart(tmp_path: Any) -> None:
+    """Test replayed events rebuild data without repeating effects."""
+    notified.clear()
+    with Journal(tmp_path / 'shard.journal', fsync=False) as journal:
+        account = Account(journal=journal)
+        for amount in (10, 20, 30):
+            account.trigger('deposit', amount=amount)
+        account.trigger('close')
+
+    scheduler = Scheduler(clock=ManualClock())
+    with Journal(tmp_path / 'shard.journal', fsync=False) as journal:
+        _, events = journal.read(account._sessionid)
+        assert [x[2] for x in events] == ['deposit'] * 3 + ['close']
+        assert events[0][4] == {'amount': 10}
+        replayed = Account.replay(
+            journal, account._sessionid, scheduler=scheduler
+        )
+    assert replayed.current_state == 'closed'
+    assert replayed.datamodel['balance'] == 60
+    assert not replayed.replaying
+    # sent events are not scheduled again
+    assert len(scheduler) == 0
+    # nor are scripts opting out of replay run again
+    assert notified == [10, 20, 30]
+
+
+def test_snapshots_bound_replay(tmp_path: Any) -> None:
+    """Test only events after the last snapshot are replayed."""
+    path = tmp_path / 'shard.journal'
+    with Journal(path, fsync=False, snapshot_interval=2) as journal:
+        account = Account(journal=journal)
+        for amount in (1, 2, 3):
+            account.trigger('deposit', amount=amount)
+        content, events = journal.read(account._sessionid)
+        assert content is None
+        journal.commit()
+        content, events = journal.read(account._sessionid)
+        assert content is not None
+        assert [x[4] for x in events] == [{'amount': 3}]
+        assert (
+            Account.replay(journal, account._sessionid).datamodel['balance']
+            == 6
+        )
+
+
+def test_group_commit(tmp_path: Any) -> None:
+    """Test records are written once the group is full or has waited."""
+    path = tmp_path / 'shard.journal'
+    sessionid = uuid4()
+    with Journal(path, group_size=3, group_interval=60) as journal:
+        for _ in range(2):
+            journal.append(sessionid, None, 'tick', (), {})
+        assert os.path.getsize(path) == 0
+        journal.append(sessionid, None, 'tick', (), {})
+        assert os.path.getsize(path) > 0
+    with Journal(path, group_size=3, group_interval=0.01) as journal:
+        size = os.path.getsize(path)
+        journal.append(sessionid, None, 'tock', (), {})
+        for _ in range(100):
+            if os.path.getsize(path) > size:
+                break
+            time.sleep(0.01)
+        assert os.path.getsize(path) > size
+        # records truncated by a crash end the journal
+        with open(path, 'ab') as file:
+            file.write(RECORD.pack(100, 1, sessionid.bytes) + b'partial')
+        _, events = journal.read(sessionid)
+        assert [x[2] for x in events] == ['tick'] * 3 + ['tock']
+
+
+def test_read_indexed_session(tmp_path: Any) -> None:
+    """Test sessions sharing a journal are read and compacted apart."""
+    path = tmp_path / 'shard.journal'
+    with Journal(path, fsync=False, snapshot_interval=2) as journal:
+        accounts = [Account(journal=journal) for _ in range(2)]
+        for amount in (1, 2, 3):
+            for account in accounts:
+                account.trigger('deposit', amount=amount)
+        journal.commit()
+        size = os.path.getsize(path)
+        journal.compact()
+        assert os.path.getsize(path) < size
+        accounts[0].trigger('deposit', amount=4)
+    with open(path, 'ab') as file:
+        file.write(RECORD.pack(100, 1, uuid4().bytes) + b'partial')
+    with Journal(path, fsync=False) as journal:
+        # records truncated by a crash are dropped when opened
+        Account.replay(journal, accounts[1]._sessionid).trigger('close')
+        Account.replay(journal, accounts[0]._sessionid).trigger(
+            'deposit', amount=5
+        )
+        journal.commit()
+        content, events = journal.read(accounts[0]._sessionid)
+        assert content is not None
+        assert [x[4] for x in events] == [{'amount': 5}]
+        first = Account.replay(journal, accounts[0]._sessionid)
+        second = Account.replay(journal, accounts[1]._sessionid)
+    assert first.datamodel['balance'] == 15
+    assert second.datamodel['balance'] == 6
+    assert second.current_state == 'closed'
+
+
+def test_failed_event_replayed(tmp_path: Any) -> None:
+    """Test effects of an event failing partway are replayed."""
+
+    def overdraw(ctx: StateChart, amount: int = 0) -> None:
+        raise ValueError('overdrawn')
+
+    class Overdraft(StateChart):
+        """Provide account failing withdrawals after crediting them."""
+
+        datamodel = Account.datamodel
+        state = {
+            'initial': 'open',
+            'states': [
+                {
+                    'name': 'open',
+                    'transitions': [
+                        {'event': 'withdraw', 'content': [credit, overdraw]}
+                    ],
+                }
+            ],
+        }
+
+    path = tmp_path / 'shard.journal'
+    with Journal(path, fsync=False) as journal:
+        account = Overdraft(journal=journal)
+        with pytest.raises(ValueError):
+            account.trigger('withdraw', amount=-5)
+        assert account.datamodel['balance'] == -5
+        journal.commit()
+        replayed = Overdraft.replay(journal, account._sessionid)
+    assert replayed.datamodel['balance'] == -5
+
+
+def test_sharded_runtime_replay(tmp_path: Any) -> None:
+    """Test statecharts of a shard are replayed from its journal."""
+    with ShardedRuntime(Account, processes=2, journal=tmp_path) as runtime:
+        sessionid = runtime.create().result(timeout=5)
+        runtime.send(sessionid, 'close')
+    with ShardedRuntime(Account, processes=2, journal=tmp_path) as runtime:
+        assert runtime.replay(sessionid).result(timeout=5) == 'closed'
+        assert runtime.state(sessionid).result(timeout=5) == 'closed'
@@ -0,0 +1,111 @@
+"""Test statecharts hosted by worker processes of a sharded runtime."""
+
+from typing import Any
+
+import pytest
+
+from superstate import InvalidState, StateChart
+from superstate.exception import SuperstateException
+from superstate.runtime import ShardedRuntime
+
+
+def count(ctx: Any, coins: int) -> None:
+    """Reject payments without coins."""
+    if coins < 1:
+        raise ValueError('no coins inserted')
+
+
+class Turnstile(StateChart):
+    """Provide turnstile unlocked by coins."""
+
+    state = {
+        'initial': 'locked',
+        'states': [
+            {
+                'name': 'locked',
+                'transitions': [
+                    {'event': 'coin', 'target': 'unlocked', 'content': count}
+                ],
+            },
+            {
+                'name': 'unlocked',
+                'transitions': [{'event': 'push', 'target': 'locked'}],
+            },
+        ],
+    }
+
+
+@pytest.fixture(name='runtime', scope='module')
+def fixture_runtime() -> Any:
+    """Get runtime with a shard for each of two processes."""
+    with ShardedRuntime(
+        Turnstile, processes=2, batch=4, linger=None
+    ) as runtime:
+        yield runtime
+
+
+def test_sessions_are_partitioned(runtime: ShardedRuntime) -> None:
+    """Test sessions are hosted by the shard selected by their hash."""
+    sessions = [runtime.create().result(timeout=5) for _ in range(16)]
+    assert {runtime.shard(x) for x in sessions} == {0, 1}
+    assert runtime.shard(sessions[0]) == runtime.shard(sessions[0])
+    assert all(runtime.state(x).result(5) == 'locked' for x in sessions)
+
+
+def test_batched_events_are_processed_in_order(
+    runtime: ShardedRuntime,
+) -> None:
+    """Test events are pipelined and processed in the order sent."""
+    sessionid = runtime.create().result(timeout=5)
+    futures = [
+        runtime.send(sessionid, event, 1)
+        for event in ('coin', 'push', 'coin', 'push', 'coin')
+    ]
+    # batches are sent once full with the remainder awaiting a flush
+    assert futures[3].result(timeout=5) == 'processed'
+    assert not futures[4].done()
+    runtime.flush()
+    assert [x.result(timeout=5) for x in futures] == ['processed'] * 5
+    assert runtime.state(sessionid).result(timeout=5) == 'unlocked'
+
+
+def test_errors_are_returned(runtime: ShardedRuntime) -> None:
+    """Test failures within worker processes are raised by futures."""
+    sessionid = runtime.create().result(timeout=5)
+    future = runtime.send(sessionid, 'coin', 0)
+    runtime.flush()
+    with pytest.raises(ValueError):
+        future.result(timeout=5)
+    runtime.remove(sessionid).result(timeout=5)
+    with pytest.raises(InvalidState):
+        runtime.state(sessionid).result(timeout=5)
+
+
+def test_lingering_events_are_sent() -> None:
+    """Test events are sent without a flush once they have lingered."""
+    with ShardedRuntime(Turnstile, processes=1, linger=0.01) as runtime:
+        sessionid = runtime.create().result(timeout=5)
+        assert runtime.send(sessionid, 'coin', 1).result(5) == 'processed'
+        assert runtime.state(sessionid).result(timeout=5) == 'unlocked'
+
+
+def test_closed_runtime() -> None:
+    """Test messages cannot be sent without worker processes."""
+    runtime = ShardedRuntime(Turnstile, processes=1)
+    with pytest.raises(SuperstateException):
+        runtime.create()
+
+
+def test_exited_worker_fails_futures() -> None:
+    """Test messages to a shard whose worker has exited fail."""
+    with ShardedRuntime(Turnstile, processes=1, linger=None) as runtime:
+        sessionid = runtime.create().result(timeout=5)
+        worker = getattr(runtime, '_ShardedRuntime__workers')[0]
+        worker.kill()
+        worker.join()
+        with pytest.raises(SuperstateException):
+            runtime.state(sessionid).result(timeout=5)
+        future = runtime.send(sessionid, 'coin', 1)
+        runtime.flush()
+        with pytest.raises(SuperstateException):
+            future.result(timeout=5)
@@ -0,0 +1,134 @@
+"""Test delayed events delivered by the timing wheel scheduler."""
+
+import asyncio
+
+from superstate import Send, StateChart
+from superstate.scheduler import AsyncioDriver, ManualClock, Scheduler
+
+
+class Oven(StateChart):
+    """Provide statechart with delayed events."""
+
+    state = {
+        'initial': 'off',
+        'states': [
+            {
+                'name': 'off',
+                'transitions': [
+                    {
+                        'event': 'bake',
+                        'target': 'heating',
+                        'content': [
+                            {
+                                'send': {
+                                    'event': 'ready',
+                                    'delay': '1500ms',
+                                    'id': 'timer',
+                                }
+                            }
+                        ],
+                    }
+                ],
+            },
+            {
+                'name': 'heating',
+                'transitions': [
+                    {'event': 'ready', 'target': 'baking'},
+                    {
+                        'event': 'abort',
+                        'target': 'off',
+                        'content': [{'cancel': {'sendid': 'timer'}}],
+                    },
+                ],
+            },
+            {'name': 'baking'},
+        ],
+    }
+
+
+def test_scheduler_wheel_levels() -> None:
+    """Test timers cascade through levels and fire at their deadline."""
+    clock = ManualClock()
+    scheduler = Scheduler(clock=clock, resolution=1, slots=4, levels=3)
+    fired: list = []
+    for delay in (1, 3, 5, 17, 40, 100):
+        scheduler.schedule(delay, lambda x=delay: fired.append((x, clock())))
+    for _ in range(100):
+        clock.advance(1)
+        scheduler.advance()
+    assert fired == [(x, float(x)) for x in (1, 3, 5, 17, 40, 100)]
+    assert len(scheduler) == 0
+
+
+def test_scheduler_cancel() -> None:
+    """Test timers are cancelled and replaced by key."""
+    clock = ManualClock()
+    scheduler = Scheduler(clock=clock, resolution=1)
+    fired: list = []
+    scheduler.schedule(5, lambda: fired.append('first'), key='a')
+    scheduler.schedule(5, lambda: fired.append('second'), key='a')
+    scheduler.schedule(5, lambda: fired.append('third'), key='b')
+    assert scheduler.cancel('b') is True
+    assert scheduler.cancel('b') is False
+    clock.advance(5)
+    assert scheduler.advance() == 1
+    assert fired == ['second']
+
+
+def test_send_delayed_event() -> None:
+    """Test sent events are delivered once their delay has elapsed."""
+    clock = ManualClock()
+    oven = Oven(scheduler=Scheduler(clock=clock))
+    oven.trigger('bake')
+    clock.advance(1)
+    oven.scheduler.advance()
+    assert oven.current_state == 'heating'
+    clock.advance(0.5)
+    oven.scheduler.advance()
+    assert oven.current_state == 'baking'
+
+
+def test_cancel_delayed_event() -> None:
+    """Test cancelled events are not delivered."""
+    clock = ManualClock()
+    oven = Oven(scheduler=Scheduler(clock=clock))
+    oven.trigger('bake')
+    oven.trigger('abort')
+    clock.advance(2)
+    assert oven.scheduler.advance() == 0
+    assert oven.current_state == 'off'
+
+
+def test_send_to_other_session() -> None:
+    """Test events are delivered to other sessions by session id."""
+    clock = ManualClock()
+    scheduler = Scheduler(clock=clock)
+    sender, receiver = Oven(scheduler=scheduler), Oven(scheduler=scheduler)
+    receiver.trigger('bake')
+    send = Send('ready', target=f"#_scxml_{receiver._sessionid}", id='ping')
+    sender.datamodel.provider(sender).handle(send)
+    # timers are keyed by the session sending them
+    sender.trigger('bake')
+    sender.trigger('abort')
+    assert len(scheduler) == 2
+    scheduler.advance()
+    assert sender.current_state == 'off'
+    assert receiver.current_state == 'baking'
+
+
+def test_asyncio_driver() -> None:
+    """Test event loop turns the wheel while timers are pending."""
+
+    async def bake() -> Oven:
+        loop = asyncio.get_running_loop()
+        scheduler = Scheduler(clock=loop.time, resolution=0.001)
+        driver = AsyncioDriver(scheduler, loop)
+        driver.start()
+        oven = Oven(scheduler=scheduler)
+        oven.get_state('off').transitions[0].content[0].delay = 0.01
+        oven.trigger('bake')
+        await asyncio.sleep(0.05)
+        driver.stop()
+        return oven
+
+    assert asyncio.run(bake()).current_state == 'baking'
@@ -0,0 +1,137 @@
+"""Test statecharts loaded from SCXML documents."""
+
+import io
+import os
+from pathlib import Path
+
+import pytest
+
+from superstate import StateChart, scxml
+from superstate.exception import InvalidConfig
+
+DOCUMENT = b"""<?xml version="1.0" encoding="UTF-8"?>
+<scxml xmlns="http://www.w3.org/2005/07/scxml" version="1.0"
+       name="turnstile" initial="locked">
+  <datamodel>
+    <data id="coins" expr="0"/>
+  </datamodel>
+  <state id="locked">
+    <transition event="coin" target="unlocked">
+      <assign location="coins" expr="coins + 1"/>
+    </transition>
+    <transition event="push" target="locked"/>
+  </state>
+  <state id="unlocked">
+    <onentry>
+      <if cond="coins &gt; 2">
+        <raise event="jam"/>
+      <elseif cond="coins &gt; 1"/>
+        <log label="turnstile" expr="'second coin'"/>
+      <else/>
+        <log label="turnstile" expr="'first coin'"/>
+      </if>
+    </onentry>
+    <transition event="push" target="locked"/>
+    <transition event="jam" target="broken"/>
+  </state>
+  <final id="broken"/>
+</scxml>
+"""
+
+
+def test_from_scxml() -> None:
+    """Test SCXML document creates an equivalent statechart."""
+    Turnstile = StateChart.from_scxml(DOCUMENT, cache_dir=None)
+    assert issubclass(Turnstile, StateChart)
+    assert Turnstile.__name__ == 'turnstile'
+    turnstile = Turnstile()
+    assert turnstile.current_state == 'locked'
+    for _ in range(2):
+        turnstile.trigger('coin')
+        assert turnstile.current_state == 'unlocked'
+        turnstile.trigger('push')
+    turnstile.trigger('coin')
+    assert turnstile.current_state == 'broken'
+    assert turnstile.datamodel['coins'] == 3
+
+
+def test_from_scxml_cached(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test validated definitions are loaded from cache without parsing."""
+    path = tmp_path / 'turnstile.scxml'
+    path.write_bytes(DOCUMENT)
+    StateChart.from_scxml(path, cache_dir=str(tmp_path / 'cache'))
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+    def fail(*args: object) -> None:
+        raise AssertionError('document parsed again')
+
+    monkeypatch.setattr(scxml, 'parse', fail)
+    with open(path, 'rb') as stream:
+        Turnstile = StateChart.from_scxml(
+            stream, cache_dir=str(tmp_path / 'cache')
+        )
+    assert Turnstile().current_state == 'locked'
+
+
+def test_invalid_scxml_not_cached(tmp_path: Path) -> None:
+    """Test definitions failing validation are not cached."""
+    document = DOCUMENT.replace(b'target="broken"', b'target="locked broken"')
+    with pytest.raises(InvalidConfig):
+        StateChart.from_scxml(document, cache_dir=str(tmp_path))
+    assert not list(tmp_path.iterdir())
+
+
+def test_unwritable_cache(tmp_path: Path) -> None:
+    """Test definitions are returned when the cache cannot be written."""
+    blocker = tmp_path / 'blocker'
+    blocker.write_bytes(b'')
+    Turnstile = StateChart.from_scxml(
+        DOCUMENT, cache_dir=str(blocker / 'cache')
+    )
+    assert Turnstile().current_state == 'locked'
+    assert scxml.CACHE_DIR is None or 'SUPERSTATE_CACHE_DIR' in os.environ
+
+
+def test_scxml_history() -> None:
+    """Test history elements are converted to history states."""
+    settings = scxml.parse(
+        io.BytesIO(
+            b'<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="a">'
+            b'<state id="a"><history id="h" type="deep">'
+            b'<transition target="b"/></history>'
+            b'<state id="b"/></state></scxml>'
+        )
+    )
+    history, state = settings['state']['states'][0]['states']
+    assert settings['state']['states'][0]['initial'] == 'b'
+    assert history == {
+        'name': 'h',
+        'type': 'history',
+        'history': 'deep',
+        'transitions': [{'event': '', 'target': 'b'}],
+    }
+    assert state == {'name': 'b'}
+
+
+def test_scxml_single_branch() -> None:
+    """Test branches changing their own condition never run another."""
+    Counter = StateChart.from_scxml(
+        b'<scxml xmlns="http://www.w3.org/2005/07/scxml" initial="a">'
+        b'<datamodel><data id="n" expr="1"/></datamodel>'
+        b'<state id="a"><onentry>'
+        b'<if cond="n == 1"><assign location="n" expr="n + 10"/>'
+        b'<elseif cond="n == 11"/><assign location="n" expr="0"/>'
+        b'<else/><assign location="n" expr="-1"/></if>'
+        b'</onentry></state></scxml>',
+        cache_dir=None,
+    )
+    assert Counter().datamodel['n'] == 11
+
+
+def test_scxml_cache_versioned(tmp_path: Path) -> None:
+    """Test cached definitions are keyed by the conversion version."""
+    StateChart.from_scxml(DOCUMENT, cache_dir=str(tmp_path))
+    (cached,) = tmp_path.iterdir()
+    assert f".{scxml.VERSION}." in cached.name
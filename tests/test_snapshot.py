@@ -0,0 +1,174 @@
+"""Test compact snapshots of statechart runtime state."""
+
+import pickle  # nosec
+from importlib.util import find_spec
+from typing import Any, Dict
+
+import pytest
+
+from superstate import InvalidConfig, StateChart
+from superstate.snapshot import HEADER, PICKLE
+
+captured: list = []
+
+
+def capture(ctx: StateChart) -> None:
+    """Capture snapshot while processing an event."""
+    captured.append(ctx.snapshot())
+
+
+class Light(StateChart):
+    """Provide light with independent color and brightness."""
+
+    datamodel: Dict[str, Any] = {
+        'data': [
+            {'id': 'changes', 'expr': 0},
+            {'id': 'label', 'expr': 'light'},
+        ]
+    }
+    state = {
+        'initial': 'on',
+        'states': [
+            {
+                'name': 'on',
+                'type': 'parallel',
+                'states': [
+                    {
+                        'name': 'color',
+                        'initial': 'red',
+                        'states': [
+                            {
+                                'name': 'red',
+                                'transitions': [
+                                    {
+                                        'event': 'next',
+                                        'target': 'green',
+                                        'content': [
+                                            {
+                                                'assign': {
+                                                    'location': 'changes',
+                                                    'expr': 'changes + 1',
+                                                }
+                                            }
+                                        ],
+                                    }
+                                ],
+                            },
+                            {'name': 'green'},
+                        ],
+                    },
+                    {
+                        'name': 'brightness',
+                        'initial': 'dim',
+                        'states': [
+                            {
+                                'name': 'dim',
+                                'transitions': [
+                                    {
+                                        'event': 'brighten',
+                                        'target': 'bright',
+                                        'content': [
+                                            {'raise': {'event': 'flash'}},
+                                            capture,
+                                        ],
+                                    }
+                                ],
+                            },
+                            {'name': 'bright'},
+                        ],
+                    },
+                ],
+                'transitions': [{'event': 'off', 'target': 'off'}],
+            },
+            {'name': 'off'},
+        ],
+    }
+
+
+class Other(StateChart):
+    """Provide statechart with another definition."""
+
+    state = {'initial': 'idle', 'states': [{'name': 'idle'}]}
+
+
+def test_snapshot_roundtrip() -> None:
+    """Test restored statecharts resume their configuration and data."""
+    light = Light()
+    light.trigger_at('color', 'next')
+    content = light.snapshot()
+    assert len(content) < len(pickle.dumps((light.datamodel, light.root))) / 10
+    restored = Light.restore(content)
+    assert restored.active == light.active
+    assert 'green' in restored.active and 'dim' in restored.active
+    assert restored.datamodel['changes'] == 1
+    assert restored.datamodel['label'] == 'light'
+    restored.trigger('off')
+    assert restored.current_state == 'off'
+
+
+def test_snapshot_holds_deltas() -> None:
+    """Test only data items changed since declared are encoded."""
+    light = Light()
+    unchanged = light.snapshot()
+    light.datamodel['label'] = 'x' * 100
+    assert len(light.snapshot()) > len(unchanged) + 100
+    light.datamodel['label'] = 'light'
+    assert light.snapshot() == unchanged
+    # objects other than builtin types fall back to pickle
+    light.datamodel['label'] = InvalidConfig('fallback')
+    content = light.snapshot()
+    assert HEADER.unpack_from(content)[2] == PICKLE
+    assert str(Light.restore(content).datamodel['label']) == 'fallback'
+
+
+def test_snapshot_holds_mutated_items() -> None:
+    """Test data items mutated in place are encoded as changed."""
+    light = Light()
+    light.datamodel['label'] = ['light']
+    unchanged = light.snapshot()
+    light.datamodel['label'].append('dimmed')
+    assert light.snapshot() != unchanged
+    restored = Light.restore(light.snapshot())
+    assert restored.datamodel['label'] == ['light', 'dimmed']
+    # defaults are evaluated once and never mutated with the items
+    assert light.datamodel.defaults is light.datamodel.defaults
+    assert light.datamodel.defaults['label'] == 'light'
+
+
+def test_snapshot_holds_queued_events() -> None:
+    """Test internal events raised before the snapshot are restored."""
+    captured.clear()
+    Light().trigger_at('brightness', 'brighten')
+    restored = Light.restore(captured[0])
+    assert len(restored.queue) == 1
+
+
+def test_snapshot_validation() -> None:
+    """Test snapshots are only restored onto their definition and format."""
+    content = Light().snapshot()
+    with pytest.raises(InvalidConfig):
+        Other.restore(content)
+    with pytest.raises(InvalidConfig):
+        Light.restore(b'SSSN\x02\x00' + content[6:])
+    with pytest.raises(InvalidConfig):
+        Light.restore(content[:4])
+
+
+@pytest.mark.skipif(
+    find_spec('pytest_benchmark') is None, reason='requires pytest-benchmark'
+)
+@pytest.mark.parametrize('method', ['snapshot', 'pickle'])
+def test_snapshot_benchmark(method: str, benchmark: Any) -> None:
+    """Benchmark snapshots against pickling the state tree."""
+    light = Light()
+    light.trigger_at('color', 'next')
+    benchmark.group = 'snapshot'
+    if method == 'snapshot':
+        content = benchmark(light.snapshot)
+    else:
+        content = benchmark(
+            pickle.dumps,
+            (light.datamodel, light.root),
+            pickle.HIGHEST_PROTOCOL,
+        )
+    benchmark.extra_info['size'] = len(content)
@@ -0,0 +1,170 @@
+"""Test deadlines of executable content enforced by the watchdog."""
+
+import pickle  # nosec
+import threading
+import time
+from typing import Any
+
+import pytest
+
+from superstate import ExecutionTimeout, StateChart
+from superstate.watchdog import Watchdog
+
+release = threading.Event()
+
+
+def hang(*args: Any) -> bool:
+    """Block until released by the test."""
+    release.wait(timeout=5)
+    return True
+
+
+class Vault(StateChart):
+    """Provide vault with slow guard and actions."""
+
+    state = {
+        'initial': 'locked',
+        'states': [
+            {
+                'name': 'locked',
+                'transitions': [
+                    {
+                        'event': 'unlock',
+                        'target': 'unlocked',
+                        'cond': hang,
+                        'timeout': 0.01,
+                    },
+                    {
+                        'event': 'open',
+                        'target': 'unlocked',
+                        'content': [
+                            {'script': {'src': hang, 'timeout': 0.01}}
+                        ],
+                    },
+                    {'event': 'check', 'target': 'unlocked', 'cond': hang},
+                    {'event': 'error.execution', 'target': 'alarm'},
+                ],
+            },
+            {
+                'name': 'unlocked',
+                'transitions': [
+                    {'event': 'error.execution', 'target': 'alarm'}
+                ],
+            },
+            {'name': 'alarm'},
+        ],
+    }
+
+
+class Safe(StateChart):
+    """Provide safe with a default deadline for its content."""
+
+    __timeout__ = 0.01
+    state = {
+        'initial': 'closed',
+        'states': [
+            {
+                'name': 'closed',
+                'transitions': [{'event': 'open', 'target': 'opened'}],
+            },
+            {
+                'name': 'opened',
+                'on_entry': hang,
+                'transitions': [
+                    {'event': 'error.execution', 'target': 'alarm'}
+                ],
+            },
+            {'name': 'alarm'},
+        ],
+    }
+
+
+@pytest.fixture(autouse=True)
+def released() -> Any:
+    """Release abandoned callbacks after each test."""
+    release.clear()
+    yield
+    release.set()
+
+
+def test_guard_timeout() -> None:
+    """Test guards overrunning their deadline are false and raise errors."""
+    vault = Vault()
+    start = time.monotonic()
+    result = vault.try_trigger('unlock')
+    assert time.monotonic() - start < 0.4
+    assert result.outcome == 'blocked'
+    assert vault.current_state == 'alarm'
+    info = vault.watchdog.info
+    assert (info.timeouts, info.overrunning) == (1, 1)
+    release.set()
+    for _ in range(100):
+        if not vault.watchdog.info.overrunning:
+            break
+        time.sleep(0.01)
+    assert vault.watchdog.info.overrunning == 0
+
+
+def test_action_timeout_raises_error_event() -> None:
+    """Test actions overrunning their deadline raise an internal event."""
+    vault = Vault()
+    vault.trigger('open')
+    assert vault.current_state == 'alarm'
+    assert vault.watchdog.info.timeouts == 1
+
+
+def test_unwatched_content() -> None:
+    """Test content without a deadline runs inline."""
+    release.set()
+    vault = Vault()
+    vault.trigger('check')
+    assert vault.current_state == 'unlocked'
+    assert vault.watchdog.info.runs == 0
+
+
+def test_chart_timeout() -> None:
+    """Test the statechart default applies to content without deadlines."""
+    safe = Safe()
+    start = time.monotonic()
+    safe.trigger('open')
+    assert time.monotonic() - start < 0.4
+    assert safe.current_state == 'alarm'
+    assert safe.watchdog.info.timeouts == 1
+    vault = Vault(timeout=0.01)
+    assert vault.try_trigger('check').outcome == 'blocked'
+    assert vault.current_state == 'alarm'
+
+
+def test_watchdog_timeout() -> None:
+    """Test watchdogs raise once callbacks overrun their deadline."""
+    watchdog = Watchdog()
+    with pytest.raises(ExecutionTimeout):
+        watchdog.run(0.01, hang)
+    assert watchdog.info.timeouts == 1
+
+
+def test_nested_callbacks_run_inline() -> None:
+    """Test callbacks nested within watched callbacks share a deadline."""
+    watchdog = Watchdog()
+    threads: list = []
+
+    def inner() -> None:
+        threads.append(threading.current_thread())
+
+    def outer() -> None:
+        threads.append(threading.current_thread())
+        watchdog.run(0.5, inner)
+
+    watchdog.run(0.5, outer)
+    assert threads[0] is threads[1]
+    assert threads[0] is not threading.current_thread()
+    assert watchdog.info.runs == 1
+
+
+def test_watchdog_copied() -> None:
+    """Test watchdogs are copied with their statistics."""
+    watchdog = Watchdog()
+    watchdog.run(1, lambda: None)
+    copied = pickle.loads(pickle.dumps(watchdog))
+    assert copied.info.runs == 1
+    assert copied.run(1, lambda: 'done') == 'done'
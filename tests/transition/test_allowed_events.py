@@ -0,0 +1,59 @@
+"""Test queries of events enabled by the current configuration."""
+
+from superstate import StateChart
+
+
+class Door(StateChart):
+    """Provide door to query available events."""
+
+    state = {
+        'initial': 'closed',
+        'states': [
+            {
+                'name': 'closed',
+                'transitions': [
+                    {
+                        'event': 'open',
+                        'target': 'opened',
+                        'cond': lambda ctx: not ctx.locked,
+                    },
+                    {'event': 'lock', 'target': 'locked'},
+                ],
+            },
+            {
+                'name': 'opened',
+                'transitions': [{'event': 'close', 'target': 'closed'}],
+            },
+            {
+                'name': 'locked',
+                'transitions': [{'event': 'unlock', 'target': 'closed'}],
+            },
+        ],
+    }
+
+    def __init__(self, locked: bool = False) -> None:
+        self.locked = locked
+        super().__init__()
+
+
+def test_allowed_events() -> None:
+    """Test structural events are provided for the configuration."""
+    door = Door()
+    assert door.allowed_events == {'open', 'lock'}
+    door.trigger('open')
+    assert door.allowed_events == {'close'}
+
+
+def test_allowed_events_shared_between_instances() -> None:
+    """Test configurations are computed once per statechart class."""
+    first, second = Door(), Door()
+    assert first.allowed_events is second.allowed_events
+
+
+def test_can_trigger_evaluates_guards() -> None:
+    """Test guards are separated from structural availability."""
+    door = Door(locked=True)
+    assert 'open' in door.allowed_events
+    assert door.can_trigger('open') is False
+    assert door.can_trigger('lock') is True
+    assert door.can_trigger('unlock') is False
@@ -0,0 +1,89 @@
+"""Test blocking content run in the background."""
+
+import threading
+from typing import Any
+
+from superstate import StateChart
+from superstate.scheduler import ManualClock, Scheduler
+
+release = threading.Event()
+
+
+def fetch(ctx: Any, url: str) -> str:
+    """Get report after the request has been released."""
+    assert release.wait(timeout=5)
+    if url == 'broken':
+        raise ValueError(url)
+    return f"report from {url}"
+
+
+class Report(StateChart):
+    """Provide report downloaded without blocking the statechart."""
+
+    state = {
+        'initial': 'idle',
+        'states': [
+            {
+                'name': 'idle',
+                'transitions': [
+                    {
+                        'event': 'fetch',
+                        'target': 'loading',
+                        'content': [
+                            {
+                                'script': {
+                                    'src': fetch,
+                                    'background': True,
+                                    'id': 'fetch',
+                                }
+                            }
+                        ],
+                    }
+                ],
+            },
+            {
+                'name': 'loading',
+                'transitions': [
+                    {
+                        'event': 'done.script.fetch',
+                        'target': 'ready',
+                        'content': [
+                            lambda ctx, report: setattr(ctx, 'report', report)
+                        ],
+                    },
+                    {'event': 'error.execution', 'target': 'failed'},
+                ],
+            },
+            {'name': 'ready'},
+            {'name': 'failed'},
+        ],
+    }
+
+
+def run(url: str) -> Report:
+    """Get report after its background content has completed."""
+    scheduler = Scheduler(clock=ManualClock())
+    release.clear()
+    report = Report(scheduler=scheduler)
+    report.trigger('fetch', url)
+    # transition completes while the content is still running
+    assert report.current_state == 'loading'
+    release.set()
+    for _ in range(500):
+        if scheduler.advance():
+            break
+        threading.Event().wait(0.01)
+    return report
+
+
+def test_background_result_event() -> None:
+    """Test result of background content is delivered with its event."""
+    report = run('example')
+    assert report.current_state == 'ready'
+    assert report.report == 'report from example'
+
+
+def test_background_error_event() -> None:
+    """Test failed background content delivers an error event."""
+    report = run('broken')
+    assert report.current_state == 'failed'
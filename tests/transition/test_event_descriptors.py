@@ -0,0 +1,79 @@
+"""Test matching events by prefix of their descriptors."""
+
+import pytest
+
+from superstate import InvalidTransition, StateChart
+from superstate.transition import EventTrie
+
+
+class Monitor(StateChart):
+    """Provide monitor subscribing to event prefixes."""
+
+    state = {
+        'initial': 'idle',
+        'states': [
+            {
+                'name': 'idle',
+                'transitions': [
+                    {'event': 'device.sensor', 'target': 'sensing'},
+                    {'event': 'device.*', 'target': 'busy'},
+                ],
+            },
+            {
+                'name': 'sensing',
+                'transitions': [{'event': '*', 'target': 'idle'}],
+            },
+            {'name': 'busy'},
+        ],
+    }
+
+
+def test_event_trie_matches_prefixes() -> None:
+    """Test every descriptor that prefixes an event is matched."""
+    trie = EventTrie(
+        [
+            ('device.*', 1),
+            ('device.sensor', 2),
+            ('device.sensor.temp.low', 3),
+            ('*', 4),
+            ('other', 5),
+        ]
+    )
+    assert sorted(trie.match('device.sensor.temp.high')) == [1, 2, 4]
+    assert sorted(trie.match('devices')) == [4]
+    assert 'device' in trie
+    assert trie.descriptors == {
+        'device.*',
+        'device.sensor',
+        'device.sensor.temp.low',
+        '*',
+        'other',
+    }
+
+
+def test_dotted_event_matches_descriptor_prefix() -> None:
+    """Test events are matched by token prefix in document order."""
+    monitor = Monitor()
+    assert monitor.can_trigger('device.sensor.temp.high') is True
+    assert monitor.can_trigger('devices') is False
+    monitor.trigger('device.sensor.temp.high')
+    assert monitor.current_state == 'sensing'
+
+
+def test_wildcard_descriptor() -> None:
+    """Test wildcard descriptors match any event."""
+    monitor = Monitor()
+    monitor.trigger('device.power')
+    assert monitor.current_state == 'busy'
+
+    monitor = Monitor()
+    monitor.trigger('device.sensor')
+    monitor.trigger('anything.at.all')
+    assert monitor.current_state == 'idle'
+
+
+def test_partial_token_does_not_match() -> None:
+    """Test descriptors only match on whole tokens."""
+    monitor = Monitor()
+    with pytest.raises(InvalidTransition):
+        monitor.trigger('device_sensor')
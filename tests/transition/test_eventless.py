@@ -0,0 +1,166 @@
+"""Test eventless transitions are processed iteratively."""
+
+import pytest
+
+from superstate import InvalidTransition, StateChart
+
+
+class Router(StateChart):
+    """Provide long chain of transient decision states."""
+
+    __eventless_limit__ = 500
+
+    state = {
+        'initial': 'waiting',
+        'states': [
+            {
+                'name': 'waiting',
+                'transitions': [{'event': 'route', 'target': 'decision0'}],
+            },
+            *[
+                {
+                    'name': f"decision{x}",
+                    'transitions': [
+                        {'event': '', 'target': f"decision{x + 1}"}
+                    ],
+                }
+                for x in range(300)
+            ],
+            {'name': 'decision300', 'type': 'final'},
+        ],
+    }
+
+
+class Counter(StateChart):
+    """Provide eventless transitions guarded by the datamodel."""
+
+    datamodel = {'data': [{'id': 'count', 'expr': 0}]}
+    state = {
+        'initial': 'counting',
+        'states': [
+            {
+                'name': 'counting',
+                'transitions': [
+                    {
+                        'event': '',
+                        'cond': 'count < 3',
+                        'target': 'counting',
+                        'content': [
+                            {
+                                'assign': {
+                                    'location': 'count',
+                                    'expr': 'count + 1',
+                                }
+                            }
+                        ],
+                    },
+                    {'event': '', 'cond': 'count >= 3', 'target': 'done'},
+                ],
+            },
+            {'name': 'done'},
+        ],
+    }
+
+
+class Loop(StateChart):
+    """Provide eventless transitions that never stabilize."""
+
+    state = {
+        'initial': 'ping',
+        'states': [
+            {'name': 'ping', 'transitions': [{'event': '', 'target': 'pong'}]},
+            {'name': 'pong', 'transitions': [{'event': '', 'target': 'ping'}]},
+        ],
+    }
+
+
+class Spinner(StateChart):
+    """Provide eventless transitions guarded by callables."""
+
+    __eventless_limit__ = 10
+
+    state = {
+        'initial': 'spinning',
+        'states': [
+            {
+                'name': 'spinning',
+                'transitions': [
+                    {
+                        'event': '',
+                        'target': 'turning',
+                        'cond': lambda ctx: True,
+                    }
+                ],
+            },
+            {
+                'name': 'turning',
+                'transitions': [
+                    {
+                        'event': '',
+                        'target': 'spinning',
+                        'cond': lambda ctx: True,
+                    }
+                ],
+            },
+        ],
+    }
+
+
+class Basket(StateChart):
+    """Provide eventless transition guarded by a mutable data item."""
+
+    datamodel = {'data': [{'id': 'items', 'expr': []}]}
+    state = {
+        'initial': 'filling',
+        'states': [
+            {
+                'name': 'filling',
+                'transitions': [
+                    {'event': '', 'cond': 'items[1:] != []', 'target': 'full'},
+                    {
+                        'event': 'add',
+                        'target': 'filling',
+                        'content': [
+                            lambda ctx: ctx.datamodel['items'].append(1)
+                        ],
+                    },
+                ],
+            },
+            {'name': 'full'},
+        ],
+    }
+
+
+def test_transient_chain_does_not_recurse() -> None:
+    """Test long chains of transient states are processed as microsteps."""
+    router = Router()
+    router.trigger('route')
+    assert router.current_state == 'decision300'
+
+
+def test_eventless_guards_use_datamodel() -> None:
+    """Test eventless transitions repeat until their guards are false."""
+    counter = Counter()
+    assert counter.current_state == 'done'
+    assert counter.datamodel['count'] == 3
+
+
+def test_eventless_cycle_detected() -> None:
+    """Test cycles without datamodel changes are detected."""
+    with pytest.raises(InvalidTransition):
+        Loop()
+
+
+def test_eventless_guards_see_mutated_data() -> None:
+    """Test data items mutated in place enable eventless transitions."""
+    basket = Basket()
+    basket.trigger('add')
+    assert basket.current_state == 'filling'
+    basket.trigger('add')
+    assert basket.current_state == 'full'
+
+
+def test_eventless_limit() -> None:
+    """Test eventless transitions stop at the configured limit."""
+    with pytest.raises(InvalidTransition):
+        Spinner()
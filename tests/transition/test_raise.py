@@ -0,0 +1,130 @@
+"""Test internal events raised by executable content."""
+
+import pytest
+
+from superstate import StateChart
+from superstate.exception import InvalidAction
+from superstate.queue import EventQueue, intern_event, lookup_event
+
+
+class Intersection(StateChart):
+    """Provide parallel regions communicating with internal events."""
+
+    state = {
+        'name': 'intersection',
+        'initial': 'running',
+        'states': [
+            {
+                'name': 'running',
+                'type': 'parallel',
+                'states': [
+                    {
+                        'name': 'road',
+                        'initial': 'green',
+                        'states': [
+                            {
+                                'name': 'green',
+                                'transitions': [
+                                    {
+                                        'event': 'request',
+                                        'target': 'red',
+                                        'content': [
+                                            {'raise': {'event': 'stopped'}}
+                                        ],
+                                    }
+                                ],
+                            },
+                            {'name': 'red'},
+                        ],
+                    },
+                    {
+                        'name': 'crossing',
+                        'initial': 'wait',
+                        'states': [
+                            {
+                                'name': 'wait',
+                                'transitions': [
+                                    {'event': 'stopped', 'target': 'walk'}
+                                ],
+                            },
+                            {'name': 'walk'},
+                        ],
+                    },
+                ],
+            },
+        ],
+    }
+
+
+class Echo(StateChart):
+    """Provide internal events raised faster than they are processed."""
+
+    __queue_size__ = 2
+    state = {
+        'initial': 'quiet',
+        'states': [
+            {
+                'name': 'quiet',
+                'transitions': [
+                    {
+                        'event': 'shout',
+                        'target': 'quiet',
+                        'content': [
+                            {'raise': {'event': 'echo'}},
+                            {'raise': {'event': 'echo'}},
+                            {'raise': {'event': 'echo'}},
+                        ],
+                    }
+                ],
+            },
+        ],
+    }
+
+
+def test_raise_between_parallel_regions() -> None:
+    """Test internal events are processed before the next external event."""
+    intersection = Intersection()
+    result = intersection.try_trigger('request')
+    assert result.outcome == 'processed'
+    assert intersection.is_red is True
+    assert intersection.is_walk is True
+    assert not intersection.queue
+
+
+def test_raise_beyond_capacity() -> None:
+    """Test internal events are rejected once the queue is full."""
+    echo = Echo()
+    with pytest.raises(InvalidAction):
+        echo.trigger('shout')
+    assert not echo.queue
+    result = echo.try_trigger('shout')
+    assert isinstance(result.error, InvalidAction)
+    assert not echo.queue
+
+
+def test_event_queue_ring() -> None:
+    """Test queued events wrap around the allocated slots."""
+    queue = EventQueue(2)
+    queue.push(intern_event('first'))
+    queue.push(intern_event('second'))
+    assert lookup_event(queue.pop()) == 'first'
+    queue.push(intern_event('third'))
+    assert lookup_event(queue.pop()) == 'second'
+    assert lookup_event(queue.pop()) == 'third'
+    assert intern_event('first') == intern_event('first')
+
+
+def test_event_queue_grows() -> None:
+    """Test slots are added as the queue fills while preserving order."""
+    queue = EventQueue(100)
+    queue.push(0)
+    queue.pop()
+    for identifier in range(20):
+        queue.push(identifier)
+    assert list(queue) == list(range(20))
+    assert [queue.pop() for _ in range(20)] == list(range(20))
+    queue = EventQueue(10)
+    for identifier in range(10):
+        queue.push(identifier)
+    with pytest.raises(InvalidAction):
+        queue.push(10)
@@ -0,0 +1,104 @@
+"""Test events dispatched to regions of parallel states."""
+
+from typing import Any, Dict
+
+import pytest
+
+from superstate import InvalidState, InvalidTransition, StateChart
+
+
+def stoplight(name: str, initial: str) -> Dict[str, Any]:
+    """Get settings of a stoplight region."""
+    return {
+        'name': name,
+        'initial': initial,
+        'states': [
+            {
+                'name': f"{name}_red",
+                'transitions': [
+                    {'event': 'turn_green', 'target': f"{name}_green"}
+                ],
+            },
+            {
+                'name': f"{name}_yellow",
+                'transitions': [
+                    {'event': 'turn_red', 'target': f"{name}_red"}
+                ],
+            },
+            {
+                'name': f"{name}_green",
+                'transitions': [
+                    {'event': 'turn_yellow', 'target': f"{name}_yellow"}
+                ],
+            },
+        ],
+    }
+
+
+class Intersection(StateChart):
+    """Provide intersection with stoplights changed independently."""
+
+    state = {
+        'name': 'intersection',
+        'type': 'parallel',
+        'states': [
+            stoplight('north_south', 'north_south_red'),
+            stoplight('east_west', 'east_west_green'),
+        ],
+        'transitions': [{'event': 'turn_red', 'target': 'intersection'}],
+    }
+
+
+def test_trigger_at_region() -> None:
+    """Test event is only dispatched to the targeted region."""
+    intersection = Intersection()
+    intersection.trigger_at('east_west', 'turn_yellow')
+    intersection.trigger_at('intersection.east_west', 'turn_red')
+    result = intersection.trigger_at('north_south', 'turn_green')
+    assert result.transition.target == 'north_south_green'
+    assert 'north_south_green' in intersection.active
+    assert 'east_west_red' in intersection.active
+
+
+def test_trigger_at_excludes_ancestors() -> None:
+    """Test transitions outside of the targeted state are not selected."""
+    intersection = Intersection()
+    with pytest.raises(InvalidTransition):
+        intersection.trigger_at('north_south', 'turn_red')
+    assert 'north_south_red' in intersection.active
+
+
+def test_trigger_at_inactive_state() -> None:
+    """Test events cannot be dispatched to inactive states."""
+    intersection = Intersection()
+    with pytest.raises(InvalidState):
+        intersection.trigger_at('north_south_green', 'turn_yellow')
+
+
+def test_trigger_at_nearest_state() -> None:
+    """Test names are resolved nearest to the current state each time."""
+
+    def side(name: str, other: str) -> Dict[str, Any]:
+        return {
+            'name': name,
+            'initial': 'idle',
+            'states': [
+                {
+                    'name': 'idle',
+                    'transitions': [{'event': 'switch', 'target': other}],
+                }
+            ],
+        }
+
+    class Sides(StateChart):
+        """Provide statechart with a state name repeated in each side."""
+
+        state = {
+            'initial': 'left',
+            'states': [side('left', 'right'), side('right', 'left')],
+        }
+
+    sides = Sides()
+    for name in ('right', 'left', 'right'):
+        sides.trigger_at('idle', 'switch')
+        assert name in sides.active
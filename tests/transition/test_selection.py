@@ -0,0 +1,128 @@
+"""Test selection of optimal transitions for an event."""
+
+from superstate import StateChart
+
+
+class Player(StateChart):
+    """Provide nested statechart with overlapping events."""
+
+    state = {
+        'name': 'player',
+        'initial': 'stopped',
+        'states': [
+            {
+                'name': 'stopped',
+                'transitions': [
+                    {'event': 'play', 'target': 'playing', 'cond': False},
+                    {'event': 'play', 'target': 'playing'},
+                    {'event': 'play', 'target': 'paused'},
+                ],
+            },
+            {
+                'name': 'playing',
+                'initial': 'normal',
+                'states': [
+                    {
+                        'name': 'normal',
+                        'transitions': [{'event': 'skip', 'target': 'fast'}],
+                    },
+                    {'name': 'fast'},
+                ],
+                'transitions': [
+                    {'event': 'skip', 'target': 'stopped'},
+                    {'event': 'pause', 'target': 'paused'},
+                ],
+            },
+            {'name': 'paused'},
+        ],
+    }
+
+
+class Console(StateChart):
+    """Provide parallel statechart with conflicting transitions."""
+
+    state = {
+        'name': 'console',
+        'initial': 'running',
+        'states': [
+            {
+                'name': 'running',
+                'type': 'parallel',
+                'states': [
+                    {
+                        'name': 'video',
+                        'initial': 'idle',
+                        'states': [
+                            {
+                                'name': 'idle',
+                                'transitions': [
+                                    {'event': 'play', 'target': 'rendering'},
+                                    {'event': 'eject', 'target': 'off'},
+                                ],
+                            },
+                            {'name': 'rendering'},
+                        ],
+                    },
+                    {
+                        'name': 'audio',
+                        'initial': 'muted',
+                        'states': [
+                            {
+                                'name': 'muted',
+                                'transitions': [
+                                    {'event': 'play', 'target': 'playing'},
+                                    {'event': 'eject', 'target': 'playing'},
+                                ],
+                            },
+                            {'name': 'playing'},
+                        ],
+                    },
+                ],
+            },
+            {'name': 'off'},
+        ],
+    }
+
+
+def test_document_order_priority() -> None:
+    """Test the first enabled transition in document order is selected."""
+    player = Player()
+    result = player.try_trigger('play')
+    assert len(result.transitions) == 1
+    assert player.current_state == 'normal'
+
+
+def test_descendant_preempts_ancestor() -> None:
+    """Test transitions of descendants preempt those of ancestors."""
+    player = Player()
+    player.trigger('play')
+    player.trigger('skip')
+    assert player.current_state == 'fast'
+    player.trigger('skip')
+    assert player.current_state == 'stopped'
+
+
+def test_parallel_regions_transition_together() -> None:
+    """Test non-conflicting transitions of each region are selected."""
+    console = Console()
+    assert console.configuration == (
+        'running',
+        'console',
+        'idle',
+        'video',
+        'muted',
+        'audio',
+    )
+    result = console.try_trigger('play')
+    assert len(result.transitions) == 2
+    assert console.is_rendering is True
+    assert console.is_playing is True
+
+
+def test_conflicting_transitions_removed() -> None:
+    """Test conflicting transitions are removed by document order."""
+    console = Console()
+    result = console.try_trigger('eject')
+    assert len(result.transitions) == 1
+    assert result.transition.target == 'off'
+    assert console.current_state == 'off'
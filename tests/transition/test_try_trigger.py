@@ -0,0 +1,80 @@
+"""Test processing events without raising for normal outcomes."""
+
+from typing import Any
+
+from superstate import StateChart
+
+
+class Job(StateChart):
+    """Provide job to verify outcomes of processed events."""
+
+    state = {
+        'initial': 'idle',
+        'states': [
+            {
+                'name': 'idle',
+                'transitions': [
+                    {
+                        'event': 'start',
+                        'target': 'running',
+                        'cond': lambda ctx: ctx.ready,
+                        'content': [lambda ctx: 'started'],
+                    },
+                    {
+                        'event': 'crash',
+                        'target': 'running',
+                        'content': ['explode'],
+                    },
+                    {'event': 'error.execution', 'target': 'failed'},
+                ],
+            },
+            {'name': 'running'},
+            {'name': 'failed'},
+        ],
+    }
+
+    def __init__(self, ready: bool = True, **kwargs: Any) -> None:
+        self.ready = ready
+        super().__init__(**kwargs)
+
+    def explode(self) -> None:
+        """Fail within executable content."""
+        raise RuntimeError('boom')
+
+
+def test_try_trigger_processed() -> None:
+    """Test fired transition and action results are returned."""
+    job = Job()
+    result = job.try_trigger('start')
+    assert result
+    assert result.outcome == 'processed'
+    assert result.transition.target == 'running'
+    assert result.results == ['started']
+    assert job.current_state == 'running'
+
+
+def test_try_trigger_unhandled() -> None:
+    """Test unmatched events are ignored without raising."""
+    job = Job()
+    result = job.try_trigger('stop')
+    assert not result
+    assert result.outcome == 'unhandled'
+    assert result.transition is None
+    assert job.current_state == 'idle'
+
+
+def test_try_trigger_blocked() -> None:
+    """Test guarded events are reported as blocked."""
+    job = Job(ready=False)
+    result = job.try_trigger('start')
+    assert result.outcome == 'blocked'
+    assert job.current_state == 'idle'
+
+
+def test_try_trigger_error() -> None:
+    """Test failures are returned and dispatched as error.execution."""
+    job = Job()
+    result = job.try_trigger('crash')
+    assert result.outcome == 'error'
+    assert isinstance(result.error, RuntimeError)
+    assert job.current_state == 'failed'